@@ -1,42 +1,130 @@
 import streamlit as st
 import pandas as pd
-import os
-import time
-import numpy as np
-from datetime import datetime, timedelta
-
-# Import scraping functions from the scraper code file
-from craper import scrape_isro_data, scrape_invest_india_data, scrape_nal_data, scrape_gem_data, \
-    scrape_dst_data, scrape_bdl_data
-
-# Load pre-saved data from Excel or CSV files
-def load_data(file_path):
-    if file_path.endswith('.csv'):
-        return pd.read_csv(file_path)
+from datetime import date, timedelta
+import store
+
+# Scrapes are queued for the scheduler process (python scheduler.py), never run inside the viewer
+import jobs
+
+# Number of rows sent to the browser per table page
+PAGE_SIZE = 100
+# Most recent watchlist hits shown per site
+WATCH_HITS_LIMIT = 1000
+
+# Load a site's data from the tender store. Cached per store version, so it is only re-read after a scrape
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_data(site, version):
+    return store.load_frame(site)
+
+# Function to filter a site's data on a search term using the full-text index, cached per store version and term
+@st.cache_data(show_spinner=False, max_entries=64)
+def search_data(site, version, search_term):
+    data = load_data(site, version)
+    keys = [hit['key'] for hit in store.search(search_term, sources=[site], limit=None)]
+    return data.loc[data.index.isin(keys)]
+
+# Function to get a site's latest watchlist hits as {record key: [terms]}, cached per store version
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_watch_hits(site, version):
+    terms = {}
+    for hit in store.watch_hits(sources=[site], limit=WATCH_HITS_LIMIT):
+        terms.setdefault(hit['key'], []).append(hit['term'])
+    return terms
+
+# Function to describe an update's changed fields, e.g. "Corrigendum: 0 -> 1"
+def describe_fields(fields):
+    return '; '.join(f"{column}: {old} -> {new}" for column, (old, new) in fields.items())
+
+
+# Function to show what changed in a site since this viewer last marked it as seen (read from the change feed)
+def show_unseen_changes(site, data, consumer):
+    changes = store.unseen_changes(consumer, site)
+    status = store.change_status(changes)
+    new_keys = [key for key, value in status.items() if value == 'New']
+    updates = {}
+    for change in changes:
+        if change['kind'] == 'update' and status[change['key']] == 'Updated':
+            updates.setdefault(change['key'], {}).update(change['fields'])
+
+    shown = set()
+    st.subheader("New Since You Last Looked")
+    new_entries = data.loc[data.index.isin(new_keys)]
+    if new_entries.empty:
+        st.write("No new entries.")
     else:
-        return pd.read_excel(file_path)
-
-# Function to filter data for the last 7 days
-def filter_last_7_days(data):
-    if 'Scraped Date' in data.columns:
-        data['Scraped Date'] = pd.to_datetime(data['Scraped Date'], errors='coerce')
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        latest_data = data[data['Scraped Date'] >= seven_days_ago]
-        return latest_data
-    else:
-        return pd.DataFrame(columns=data.columns)
-
-# Define file paths for pre-saved data
-base_path = r'(enter your path here)'
-file_paths = {
-    'NAL': os.path.join(base_path, 'nal_tender_data.xlsx'),
-    'Invest India': os.path.join(base_path, 'invest_india_data.xlsx'),
-    'GEM': os.path.join(base_path, 'scraped_gem_data.xlsx'),
-    'ISRO': os.path.join(base_path, 'isro_scraped_data.csv'),
-    'DST': os.path.join(base_path, 'scraped_DST.csv'),
-    'Srijan': os.path.join(base_path, 'srijan_defence_products_with_dates.xlsx'),
-    'BDL': os.path.join(base_path, 'bdl_tenders.csv')  # BDL data path
-}
+        shown.update(show_table(new_entries, f"{site}-new"))
+
+    updated_entries = data.loc[data.index.isin(list(updates))]
+    if not updated_entries.empty:
+        st.subheader("Updated Since You Last Looked")
+        updated_entries = updated_entries.assign(
+            Changes=[describe_fields(updates[key]) for key in updated_entries.index])
+        shown.update(show_table(updated_entries, f"{site}-updated"))
+
+    # The watermark can only move past changes this viewer was shown, on any table page opened in this
+    # session: it stops before the first change whose row a search is hiding or sits on a page not opened yet
+    shown_changes = st.session_state.setdefault(f"{site}-shown", set())
+    shown_changes.update(change['change_id'] for change in changes if change['key'] in shown)
+    seen = None
+    for change in changes:
+        if change['change_id'] not in shown_changes:
+            break
+        seen = change['change_id']
+    if seen is not None and st.button("Mark as seen", key=f"{site}-seen"):
+        store.advance_watermark(consumer, site, seen)
+        st.session_state.pop(f"{site}-shown", None)
+        st.rerun()
+    if changes and seen != changes[-1]['change_id']:
+        st.caption("Some changes are hidden by the search or on table pages not opened yet; show them to mark "
+                   "them as seen.")
+
+# Function to show the site's records that match watchlist terms (hits are indexed as records are stored)
+def show_watch_hits(site, data, version):
+    terms = load_watch_hits(site, version)
+    matches = data.loc[data.index.isin(list(terms))]
+    if not matches.empty:
+        st.subheader("Watchlist Matches")
+        show_table(matches.assign(**{'Watch Terms': [', '.join(sorted(terms[key])) for key in matches.index]}),
+                   f"{site}-watch")
+
+# Function to show the site's tenders that look like tenders listed on other portals
+def show_duplicates(site):
+    pairs = store.duplicate_pairs(sources=[site], limit=500)
+    if pairs:
+        st.subheader("Also Listed on Other Portals")
+        rows = []
+        for pair in pairs:
+            here, other = (pair['tender'], pair['duplicate_of']) if pair['tender']['source'] == site \
+                else (pair['duplicate_of'], pair['tender'])
+            rows.append({'Title': here['title'], 'Other Source': other['source'], 'Other Title': other['title'],
+                         'Other Key': other['source_id'], 'Similarity': round(pair['similarity'], 2)})
+        show_table(pd.DataFrame(rows), f"{site}-duplicates")
+
+# Function to search every source at once, best matches first
+def search_all_sources(search_term, limit=200):
+    hits = store.search(search_term, limit=limit)
+    return pd.DataFrame([{'Source': hit['source'], 'Match': hit['snippet'], 'Scraped Date': hit['scraped_date'],
+                          'Key': hit['key']} for hit in hits])
+
+# Function to filter data to the records whose typed date falls in a window (an index lookup in the store,
+# dates were parsed when the records were stored)
+def filter_dates(data, site, column, since=None, until=None):
+    return data.loc[data.index.isin(store.dated_keys(site, column, since, until))]
+
+# Function to show one page of a table instead of sending every row to the browser; returns the index of
+# the rows shown
+def show_table(data, key):
+    pages = max(1, -(-len(data) // PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages}, {len(data)} rows)", min_value=1, max_value=pages, value=1,
+                               key=key)
+    shown = data.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    st.dataframe(shown, hide_index=True)
+    return shown.index
+
+# Sites available in the tender store
+sites = list(store.SOURCES)
 
 # URLs corresponding to the websites for each dataset
 website_urls = {
@@ -49,119 +137,101 @@ website_urls = {
     'BDL': 'https://bdltenders.abcprocure.com/ssoeprocurement/EProc.jsp'  # BDL website
 }
 
-# Define the scraping times for each website (in seconds)
-scrape_times = {
-    "All": 150,
-    "GEM": 90,
-    "NAL": 10,
-    "Invest India": 30,
-    "ISRO": 45,
-    "DST": 45,
-    "Srijan": 60,
-    "BDL": 25
-}
-
 # Title of the application
 st.title("Tender Data Viewer")
 
 # Move the website link to the top, below the title
-selected_site = st.selectbox("Choose a website to view data:", list(file_paths.keys()))
+selected_site = st.selectbox("Choose a website to view data:", sites)
 
 if selected_site in website_urls and website_urls[selected_site]:
     st.markdown(f"[Go to {selected_site} Website]({website_urls[selected_site]})", unsafe_allow_html=True)
 
+# Each viewer name keeps its own "seen" position in the change feed
+viewer = st.sidebar.text_input("Viewer name", value="viewer")
+
 # Sidebar for rescraping using radio buttons
 st.sidebar.title("Rescrape Options")
-selected_rescrape = st.sidebar.radio("Choose a website to rescrape:", ['All'] + list(file_paths.keys()))
+selected_rescrape = st.sidebar.radio("Choose a website to rescrape:", ['All'] + sites)
 rescrape_button_sidebar = st.sidebar.button("Rescrape")
 
-# Sidebar placeholder for the scraping message
-sidebar_message_placeholder = st.sidebar.empty()
-
 # Search bar above the table
 search_term = st.text_input("Search Entries")
-
-# Initialize a placeholder for the progress bar right below the dropdown
-progress_placeholder = st.empty()
+search_everywhere = st.checkbox("Search all sources")
 
 # Function to display tables
 def display_data(selected_site):
     if selected_site:
-        if file_paths[selected_site] and os.path.exists(file_paths[selected_site]):
+        version = store.data_version(selected_site)
+        if version:
             with st.spinner("Loading data..."):
-                time.sleep(2)  # Simulate loading time
-                data = load_data(file_paths[selected_site])
-
-                # Filter data based on the search term
                 if search_term:
                     st.subheader(f"Results for '{search_term}':")
-                    mask = data.apply(lambda x: x.astype(str).str.contains(search_term, na=False, case=False)).any(
-                        axis=1)
-                    data = data[mask]
-
-                # Display "New" entries first
-                st.subheader("New Entries")
-                if 'Status' in data.columns:
-                    new_entries = data[data['Status'] == 'New']
-                    if new_entries.empty:
-                        st.write("No new entries.")
-                    else:
-                        st.dataframe(new_entries)
-
-                    # After viewing, mark "New" entries as "Old"
-                    data.loc[data['Status'] == 'New', 'Status'] = 'Old'
+                    data = search_data(selected_site, version, search_term)
+                else:
+                    data = load_data(selected_site, version)
+
+                # Display new and updated entries first
+                show_unseen_changes(selected_site, data, f"ui:{viewer or 'viewer'}")
+                show_watch_hits(selected_site, data, version)
+
+                # Tenders closing soon and opened this week, for the sources that publish those dates
+                today = date.today()
+                closing = filter_dates(data, selected_site, 'closing_on', today, today + timedelta(days=7))
+                if not closing.empty:
+                    st.subheader("Closing in the Next 7 Days")
+                    show_table(closing, f"{selected_site}-closing")
+                opened = filter_dates(data, selected_site, 'opening_on', today - timedelta(days=today.weekday()), today)
+                if not opened.empty:
+                    st.subheader("Opened This Week")
+                    show_table(opened, f"{selected_site}-opened")
 
                 # Filter and display data for the last 7 days next
-                latest_data = filter_last_7_days(data)
+                latest_data = filter_dates(data, selected_site, 'scraped_on', today - timedelta(days=7))
                 if not latest_data.empty:
                     st.subheader("Entries from the Last 7 Days")
-                    st.dataframe(latest_data)  # Display the table
+                    show_table(latest_data, f"{selected_site}-latest")  # Display the table
                 else:
                     st.write("No entries in the last 7 days.")  # Add this to explicitly show if no data exists
 
+                show_duplicates(selected_site)
+
                 # Display all entries after the previous two
                 st.subheader(f"All Data from {selected_site}")
-                st.dataframe(data)
-
-                # Save updated data with "Old" statuses
-                if file_paths[selected_site].endswith('.csv'):
-                    data.to_csv(file_paths[selected_site], index=False)
-                else:
-                    data.to_excel(file_paths[selected_site], index=False)
+                show_table(data, f"{selected_site}-all")
 
         else:
-            st.warning("No data file available for this source.")
-
-# Display the selected site's data by default
-display_data(selected_site)
-
-# Handle rescraping button action with hardcoded wait times and progress bar
-if rescrape_button_sidebar:
-    # Display a message in the sidebar
-    sidebar_message_placeholder.markdown("### ⚠️ Scraping in progress! Please do not click anything. ⚠️")
-
-    # Create a progress bar and update it based on the duration inside the placeholder
-    progress_bar = progress_placeholder.progress(0)
-    total_time = scrape_times.get(selected_rescrape, 150)
-
-    # Start scraping and updating the progress bar concurrently
-    if selected_rescrape == "All":
-        functions = [scrape_isro_data, scrape_invest_india_data, scrape_nal_data, scrape_gem_data, scrape_dst_data,
-                     scrape_bdl_data]
+            st.warning("No data available for this source.")
+
+# Display matches from every source when asked, otherwise the selected site's data
+if search_term and search_everywhere:
+    st.subheader(f"Results for '{search_term}' across all sources:")
+    results = search_all_sources(search_term)
+    if results.empty:
+        st.write("No matches.")
     else:
-        functions = [globals()[f"scrape_{selected_rescrape.lower()}_data"]]
-
-    total_steps = total_time  # Set total steps to the scrape time
-
-    for i in range(total_steps):
-        time.sleep(1)
-        progress_bar.progress((i + 1) / total_steps)  # Update progress bar
-        if i == 0:  # Start scraping only once the progress starts
-            for function in functions:
-                function()  # Perform scraping for the current function
+        show_table(results, "all-sources")
+else:
+    display_data(selected_site)
 
-    st.success(f"{selected_rescrape} scraping completed!")
-    progress_placeholder.empty()  # Clear the progress bar after scraping
+# Queue the requested scrapes; overlapping requests join the job already queued or running for a source
+if rescrape_button_sidebar:
+    for site in (sites if selected_rescrape == "All" else [selected_rescrape]):
+        jobs.request_scrape(site)
+
+# Sidebar panel showing job progress as published by the scheduler, refreshed every few seconds
+@st.fragment(run_every=3)
+def show_scrape_progress():
+    for job in jobs.job_status():
+        label = f"{job['source']}: {job['status']} - {job['pages']} pages, {job['rows']} rows"
+        if job['status'] == 'running':
+            expected = job['expected_pages']
+            fraction = min(job['pages'] / expected, 0.99) if expected else 0.0
+            st.progress(fraction, text=label)
+        elif job['status'] == 'failed':
+            st.error(f"{label} ({job['error']})")
+        else:
+            st.caption(f"{label} (finished {job['finished_at'] or '-'})" if job['status'] == 'done'
+                               else label)
 
-    # Remove the sidebar message after scraping completes
-    sidebar_message_placeholder.empty()
+with st.sidebar:
+    show_scrape_progress()
@@ -0,0 +1,187 @@
+import contextvars
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import requests
+from bs4 import BeautifulSoup
+import http_client
+import host_policy
+import metrics
+
+# HTTP-first scraping of the JavaScript-rendered sources: instead of rendering the page in Chrome and
+# clicking through it, call the JSON endpoint the page fills its table from and fetch the pages
+# concurrently. The endpoint contracts below are what the scrapers expect; anything else, including an
+# endpoint still failing once its retries are used up, raises ContractError, and the caller falls back to
+# the browser.
+
+# Pages fetched at the same time per source (the per-host rate limit still applies)
+CONCURRENCY = int(os.environ.get("SCRAPER_HTTP_CONCURRENCY", 4))
+
+# GEM: GET <base><GEM_API_PATH>?page=N (1-based) ->
+#   {"total_pages": T, "records": [{"id": ..., "descriptor": ..., "specs": ...}, ...]}
+GEM_API_PATH = os.environ.get("SCRAPER_GEM_API_PATH", "/browse_nodes/browse_list_data")
+# ISRO: DataTables server-side processing, GET <base><ISRO_API_PATH>?draw=D&start=S&length=L ->
+#   {"draw": D, "recordsFiltered": N, "data": [[id, organization, title, submission, opening, document link], ...]}
+ISRO_API_PATH = os.environ.get("SCRAPER_ISRO_API_PATH", "/tenderList")
+ISRO_PAGE_LENGTH = 50
+
+# Whitespace the browser collapses when it renders text, and a stand-in for <br> while it does
+WHITESPACE_RE = re.compile(r"[ \t\r\n]+")
+LINE_BREAK = "\x00"
+
+
+# Raised when an endpoint does not answer as its contract says (moved, down, HTML instead of JSON, renamed
+# fields)
+class ContractError(Exception):
+    pass
+
+
+# Function to render text as the browser path reads it (WebElement .text, stripped): whitespace runs
+# collapse to one space and non-breaking spaces are kept as spaces
+def rendered_text(text):
+    lines = WHITESPACE_RE.sub(" ", str(text)).replace("\xa0", " ").split(LINE_BREAK)
+    return "\n".join(line.strip(" ") for line in lines).strip()
+
+
+# Function to read an HTML cell's text as the browser path does; <br> breaks the line
+def cell_text(html):
+    soup = BeautifulSoup(str(html), 'html.parser')
+    for br in soup.find_all('br'):
+        br.replace_with(LINE_BREAK)
+    return rendered_text(soup.get_text())
+
+
+# Function to GET a JSON document under the host policy. HTTP errors, and transient failures that outlast
+# their retries, break the contract.
+def get_json(url):
+    def request():
+        response = http_client.fetch(url, conditional=False)
+        response.raise_for_status()
+        return response
+
+    with metrics.stage("fetch"):
+        try:
+            response = host_policy.call(url, request)
+        except requests.HTTPError as e:
+            raise ContractError(f"{url} answered HTTP {e.response.status_code}") from e
+        except (requests.RequestException, host_policy.CircuitOpenError) as e:
+            raise ContractError(f"{url} unreachable ({type(e).__name__}: {e})") from e
+    metrics.count("bytes", len(response.content))
+    with metrics.stage("parse"):
+        try:
+            return json.loads(response.content)
+        except ValueError as e:
+            raise ContractError(f"{url} did not return JSON") from e
+
+
+# Function to GET several JSON documents concurrently, yielding them in order with at most twice
+# CONCURRENCY in flight. Each fetch runs in a copy of the caller's context so metrics stay attributed
+# to the calling scraper.
+def get_json_many(urls):
+    window = max(1, CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        pending = deque()
+        try:
+            for url in urls:
+                pending.append(executor.submit(contextvars.copy_context().run, get_json, url))
+                if len(pending) >= 2 * window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _field(payload, key, kind):
+    value = payload.get(key) if isinstance(payload, dict) else None
+    if not isinstance(value, kind):
+        raise ContractError(f"expected '{key}' to be {kind.__name__}, got {type(value).__name__}")
+    return value
+
+
+def gem_page_url(base, page):
+    return f"{base}{GEM_API_PATH}?page={page}"
+
+
+# Function to map one GEM page onto [Descriptor, ID, Specs, Scraped Date] rows
+def gem_rows(payload, current_date):
+    rows = []
+    for record in _field(payload, "records", list):
+        try:
+            rows.append([rendered_text(record["descriptor"]), rendered_text(record["id"]),
+                         rendered_text(record["specs"]), current_date])
+        except (KeyError, TypeError) as e:
+            raise ContractError(f"GEM record without {e}") from e
+    return rows
+
+
+# Function to read how many pages the GEM catalogue has (its first page tells)
+def gem_page_count(base):
+    return _field(get_json(gem_page_url(base, 1)), "total_pages", int)
+
+
+# Function to yield the GEM catalogue as (page, rows), pages counted from 0, up to max_pages pages and
+# from start_page on. The first page tells how many pages there are, so it is always fetched unless the
+# caller already knows the count ('pages', e.g. a shard planned from gem_page_count).
+def gem_pages(base, current_date, max_pages, start_page=0, pages=None):
+    if pages is None or start_page == 0:
+        first = get_json(gem_page_url(base, 1))
+        if pages is None:
+            pages = _field(first, "total_pages", int)
+        rows = gem_rows(first, current_date)
+        if not rows:
+            raise ContractError("GEM endpoint returned no records")
+        if start_page == 0:
+            yield 0, rows
+    remaining = range(max(1, start_page), min(pages, max_pages))
+    for page, payload in zip(remaining, get_json_many(gem_page_url(base, page + 1) for page in remaining)):
+        yield page, gem_rows(payload, current_date)
+
+
+def isro_page_url(base, page):
+    return f"{base}{ISRO_API_PATH}?draw={page + 1}&start={page * ISRO_PAGE_LENGTH}&length={ISRO_PAGE_LENGTH}"
+
+
+# Function to map one DataTables page onto the rows the browser path extracts (same skipping rules)
+def isro_rows(payload, base, current_date):
+    rows = []
+    for cells in _field(payload, "data", list):
+        if not isinstance(cells, list) or len(cells) < 6:
+            raise ContractError("ISRO rows are not arrays of 6 cells")
+        texts = [cell_text(cell) for cell in cells[:5]]
+        link = BeautifulSoup(str(cells[5]), 'html.parser').find('a', href=True)
+        if link is None:
+            continue
+        rows.append(texts + [urljoin(f"{base}/home.html", link['href']), current_date])
+    return rows
+
+
+def _isro_page_count(payload):
+    return -(-_field(payload, "recordsFiltered", int) // ISRO_PAGE_LENGTH)
+
+
+# Function to read how many pages of ISRO_PAGE_LENGTH the ISRO tender list has
+def isro_page_count(base):
+    return _isro_page_count(get_json(isro_page_url(base, 0)))
+
+
+# Function to yield the ISRO tender list as (page, rows), pages of ISRO_PAGE_LENGTH counted from 0, up to
+# max_pages pages and from start_page on; 'pages' is the page count when the caller already knows it (see
+# gem_pages)
+def isro_pages(base, current_date, max_pages, start_page=0, pages=None):
+    if pages is None or start_page == 0:
+        first = get_json(isro_page_url(base, 0))
+        if pages is None:
+            pages = _isro_page_count(first)
+        rows = isro_rows(first, base, current_date)
+        if not rows:
+            raise ContractError("ISRO endpoint returned no tenders")
+        if start_page == 0:
+            yield 0, rows
+    remaining = range(max(1, start_page), min(pages, max_pages))
+    for page, payload in zip(remaining, get_json_many(isro_page_url(base, page) for page in remaining)):
+        yield page, isro_rows(payload, base, current_date)
@@ -0,0 +1,59 @@
+import argparse
+import os
+import pathlib
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import get_headless_driver, extract_rows
+
+# Saved copies of the rendered tables that the bulk and per-element extractors read
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURES = {
+    "ISRO": os.path.join(FIXTURES_DIR, "isro_home.html"),
+    "GEM": os.path.join(FIXTURES_DIR, "gem_browse_list.html"),
+}
+
+
+# Function to time both extraction modes on one fixture page and check they return identical records
+def bench_source(driver, source, fixture_path, repeats):
+    driver.get(pathlib.Path(fixture_path).as_uri())
+    results = {}
+    for mode in ("element", "bulk"):
+        timings = []
+        records = None
+        for _ in range(repeats):
+            started = time.perf_counter()
+            records = extract_rows(source, driver, "2024-01-01", mode=mode)
+            timings.append(time.perf_counter() - started)
+        results[mode] = (records, timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk vs per-element table extraction")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--source", choices=sorted(FIXTURES), action="append")
+    args = parser.parse_args()
+
+    mismatches = 0
+    print(f"{'Source':<8}{'Mode':<10}{'Rows':>6}{'Median (ms)':>14}{'Best (ms)':>12}")
+    with get_headless_driver() as driver:
+        for source in args.source or sorted(FIXTURES):
+            results = bench_source(driver, source, FIXTURES[source], args.repeats)
+            for mode, (records, timings) in results.items():
+                rows = records[0] if isinstance(records, tuple) else records
+                print(f"{source:<8}{mode:<10}{len(rows):>6}{statistics.median(timings) * 1000:>14.1f}"
+                      f"{min(timings) * 1000:>12.1f}")
+            element_time = statistics.median(results["element"][1])
+            bulk_time = statistics.median(results["bulk"][1])
+            identical = results["element"][0] == results["bulk"][0]
+            mismatches += not identical
+            print(f"{source:<8}speedup x{element_time / bulk_time:.1f}, identical output: {identical}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
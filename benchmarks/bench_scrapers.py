@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from replay_server import start_server
+
+SOURCES = ['NAL', 'Invest India', 'GEM', 'ISRO', 'DST', 'Srijan', 'BDL']
+HISTORY_SIZES = [0, 10000, 100000]
+# Slowdown (fraction of the baseline) above which a result is reported as a regression
+TOLERANCE = 0.2
+
+# Columns of the synthetic history records seeded into the store before a scrape
+HISTORY_COLUMNS = {
+    'NAL': ['Tender No', 'Description', 'Last Date', 'Document', 'Scraped Date'],
+    'Invest India': ['Tender Head', 'Tender List Inner', 'Scraped Date'],
+    'GEM': ['Descriptor', 'ID', 'Specs', 'Scraped Date'],
+    'ISRO': ['Tender ID', 'Organization', 'Title', 'Submission Date', 'Opening Date', 'Tender Document',
+             'Scraped Date'],
+    'DST': ['Title', 'Link', 'Description', 'Scraped Date'],
+    'Srijan': ['Product Title', 'Last Updated', 'Scraped Date'],
+    'BDL': ['Department/Unit', 'Tender No', 'Due Date', 'Tender Description', 'Tender Link', 'Tender ID',
+            'Corrigendum', 'Scraped Date'],
+}
+
+
+# Function to build n synthetic history records for a source (keys never collide with the fixtures)
+def history_records(source, n):
+    columns = HISTORY_COLUMNS[source]
+    return [{column: ('2023-01-01' if column == 'Scraped Date' else f"history-{column}-{i}") for column in columns}
+            for i in range(n)]
+
+
+# Function run in a fresh subprocess: seed the history, run one scraper against the replay server, report JSON
+def run_worker(source, history):
+    import metrics
+    import progress
+    import scraper
+    import store
+
+    # Metrics supply the bytes transferred and the time spent loading pages (the log stays in the work dir)
+    metrics.enable(log_path="metrics.jsonl")
+
+    if history:
+        store.upsert_records(source, history_records(source, history), kind='import')
+
+    counts = {'pages': 0, 'rows': 0}
+
+    def count(pages, rows, message):
+        counts['pages'] += pages
+        counts['rows'] += rows
+
+    started = time.perf_counter()
+    with progress.reporting_to(count):
+        scraper.SCRAPERS_BY_SOURCE[source]()
+    wall_time = time.perf_counter() - started
+    scraper.DRIVER_POOL.shutdown()
+    stages, counters = metrics.source_snapshot(source)
+
+    return {
+        'source': source,
+        'history': history,
+        'wall_time': round(wall_time, 3),
+        'pages': counts['pages'],
+        'rows': counts['rows'],
+        'pages_per_sec': round(counts['pages'] / wall_time, 2) if wall_time else 0.0,
+        'rows_per_sec': round(counts['rows'] / wall_time, 1) if wall_time else 0.0,
+        'write_time': round(stages.get('store_write', 0.0), 3),
+        'bytes': counters.get('bytes', 0),
+        'load_time': round(stages.get('navigation', 0.0) + stages.get('page_wait', 0.0), 3),
+        # ru_maxrss is in KiB on Linux; children covers the chromedriver/Chrome processes once they exit
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'peak_child_rss_mb': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+# Function to benchmark one source at one history size in an isolated subprocess and working directory
+def bench(source, history, base_url, extra_env=None):
+    with tempfile.TemporaryDirectory() as workdir:
+        # The replay server is local, so the per-host rate limit is lifted (SCRAPER_RATE_LIMIT=0)
+        env = dict(os.environ, SCRAPER_BASE_URL=base_url, SCRAPER_FULL_CRAWL="1", SCRAPER_RATE_LIMIT="0",
+                   TENDER_DB=os.path.join(workdir, "tenders.db"), PYTHONPATH=REPO_DIR, **(extra_env or {}))
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", source,
+                                    "--history", str(history)],
+                                   cwd=workdir, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'source': source, 'history': history, 'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# Function to compare results with a saved baseline; returns the list of regressions
+def compare(results, baseline, tolerance=TOLERANCE):
+    previous = {(entry['source'], entry['history']): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry['source'], entry['history']))
+        if not before or 'error' in entry or 'error' in before:
+            continue
+        for metric in ('wall_time', 'write_time'):
+            if before[metric] > 0 and entry[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{entry['source']} (history {entry['history']}): {metric} "
+                                   f"{before[metric]:.3f}s -> {entry[metric]:.3f}s")
+        if entry['rows'] < before['rows']:
+            regressions.append(f"{entry['source']} (history {entry['history']}): rows {before['rows']} -> "
+                               f"{entry['rows']}")
+    return regressions
+
+
+# Function to print what a setting saves per source, e.g. the lean browser profile against the full one
+def print_savings(results, other_results, label):
+    other = {(entry['source'], entry['history']): entry for entry in other_results}
+    print(f"\nSaved compared with {label}:")
+    print(f"{'Source':<14}{'History':>9}{'Bytes':>14}{'Load time (s)':>15}{'Wall (s)':>10}")
+    for entry in results:
+        before = other.get((entry['source'], entry['history']))
+        if not before or 'error' in entry or 'error' in before:
+            continue
+        print(f"{entry['source']:<14}{entry['history']:>9}{before.get('bytes', 0) - entry.get('bytes', 0):>14}"
+              f"{before.get('load_time', 0.0) - entry.get('load_time', 0.0):>15.3f}"
+              f"{before['wall_time'] - entry['wall_time']:>10.2f}")
+
+
+def print_results(results):
+    print(f"{'Source':<14}{'History':>9}{'Wall (s)':>10}{'Pages':>7}{'Pages/s':>9}{'Rows':>7}{'Rows/s':>9}"
+          f"{'Write (s)':>11}{'KB':>9}{'Load (s)':>10}{'RSS (MB)':>10}{'Child RSS':>11}")
+    for entry in results:
+        if 'error' in entry:
+            print(f"{entry['source']:<14}{entry['history']:>9}  failed: {' '.join(entry['error'])}")
+            continue
+        print(f"{entry['source']:<14}{entry['history']:>9}{entry['wall_time']:>10.2f}{entry['pages']:>7}"
+              f"{entry['pages_per_sec']:>9.2f}{entry['rows']:>7}{entry['rows_per_sec']:>9.1f}"
+              f"{entry['write_time']:>11.3f}{entry.get('bytes', 0) / 1024:>9.1f}{entry.get('load_time', 0.0):>10.3f}"
+              f"{entry['peak_rss_mb']:>10.1f}{entry['peak_child_rss_mb']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every scraper against the offline replay of its site")
+    parser.add_argument("--source", choices=SOURCES, action="append")
+    parser.add_argument("--history-size", type=int, action="append", help=f"default: {HISTORY_SIZES}")
+    parser.add_argument("--baseline", help="compare with this saved result file and fail on regressions")
+    parser.add_argument("--save", help="write the results to this file (e.g. to become the new baseline)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra environment for the scrapers, e.g. SCRAPER_MODE_GEM=browser")
+    parser.add_argument("--versus", action="append", default=[], metavar="NAME=VALUE",
+                        help="also run with this setting and print what the default saves, "
+                             "e.g. SCRAPER_BROWSER_PROFILE=full")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--history", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.history)))
+        return 0
+
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    server, base_url = start_server()
+    try:
+        cases = [(source, history) for source in args.source or SOURCES
+                 for history in args.history_size or HISTORY_SIZES]
+        results = [bench(source, history, base_url, extra_env) for source, history in cases]
+        versus_env = dict(extra_env, **dict(item.split("=", 1) for item in args.versus))
+        versus_results = [bench(source, history, base_url, versus_env) for source, history in cases] \
+            if args.versus else []
+    finally:
+        server.shutdown()
+    print_results(results)
+    if versus_results:
+        print_savings(results, versus_results, " ".join(args.versus))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import json
+import os
+import random
+
+# Writes the offline copies of every source site replayed by bench_scrapers.py. The live sites cannot be
+# reached from the build machines, so these reproduce the markup each scraper reads (same tags, classes,
+# pagination controls) with deterministic content. Re-run after changing a scraper's selectors.
+SITES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sites")
+
+WORDS = ["radar", "antenna", "titanium", "forging", "propellant", "tank", "connector", "cable", "UAV", "battery",
+         "gyroscope", "servo", "actuator", "composite", "prepreg", "telemetry", "transceiver", "night", "vision",
+         "binocular", "generator", "shelter", "camouflage", "fuze", "sonar", "hydraulic", "valve", "bearing"]
+UNITS = ["VSSC", "LPSC", "SAC", "URSC", "SDSC SHAR", "IPRC", "Missile Division", "Naval Systems", "Avionics Unit"]
+
+
+def phrase(rng, words=4):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def date(rng, year=2024):
+    return f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{year}"
+
+
+# Every page pulls in the kind of assets the real sites carry (stylesheet, web font, images, analytics tag),
+# so the browser profile's resource blocking shows up in the benchmark's bytes and load times
+ASSETS = ('<link rel="stylesheet" href="/assets/site.css">'
+          '<script async src="/assets/gtag/js?id=G-FIXTURE"></script>')
+BANNER = '<img src="/assets/banner.jpg" alt=""><img src="/assets/logo.png" alt="">'
+
+
+def page(title, body, script=""):
+    return (f"<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>{title}</title>{ASSETS}</head>\n"
+            f"<body>\n{BANNER}\n{body}\n{script}</body>\n</html>\n")
+
+
+def write(path, content):
+    path = os.path.join(SITES_DIR, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+# Client-side pager: clicking the selector swaps the table body for the next <template id="page-N">
+# and removes the control on the last page, like the DataTables/Angular pagers on ISRO and GEM
+PAGER_SCRIPT = """<script>
+(function () {
+    var current = 0, total = document.querySelectorAll('template[id^="page-"]').length;
+    var next = document.querySelector('%(selector)s');
+    var tbody = document.querySelector('%(tbody)s');
+    tbody.innerHTML = document.getElementById('page-0').innerHTML;
+    next.addEventListener('click', function (event) {
+        event.preventDefault();
+        if (current + 1 >= total) { return; }
+        current += 1;
+        setTimeout(function () {
+            tbody.innerHTML = document.getElementById('page-' + current).innerHTML;
+            if (current + 1 >= total) { %(remove)s }
+        }, %(delay)d);
+    });
+})();
+</script>
+"""
+
+
+def write_bytes(path, content):
+    path = os.path.join(SITES_DIR, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+# Function to write the shared assets: filler bytes of realistic sizes (only their transfer matters). They
+# are not committed; the replay server writes them on startup when they are missing (see ensure_assets).
+def make_assets(rng):
+    write("assets/site.css", "@font-face { font-family: 'Site'; src: url('/assets/site.woff2'); }\n"
+                             "body { font-family: 'Site', sans-serif; }\n" + "/* layout */\n" * 400)
+    write_bytes("assets/site.woff2", rng.randbytes(40 * 1024))
+    write_bytes("assets/banner.jpg", rng.randbytes(120 * 1024))
+    write_bytes("assets/logo.png", rng.randbytes(15 * 1024))
+    write("assets/gtag/js", "/* analytics tag */\n" + "var _t = 0;\n" * 3000)
+
+
+# Function to write the shared assets unless they are already there
+def ensure_assets():
+    if not os.path.isdir(os.path.join(SITES_DIR, "assets")):
+        make_assets(random.Random(0))
+
+
+def make_isro(rng, pages=3, rows=50):
+    templates = []
+    for number in range(pages):
+        trs, data = [], []
+        for i in range(rows):
+            n = number * rows + i
+            cells = [f"ISRO/{2024}/{10000 + n}", rng.choice(UNITS), phrase(rng, 6), f"{date(rng)} 15:00",
+                     f"{date(rng)} 15:30", f'<a href="tenderDocument.html?tenderId={10000 + n}">View</a>']
+            trs.append(f'<tr role="row" class="{"odd" if i % 2 == 0 else "even"}">'
+                       + "".join(f"<td>{cell}</td>" for cell in cells) + '</tr>')
+            data.append(cells)
+        templates.append(f'<template id="page-{number}">{"".join(trs)}</template>')
+        # DataTables server-side endpoint serving the same rows (api_sources.ISRO_API_PATH)
+        suffix = "" if number == 0 else f"_page_{number}"
+        write(f"isro/tenderList{suffix}.json", json.dumps({"draw": number + 1, "recordsTotal": pages * rows,
+                                                           "recordsFiltered": pages * rows, "data": data}))
+    body = ('<table id="tenderListTable" class="dataTable"><thead><tr><th>Tender ID</th><th>Organization</th>'
+            '<th>Title</th><th>Submission Date</th><th>Opening Date</th><th>Document</th></tr></thead>'
+            '<tbody></tbody></table>\n<div class="dataTables_paginate">'
+            '<a class="paginate_button previous" aria-controls="tenderListTable" data-dt-idx="0">Previous</a>'
+            '<a class="paginate_button next" aria-controls="tenderListTable" data-dt-idx="4" href="#">Next</a>'
+            '</div>\n' + "\n".join(templates))
+    script = PAGER_SCRIPT % {"selector": "a[data-dt-idx='4']", "tbody": "#tenderListTable tbody",
+                             "remove": "", "delay": 300}
+    write("isro/home.html", page("ISRO e-Procurement", body, script))
+
+
+def make_gem(rng, pages=10, rows=50):
+    templates = []
+    for number in range(pages):
+        trs, records = [], []
+        for _ in range(rows):
+            descriptor = phrase(rng, 3)
+            record = {"id": f"{descriptor[:3].upper()}{rng.randint(10 ** 6, 10 ** 7)}", "descriptor": descriptor,
+                      "specs": phrase(rng, 8)}
+            trs.append(f'<tr class="ng-scope"><td class="ng-binding">{record["id"]}</td><td class="ng-binding">'
+                       f'{descriptor}</td><td class="ng-binding">{record["specs"]}</td></tr>')
+            records.append(record)
+        templates.append(f'<template id="page-{number}">{"".join(trs)}</template>')
+        # JSON endpoint the catalogue table is filled from (api_sources.GEM_API_PATH), pages numbered from 1
+        write(f"gem/browse_nodes/browse_list_data_page_{number + 1}.json",
+              json.dumps({"page": number + 1, "total_pages": pages, "records": records}))
+    body = ('<div class="ng-scope"><table class="table"><thead><tr><th>ID</th><th>Descriptor</th><th>Specs</th>'
+            '</tr></thead><tbody></tbody></table>\n<ul class="pagination">'
+            '<li class="pagination-next ng-scope"><a href="">Next</a></li></ul></div>\n' + "\n".join(templates))
+    script = PAGER_SCRIPT % {"selector": "li.pagination-next > a", "tbody": "table tbody",
+                             "remove": "document.querySelector('li.pagination-next').remove();", "delay": 300}
+    write("gem/browse_nodes/browse_list.html", page("GeM Marketplace", body, script))
+
+
+def make_invest_india(rng, rows=30):
+    blocks = [f'<div class="tender-list"><h3>{phrase(rng, 5)}</h3><div class="tender-list-inner">'
+              f'Last date: {date(rng)}. {phrase(rng, 12)}.</div></div>' for _ in range(rows)]
+    write("invest_india/request-for-proposal.html", page("Request for Proposal", "\n".join(blocks)))
+
+
+def make_nal(rng, rows=60):
+    trs = ['<tr><td>Tender No</td><td>Description</td><td>Last Date</td><td>Document</td></tr>']
+    for n in range(rows):
+        trs.append(f'<tr><td>NAL/PUR/{2024}/{500 + n}</td><td>{phrase(rng, 7)}</td><td>{date(rng)}</td>'
+                   f'<td><a href="/sites/default/files/tender_{500 + n}.pdf">Download</a></td></tr>')
+    write("nal/en/tender-purchase.html", page("Tender / Purchase", f'<table>{"".join(trs)}</table>'))
+
+
+def make_dst(rng, pages=4, rows=10):
+    for number in range(pages):
+        results = [f'<li class="search-result"><h3 class="title"><a href="/node/{9000 + number * rows + i}">'
+                   f'{phrase(rng, 6)}</a></h3><div class="search-snippet-info"><p class="search-snippet">'
+                   f'{phrase(rng, 20)}</p></div></li>' for i in range(rows)]
+        pager = (f'<ul class="pager"><li class="pager-next"><a href="?page={number + 1}">next</a></li></ul>'
+                 if number + 1 < pages else '<ul class="pager"></ul>')
+        suffix = "" if number == 0 else f"_page_{number}"
+        write(f"dst/search/node/grants{suffix}.html",
+              page("Search", f'<ol class="search-results">{"".join(results)}</ol>\n{pager}'))
+
+
+def make_srijan(rng, rows=40):
+    cards = [f'<div class="card"><div class="card-body homecard"><p class="product-title">{phrase(rng, 4)}</p>'
+             f'<div id="dlproduct_Tr233_{n}">Last Updated :- {date(rng).replace("-", "/")}</div></div></div>'
+             for n in range(rows)]
+    write("srijan/index.html", page("Srijan Defence", "\n".join(cards)))
+
+
+def make_bdl(rng, rows=100):
+    tenders = []
+    for n in range(rows):
+        tenders.append(
+            f'<div class="tender m-top_1"><table><tr><td class="a-left tenderfields">'
+            f'Department/Unit: {rng.choice(UNITS)} | Tender No: BDL/{2024}/{700 + n} | Due Date: {date(rng)}</td>'
+            f'<td class="a-right">Tender ID: {40000 + n} | Corrigendum: {rng.randint(0, 2)}</td></tr>'
+            f'<tr><td colspan="2"><a href="TenderDetails.jsp?id={40000 + n}">{phrase(rng, 8)}</a></td></tr>'
+            f'</table></div>')
+    write("bdl/ssoeprocurement/EProc.jsp.html", page("BDL e-Procurement", "\n".join(tenders)))
+
+
+def main():
+    rng = random.Random(2024)
+    for make in (make_isro, make_gem, make_invest_india, make_nal, make_dst, make_srijan, make_bdl):
+        make(rng)
+    make_assets(random.Random(0))
+    print(f"Fixtures written to {SITES_DIR}")
+
+
+if __name__ == "__main__":
+    main()
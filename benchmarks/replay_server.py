@@ -0,0 +1,90 @@
+import argparse
+import mimetypes
+import os
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import make_fixtures
+
+# Local HTTP server replaying the fixture copies of every source site (see make_fixtures.py).
+# Sites live under /<source>/ so scrapers reach them with SCRAPER_BASE_URL=http://127.0.0.1:<port>.
+SITES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sites")
+
+
+# Function to map a request path (and ?page=N, or DataTables' ?start=S&length=L) onto a fixture file, or None
+def fixture_path(url):
+    parts = urlsplit(url)
+    path = os.path.normpath(parts.path.lstrip("/"))
+    if path.startswith(".."):
+        return None
+    query = parse_qs(parts.query)
+    page = query.get("page", ["0"])[0]
+    if "start" in query and "length" in query:
+        page = str(int(query["start"][0]) // max(1, int(query["length"][0])))
+    base = os.path.join(SITES_DIR, path)
+    candidates = ([os.path.join(base, "index.html")] if parts.path.endswith("/")
+                  else [base, base + ".html", base + ".json"])
+    for candidate in candidates:
+        if page not in ("", "0"):
+            root, ext = os.path.splitext(candidate if candidate.endswith((".html", ".json")) else candidate + ".html")
+            candidate = f"{root}_page_{page}{ext}"
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+class ReplayHandler(SimpleHTTPRequestHandler):
+    def send_head(self):
+        path = fixture_path(self.path)
+        if path is None:
+            self.send_error(404, "No fixture for this URL")
+            return None
+        f = open(path, "rb")
+        stat = os.fstat(f.fileno())
+        etag = f'"{int(stat.st_mtime)}-{stat.st_size}"'
+        last_modified = self.date_time_string(stat.st_mtime)
+        # Answer conditional requests like a real site would, so the HTTP client's cache can be exercised
+        if self.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == last_modified):
+            f.close()
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return None
+        self.send_response(200)
+        content_type = mimetypes.guess_type(path)[0] or "text/html"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(stat.st_size))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        return f
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Function to start the replay server in a background thread; returns (server, base_url)
+def start_server(port=0):
+    make_fixtures.ensure_assets()
+    server = ThreadingHTTPServer(("127.0.0.1", port), ReplayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the fixture copies of the source sites")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server, base_url = start_server(args.port)
+    print(f"Replaying sites at {base_url} (export SCRAPER_BASE_URL={base_url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+import metrics
+
+# Maximum number of Chrome processes alive at the same time (bounds memory when sources run in parallel)
+MAX_BROWSERS = int(os.environ.get("SCRAPER_MAX_BROWSERS", 2))
+# Number of scrapes a browser serves before it is replaced by a fresh one
+MAX_USES = int(os.environ.get("SCRAPER_BROWSER_MAX_USES", 10))
+# Seconds a scraper waits for a free browser before giving up (a scraper abandoned by the run's timeout
+# watchdog keeps its browser until it finishes)
+SLOT_TIMEOUT = float(os.environ.get("SCRAPER_BROWSER_WAIT", 600))
+
+# Browser profile: "lean" (default) returns from page loads once the DOM is ready, uses a small window,
+# no extensions, and blocks resources the scrapers never read; "full" is a plain headless Chrome
+PROFILE = os.environ.get("SCRAPER_BROWSER_PROFILE", "lean")
+WINDOW_SIZE = os.environ.get("SCRAPER_WINDOW_SIZE", "1024,768")
+# URL patterns (wildcards, as taken by Chrome's Network.setBlockedURLs) for each kind of resource
+BLOCK_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.bmp*'],
+    'font': ['*.woff*', '*.ttf*', '*.otf*', '*.eot*'],
+    'stylesheet': ['*.css*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.ogg*'],
+    'tracker': ['*google-analytics.com*', '*googletagmanager.com*', '*/gtag/js*', '*doubleclick.net*',
+                '*facebook.net*', '*hotjar.com*', '*clarity.ms*'],
+}
+# Kinds blocked for every source; SCRAPER_BLOCK_<SOURCE> (e.g. SCRAPER_BLOCK_DST=image,font,stylesheet)
+# replaces the list for one source and SCRAPER_BLOCK_URLS_<SOURCE> adds comma-separated URL patterns.
+# Stylesheets stay allowed by default: element text depends on what CSS shows or hides.
+BLOCKED_KINDS = os.environ.get("SCRAPER_BLOCK", "image,font,media,tracker")
+
+
+# Function to get the URL patterns blocked while a source is being scraped (none with the full profile)
+def blocked_patterns(source=None):
+    if PROFILE != "lean":
+        return []
+    slug = source.upper().replace(' ', '_') if source else None
+    kinds = os.environ.get(f"SCRAPER_BLOCK_{slug}", BLOCKED_KINDS) if slug else BLOCKED_KINDS
+    patterns = [pattern for kind in kinds.split(",") if kind.strip() for pattern in BLOCK_PATTERNS[kind.strip()]]
+    if slug:
+        patterns += [url.strip() for url in os.environ.get(f"SCRAPER_BLOCK_URLS_{slug}", "").split(",") if url.strip()]
+    return patterns
+
+
+# Function to build the Chrome options used by every pooled browser
+def headless_options():
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Enable headless mode
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if PROFILE == "lean":
+        chrome_options.page_load_strategy = "eager"  # driver.get returns at DOMContentLoaded
+        chrome_options.add_argument(f"--window-size={WINDOW_SIZE}")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--disable-background-networking")
+    return chrome_options
+
+
+# Pool of warm headless Chrome instances shared by the Selenium scrapers
+class DriverPool:
+    def __init__(self, max_browsers=MAX_BROWSERS, max_uses=MAX_USES, options_factory=headless_options):
+        self.max_browsers = max(1, max_browsers)
+        self.max_uses = max(1, max_uses)
+        self.options_factory = options_factory
+        self._driver_path = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_browsers)
+        self._idle = []  # [driver, uses] pairs ready to be handed out
+        self._in_use = {}  # id(driver) -> [driver, uses]
+        self._closed = False
+
+    # Resolve the chromedriver binary once per process instead of once per scraper
+    def driver_path(self):
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            return self._driver_path
+
+    def _launch(self):
+        metrics.count("driver_launches")
+        with metrics.stage("driver_launch"):
+            return webdriver.Chrome(service=Service(self.driver_path()), options=self.options_factory())
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    # Function to list the origins the browser's tab visited since its history was last reset
+    @staticmethod
+    def _visited_origins(driver):
+        urls = [driver.current_url]
+        try:
+            urls += [entry['url'] for entry in driver.execute_cdp_cmd("Page.getNavigationHistory", {})['entries']]
+        except Exception:
+            pass
+        origins = set()
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.scheme in ("http", "https") and parts.netloc:
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+        return origins
+
+    # Clear cookies and the storage of every visited origin so the next scraper starts from a clean context.
+    # Storage is cleared per origin (Chrome takes no wildcard); if that fails the error reaches _checkin,
+    # which quits the browser instead of reusing it.
+    @classmethod
+    def _reset(cls, driver):
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            pass  # about:blank and some error pages have no storage
+        driver.delete_all_cookies()
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in cls._visited_origins(driver):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        driver.get("about:blank")
+        driver.execute_cdp_cmd("Page.resetNavigationHistory", {})
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Driver pool has been shut down")
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                entry = [self._launch(), 0]
+            elif not self._is_alive(entry[0]):
+                self._quit(entry[0])
+                continue
+            with self._lock:
+                self._in_use[id(entry[0])] = entry
+            return entry
+
+    # Block the resources the source's scraper does not need (the setting sticks to the browser until reset)
+    @staticmethod
+    def _apply_blocking(driver, source):
+        patterns = blocked_patterns(source)
+        if not patterns:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception:
+            pass  # not a Chromium driver: pages load in full
+
+    def _checkin(self, entry, healthy):
+        driver = entry[0]
+        with self._lock:
+            self._in_use.pop(id(driver), None)
+        entry[1] += 1
+        if healthy and entry[1] < self.max_uses and not self._closed:
+            try:
+                self._reset(driver)
+            except Exception:
+                healthy = False
+            else:
+                with self._lock:
+                    if not self._closed:
+                        self._idle.append(entry)
+                        return
+        self._quit(driver)
+
+    # Context manager handing out a clean browser set up for a source; a browser that raised is recycled,
+    # never reused. Raises TimeoutError when no browser frees up within SLOT_TIMEOUT seconds.
+    @contextmanager
+    def driver(self, source=None):
+        with metrics.stage("driver_wait"):
+            if not self._slots.acquire(timeout=SLOT_TIMEOUT):
+                raise TimeoutError(f"No browser free after {SLOT_TIMEOUT:g}s ({self.max_browsers} in use)")
+        try:
+            with metrics.stage("driver_acquire"):
+                entry = self._checkout()
+                self._apply_blocking(entry[0], source)
+            healthy = False
+            try:
+                yield entry[0]
+                healthy = True
+            except GeneratorExit:
+                healthy = True  # a scraper's page generator was closed early: the browser is fine
+                raise
+            finally:
+                self._checkin(entry, healthy)
+        finally:
+            self._slots.release()
+
+    # Quit every browser, idle or still in use, so no Chrome process outlives the scraper
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            entries = self._idle + list(self._in_use.values())
+            self._idle = []
+            self._in_use = {}
+        for driver, _ in entries:
+            self._quit(driver)
+
+
+# Shared pool used by scraper.py
+DRIVER_POOL = DriverPool()
+atexit.register(DRIVER_POOL.shutdown)
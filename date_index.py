@@ -0,0 +1,103 @@
+import json
+import re
+from datetime import datetime
+
+# Typed dates of every stored tender. The sources print dates as free text in their own formats; they are
+# parsed once, when the tender is stored, into ISO dates ('YYYY-MM-DD', which sort and compare as text) in
+# an indexed table, so time-window queries are index range reads instead of re-parsing columns. Rows share
+# tender_id with tenders.id and are written in the same transaction as the tender.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tender_dates (
+    tender_id INTEGER PRIMARY KEY REFERENCES tenders (id),
+    source TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    scraped_on TEXT,
+    opening_on TEXT,
+    closing_on TEXT,
+    updated_on TEXT
+);
+CREATE INDEX IF NOT EXISTS tender_dates_scraped ON tender_dates (scraped_on, source);
+CREATE INDEX IF NOT EXISTS tender_dates_opening ON tender_dates (opening_on, source);
+CREATE INDEX IF NOT EXISTS tender_dates_closing ON tender_dates (closing_on, source);
+CREATE INDEX IF NOT EXISTS tender_dates_updated ON tender_dates (updated_on, source);
+
+-- Ready-made windows for ad-hoc SQL (local dates); the viewer uses keys_between with its own bounds
+CREATE VIEW IF NOT EXISTS scraped_last_7_days AS
+    SELECT * FROM tender_dates WHERE scraped_on >= date('now', 'localtime', '-7 days');
+CREATE VIEW IF NOT EXISTS closing_next_7_days AS
+    SELECT * FROM tender_dates
+    WHERE closing_on BETWEEN date('now', 'localtime') AND date('now', 'localtime', '+7 days');
+CREATE VIEW IF NOT EXISTS opened_this_week AS
+    SELECT * FROM tender_dates
+    WHERE opening_on BETWEEN date('now', 'localtime', '-6 days', 'weekday 1') AND date('now', 'localtime');
+"""
+
+# Which record column feeds each typed date, per source ('Scraped Date' feeds scraped_on everywhere)
+DATE_FIELDS = {
+    'ISRO': {'opening_on': 'Opening Date', 'closing_on': 'Submission Date'},
+    'BDL': {'closing_on': 'Due Date'},
+    'Srijan': {'updated_on': 'Last Updated'},
+}
+COLUMNS = ('scraped_on', 'opening_on', 'closing_on', 'updated_on')
+
+# The sites write dates day first ("05-11-2024", "05/Nov/2024", "5 November 2024"), often followed by a
+# time, which is dropped
+DATE_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[-/. ][A-Za-z]{3,9}[-/. ]\d{2,4}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}")
+FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%d.%m.%Y', '%d-%m-%y', '%d/%m/%y', '%d.%m.%y', '%d-%b-%Y', '%d-%B-%Y',
+           '%d %b %Y', '%d %B %Y', '%d/%b/%Y', '%d.%b.%Y', '%d-%b-%y')
+
+
+# Function to parse a date as the sources write it; returns 'YYYY-MM-DD', or None when there is no date
+def parse_date(value):
+    if value is None:
+        return None
+    match = DATE_RE.search(str(value))
+    if match is None:
+        return None
+    text = match.group(0)
+    for date_format in FORMATS:
+        try:
+            return datetime.strptime(text, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+# Function to compute the typed dates of a record
+def record_dates(source, record):
+    dates = {'scraped_on': parse_date(record.get('Scraped Date'))}
+    for column, field in DATE_FIELDS.get(source, {}).items():
+        dates[column] = parse_date(record.get(field))
+    return dates
+
+
+# Function to store (or refresh) one tender's dates (called inside the store's write transaction)
+def index_record(conn, rowid, source, key, record):
+    dates = record_dates(source, record)
+    conn.execute(
+        "INSERT OR REPLACE INTO tender_dates (tender_id, source, record_key, scraped_on, opening_on, closing_on, "
+        "updated_on) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (rowid, source, key) + tuple(dates.get(column) for column in COLUMNS))
+
+
+# Function to list the keys of a source's tenders whose date column falls between two ISO dates (inclusive,
+# either bound may be None)
+def keys_between(conn, source, column, since=None, until=None):
+    if column not in COLUMNS:
+        raise ValueError(f"unknown date column {column!r}")
+    query = f"SELECT record_key FROM tender_dates WHERE source = ? AND {column} IS NOT NULL"
+    params = [source]
+    if since:
+        query += f" AND {column} >= ?"
+        params.append(since)
+    if until:
+        query += f" AND {column} <= ?"
+        params.append(until)
+    return [key for key, in conn.execute(query, params)]
+
+
+# Function to rebuild the dates of every stored tender
+def rebuild(conn):
+    conn.execute("DELETE FROM tender_dates")
+    for rowid, source, key, data in conn.execute("SELECT id, source, record_key, data FROM tenders").fetchall():
+        index_record(conn, rowid, source, key, json.loads(data))
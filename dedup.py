@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import numpy as np
+import tender_schema
+import watchlist
+
+# Near-duplicate detection across sources: the same procurement is often listed on several portals under
+# different keys. Each tender's title and description are cut into character shingles and summarized by a
+# MinHash signature; locality-sensitive hashing splits the signature into bands, and tenders sharing any
+# band bucket are candidates. A new tender is only compared with its candidates (an index lookup per band),
+# never with the whole history. Candidates from other sources whose estimated similarity reaches THRESHOLD
+# are recorded as duplicates, in the same transaction that stores the tender. Signatures of a batch of
+# tenders are computed together (vectorized) once the batch's upserts are done.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash_signatures (
+    tender_id INTEGER PRIMARY KEY REFERENCES tenders (id),
+    source TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dedup_buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    tender_id INTEGER NOT NULL REFERENCES tenders (id),
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dedup_buckets_bucket ON dedup_buckets (band, bucket, source, tender_id);
+CREATE INDEX IF NOT EXISTS dedup_buckets_tender ON dedup_buckets (tender_id);
+
+-- Pairs of tenders from different sources that look like the same procurement (tender_id was indexed last)
+CREATE TABLE IF NOT EXISTS duplicates (
+    tender_id INTEGER NOT NULL REFERENCES tenders (id),
+    duplicate_of INTEGER NOT NULL REFERENCES tenders (id),
+    similarity REAL NOT NULL,
+    PRIMARY KEY (tender_id, duplicate_of)
+);
+CREATE INDEX IF NOT EXISTS duplicates_of ON duplicates (duplicate_of);
+"""
+
+# Estimated Jaccard similarity from which two tenders count as duplicates
+THRESHOLD = float(os.environ.get("SCRAPER_DEDUP_THRESHOLD", 0.6))
+# Signature length = BANDS x ROWS; pairs become candidates around (1 / BANDS) ** (1 / ROWS) = 0.5 similarity
+BANDS = 16
+ROWS = 4
+SHINGLE_SIZE = 5
+# Texts shorter than this (after normalization) are too short to compare meaningfully
+MIN_LENGTH = 12
+# Candidates read per band: bounds the work for boilerplate texts that half a source shares
+MAX_CANDIDATES = 200
+
+# Each shingle is hashed to 64 bits once (a polynomial over its characters); the signature's hash functions
+# are then multiply-shift universal hashes h(x) = (a * x + b) mod 2^64 with odd a, followed by a xor-shift
+# mix. Fixed seeds keep signatures comparable across runs.
+_PRIME = np.uint64(0x100000001B3)
+
+
+def _seeds(salt):
+    return np.frombuffer(b"".join(hashlib.blake2b(bytes([n]), digest_size=8, salt=salt).digest()
+                                  for n in range(BANDS * ROWS)), dtype='<u8').reshape(-1, 1)
+
+
+_A = _seeds(b"multiplier") | np.uint64(1)
+_B = _seeds(b"increment")
+
+
+# Function to get the text a tender is compared on: its unified title and description
+def dedup_text(source, key, record):
+    unified = tender_schema.unify(source, key, record)
+    return watchlist.normalize(' '.join(filter(None, (unified['title'], unified['description'])))).strip()
+
+
+# Function to hash every distinct character shingle of a text to 64 bits
+def shingle_hashes(text):
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < SHINGLE_SIZE:
+        codes = np.concatenate([codes, np.zeros(SHINGLE_SIZE - len(codes), dtype=np.uint64)])
+    count = len(codes) - SHINGLE_SIZE + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(SHINGLE_SIZE):
+            hashes = hashes * _PRIME + codes[offset:offset + count]
+    return np.unique(hashes)
+
+
+# Function to compute the MinHash signature of a text: per hash function, the lowest hash of any shingle
+def signature(text):
+    with np.errstate(over='ignore'):
+        hashed = _A * shingle_hashes(text) + _B
+        hashed ^= hashed >> np.uint64(29)
+        hashed *= np.uint64(0xBF58476D1CE4E5B9)
+        hashed ^= hashed >> np.uint64(32)
+    return hashed.min(axis=1)
+
+
+# Function to estimate the Jaccard similarity of two signatures
+def similarity(first, second):
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+# Function to hash each band of a signature into its bucket (a signed 64-bit integer, as SQLite stores them)
+def band_buckets(sig):
+    packed = sig.astype('<u8').tobytes()
+    band_size = ROWS * 8
+    return [int.from_bytes(hashlib.blake2b(packed[band * band_size:(band + 1) * band_size], digest_size=8).digest(),
+                           'little', signed=True) for band in range(BANDS)]
+
+
+def _load_signature(blob):
+    return np.frombuffer(blob, dtype='<u8')
+
+
+# Function to index stored tenders, given as (rowid, source, key, record), and record their duplicates in
+# other sources (called inside the store's write transaction, after the batch's upserts). The signatures
+# are all computed first; tenders are then indexed in order, so later ones see earlier ones. Returns how
+# many duplicates were found.
+def index_records(conn, items):
+    signed = []
+    for rowid, source, key, record in items:
+        text = dedup_text(source, key, record)
+        signed.append((rowid, source, signature(text) if len(text) >= MIN_LENGTH else None))
+    return sum(_index_signature(conn, rowid, source, sig) for rowid, source, sig in signed)
+
+
+# Function to index one stored tender (see index_records)
+def index_record(conn, rowid, source, key, record):
+    return index_records(conn, [(rowid, source, key, record)])
+
+
+# Function to store a tender's signature and buckets and record its duplicates. Earlier pairs in both
+# directions are dropped first: the tender's text may have changed since they were found.
+def _index_signature(conn, rowid, source, sig):
+    conn.execute("DELETE FROM dedup_buckets WHERE tender_id = ?", (rowid,))
+    conn.execute("DELETE FROM duplicates WHERE tender_id = ? OR duplicate_of = ?", (rowid, rowid))
+    if sig is None:
+        conn.execute("DELETE FROM minhash_signatures WHERE tender_id = ?", (rowid,))
+        return 0
+    buckets = band_buckets(sig)
+
+    # Only other sources' entries of each bucket are read (ranges of the bucket index)
+    others = [other for other in tender_schema.MAPPERS if other != source]
+    marks = ', '.join('?' * len(others))
+    candidates = set()
+    for band, bucket in enumerate(buckets):
+        candidates.update(tender_id for tender_id, in conn.execute(
+            f"SELECT tender_id FROM dedup_buckets WHERE band = ? AND bucket = ? AND source IN ({marks}) LIMIT ?",
+            [band, bucket] + others + [MAX_CANDIDATES]))
+    found = 0
+    for candidate in candidates:
+        row = conn.execute("SELECT signature FROM minhash_signatures WHERE tender_id = ?", (candidate,)).fetchone()
+        if row is None:
+            continue
+        score = similarity(sig, _load_signature(row[0]))
+        if score >= THRESHOLD:
+            conn.execute("INSERT OR REPLACE INTO duplicates (tender_id, duplicate_of, similarity) VALUES (?, ?, ?)",
+                         (rowid, candidate, score))
+            found += 1
+
+    conn.execute("INSERT OR REPLACE INTO minhash_signatures (tender_id, source, signature) VALUES (?, ?, ?)",
+                 (rowid, source, sig.astype('<u8').tobytes()))
+    conn.executemany("INSERT INTO dedup_buckets (band, bucket, tender_id, source) VALUES (?, ?, ?, ?)",
+                     ((band, bucket, rowid, source) for band, bucket in enumerate(buckets)))
+    return found
+
+
+# Function to rebuild the signatures, buckets and duplicates of every stored tender, oldest first
+def rebuild(conn):
+    for table in ('duplicates', 'dedup_buckets', 'minhash_signatures'):
+        conn.execute(f"DELETE FROM {table}")
+    rows = conn.execute("SELECT id, source, record_key, data FROM tenders ORDER BY id").fetchall()
+    index_records(conn, [(rowid, source, key, json.loads(data)) for rowid, source, key, data in rows])
@@ -0,0 +1,325 @@
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urlsplit
+import requests
+from bs4 import BeautifulSoup
+import http_client
+import host_policy
+import metrics
+import search_index
+import store
+
+# PDF text extraction is optional: without pypdf, PDFs are still downloaded and stored, just not searchable
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+# Tender document pipeline: downloads the documents tenders link to (ISRO's 'Tender Document', BDL's
+# 'Tender Link'), a few at a time under the per-host policy, resuming interrupted transfers. Files are
+# stored under their SHA-256, so a document linked from several tenders or URLs is kept once. Text is
+# extracted in a process pool and indexed with the tenders it belongs to, so store.search finds words
+# inside the documents without downloading them again.
+DOCS_DIR = os.environ.get("SCRAPER_DOCS_DIR", "documents")
+# Downloads in flight and text-extraction processes
+CONCURRENCY = int(os.environ.get("SCRAPER_DOC_CONCURRENCY", 4))
+EXTRACT_WORKERS = int(os.environ.get("SCRAPER_DOC_WORKERS", min(4, os.cpu_count() or 1)))
+# Larger documents are abandoned
+MAX_BYTES = int(float(os.environ.get("SCRAPER_DOC_MAX_MB", 50)) * 1024 * 1024)
+# A failed link is tried again by later runs until it has failed this many times
+MAX_ATTEMPTS = 3
+# Change-feed consumer whose watermark marks the tender changes already checked for new or changed links
+DOCUMENTS_CONSUMER = 'documents'
+# Name under which the watermarks table keeps the highest tender id checked for links, per source (tenders
+# stored without a change, e.g. imported ones, are found above it)
+DOCUMENTS_SCANNED = 'documents:tenders'
+# Characters of extracted text kept per document
+MAX_TEXT = 200000
+CHUNK_SIZE = 1 << 16
+
+# Record columns holding document links, per source
+DOCUMENT_FIELDS = {
+    'ISRO': ['Tender Document'],
+    'BDL': ['Tender Link'],
+}
+
+SPACE_RE = re.compile(r"\s+")
+
+
+# Raised when a document is larger than MAX_BYTES
+class DocumentTooLarge(Exception):
+    pass
+
+
+def _partial_path(url):
+    return os.path.join(DOCS_DIR, "partial", hashlib.sha256(url.encode()).hexdigest() + ".part")
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Function to download a URL into its partial file, continuing from where an interrupted transfer stopped
+# when the server supports ranges and the file has not changed (If-Range). Returns the partial file's
+# metadata (validators and content type).
+def _transfer(url):
+    part = _partial_path(url)
+    meta_path = part + ".json"
+    meta = _read_json(meta_path)
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {}
+    validator = meta.get('etag') or meta.get('last_modified')
+    if offset and validator:
+        headers = {'Range': f'bytes={offset}-', 'If-Range': validator}
+
+    response = http_client.session_for(url).get(url, headers=headers, timeout=http_client.TIMEOUT, stream=True)
+    with response:
+        if response.status_code == 416 and headers:
+            # The partial file does not fit the document any more: start over (retried as a transient error)
+            os.remove(part)
+            raise requests.ConnectionError(f"{url} cannot resume, restarting the download")
+        response.raise_for_status()
+        resumed = bool(headers) and response.status_code == 206
+        if not resumed:
+            offset = 0
+            meta = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'),
+                    'content_type': response.headers.get('Content-Type', '').split(';')[0].strip() or None}
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+        try:
+            with open(part, "ab" if resumed else "wb") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    offset += len(chunk)
+                    metrics.count("bytes", len(chunk))
+                    if offset > MAX_BYTES:
+                        raise DocumentTooLarge(f"{url} is larger than {MAX_BYTES // (1024 * 1024)} MB")
+        except requests.exceptions.ChunkedEncodingError as e:
+            # The connection dropped mid-body: keep what arrived and let the retry resume from there
+            raise requests.ConnectionError(str(e)) from e
+    return meta
+
+
+# Function to move a finished download into the content-addressed store; returns the document's details
+def _store_file(url, meta):
+    part = _partial_path(url)
+    digest = hashlib.sha256()
+    size = 0
+    with open(part, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    sha256 = digest.hexdigest()
+    content_type = meta.get('content_type')
+    extension = os.path.splitext(urlsplit(url).path)[1].lower()[:8] \
+        or (mimetypes.guess_extension(content_type) if content_type else None) or ""
+    path = os.path.join(DOCS_DIR, sha256[:2], sha256[2:4], sha256 + extension)
+    if os.path.exists(path):
+        os.remove(part)  # the same bytes are already stored
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(part, path)
+    if os.path.exists(part + ".json"):
+        os.remove(part + ".json")
+    return {'sha256': sha256, 'path': path, 'size': size, 'content_type': content_type}
+
+
+# Function to download one document (run in the download pool); transient errors are retried and resumed
+def download(url):
+    os.makedirs(os.path.dirname(_partial_path(url)), exist_ok=True)
+    with metrics.stage("download"):
+        try:
+            meta = host_policy.call(url, lambda: _transfer(url))
+        except DocumentTooLarge:
+            for path in (_partial_path(url), _partial_path(url) + ".json"):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+    return _store_file(url, meta)
+
+
+# Function to extract the text of a stored document (run in the process pool); None for formats without text
+def extract_text(path, content_type):
+    with open(path, "rb") as f:
+        head = f.read(5)
+    if head == b"%PDF-" or content_type == "application/pdf":
+        if pypdf is None:
+            return None
+        text = " ".join(page.extract_text() or "" for page in pypdf.PdfReader(path).pages)
+    elif content_type in ("text/html", "application/xhtml+xml") or path.endswith((".htm", ".html", ".jsp")):
+        with open(path, "rb") as f:
+            text = BeautifulSoup(f.read(), "html.parser").get_text(" ")
+    elif content_type and content_type.startswith("text/"):
+        with open(path, "rb") as f:
+            text = f.read().decode("utf-8", errors="replace")
+    else:
+        return None
+    return SPACE_RE.sub(" ", text).strip()[:MAX_TEXT]
+
+
+# Function to bring one tender's links in line with its record: new URLs are added, URLs the record no
+# longer has are dropped (with their text in the search index), and with requeue the remaining ones are
+# downloaded again (an updated tender may have a new version behind the same URL, e.g. a corrigendum)
+def _sync_links(conn, rowid, source, record, requeue, now):
+    urls = {str(record.get(column)) for column in DOCUMENT_FIELDS.get(source, [])
+            if record.get(column) and str(record.get(column)).startswith(("http://", "https://"))}
+    existing = {url: status for url, status in conn.execute(
+        "SELECT url, status FROM document_links WHERE tender_id = ?", (rowid,))}
+    added = 0
+    for url in urls - set(existing):
+        added += conn.execute("INSERT OR IGNORE INTO document_links (tender_id, url, updated_at) VALUES (?, ?, ?)",
+                              (rowid, url, now)).rowcount
+    dropped = set(existing) - urls
+    for url in dropped:
+        conn.execute("DELETE FROM document_links WHERE tender_id = ? AND url = ?", (rowid, url))
+    if any(existing[url] == 'done' for url in dropped):
+        search_index.reindex_record(conn, rowid, source, record)
+    if requeue:
+        for url in urls & set(existing):
+            conn.execute("UPDATE document_links SET status = 'pending', attempts = 0, error = NULL, updated_at = ? "
+                         "WHERE tender_id = ? AND url = ?", (now, rowid, url))
+    return added
+
+
+# Function to update the document links of tenders from the change feed. The first run goes through every
+# tender of the sources; later runs through the tenders inserted or updated since (read with the documents
+# consumer's watermark) and the tenders stored since the last run without a change (e.g. imported ones),
+# found by id. Returns how many links were added.
+def discover_links(conn, sources):
+    now = datetime.now().isoformat(timespec='seconds')
+    links = 0
+    with conn:
+        for source in sources:
+            known = conn.execute("SELECT change_id FROM watermarks WHERE consumer = ? AND source = ?",
+                                 (DOCUMENTS_CONSUMER, source)).fetchone()
+            latest = conn.execute("SELECT MAX(change_id) FROM changes WHERE source = ?", (source,)).fetchone()[0]
+            top = conn.execute("SELECT MAX(id) FROM tenders WHERE source = ?", (source,)).fetchone()[0] or 0
+            if known is None:
+                rows = conn.execute("SELECT id, record_key, data FROM tenders WHERE source = ? AND id <= ?",
+                                    (source, top)).fetchall()
+                updated = set()
+            else:
+                changes = store.changes_since(conn, source, known[0])
+                updated = {change['key'] for change in changes if change['kind'] == 'update'}
+                keys = sorted({change['key'] for change in changes})
+                scanned = conn.execute("SELECT change_id FROM watermarks WHERE consumer = ? AND source = ?",
+                                       (DOCUMENTS_SCANNED, source)).fetchone()
+                rows = conn.execute("SELECT id, record_key, data FROM tenders WHERE source = ? AND id > ? AND id <= ?",
+                                    (source, scanned[0] if scanned else 0, top)).fetchall()
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    rows += conn.execute(
+                        f"SELECT id, record_key, data FROM tenders WHERE source = ? "
+                        f"AND record_key IN ({', '.join('?' * len(chunk))})",
+                        [source] + chunk).fetchall()
+            for rowid, (key, data) in {rowid: (key, data) for rowid, key, data in rows}.items():
+                links += _sync_links(conn, rowid, source, json.loads(data), key in updated, now)
+            store.set_watermark(conn, DOCUMENTS_CONSUMER, source, latest or 0)
+            store.set_watermark(conn, DOCUMENTS_SCANNED, source, top)
+    return links
+
+
+# Function to list the URLs still to download (pending, or failed fewer than MAX_ATTEMPTS times)
+def pending_urls(conn, sources, limit=None):
+    rows = conn.execute(
+        "SELECT DISTINCT l.url FROM document_links l JOIN tenders t ON t.id = l.tender_id "
+        f"WHERE t.source IN ({', '.join('?' * len(sources))}) "
+        "AND (l.status = 'pending' OR (l.status = 'failed' AND l.attempts < ?)) LIMIT ?",
+        sources + [MAX_ATTEMPTS, -1 if limit is None else limit])
+    return [url for url, in rows]
+
+
+# Function to record a stored document for every link to its URL and re-index the tenders linking to it
+def _save_document(conn, url, document, text):
+    now = datetime.now().isoformat(timespec='seconds')
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO documents (sha256, path, size, content_type, text, stored_at) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", (document['sha256'], document['path'], document['size'],
+                                                   document['content_type'], text, now))
+        conn.execute("UPDATE document_links SET status = 'done', sha256 = ?, error = NULL, updated_at = ? "
+                     "WHERE url = ?", (document['sha256'], now, url))
+        for rowid, source, data in conn.execute(
+                "SELECT t.id, t.source, t.data FROM document_links l JOIN tenders t ON t.id = l.tender_id "
+                "WHERE l.url = ?", (url,)).fetchall():
+            search_index.reindex_record(conn, rowid, source, json.loads(data))
+
+
+def _mark_failed(conn, url, error):
+    with conn:
+        conn.execute("UPDATE document_links SET status = 'failed', attempts = attempts + 1, error = ?, updated_at = ? "
+                     "WHERE url = ?", (f"{type(error).__name__}: {error}", datetime.now().isoformat(timespec='seconds'),
+                                       url))
+
+
+# Function to download and index the documents of some sources' tenders (all document sources by default).
+# Downloads run CONCURRENCY at a time and each finished file goes straight to the extraction pool; the
+# store is only written from the calling thread. Returns counts of stored, reused and failed documents.
+def download_documents(sources=None, limit=None, db_path=None):
+    sources = [source for source in (sources or DOCUMENT_FIELDS) if source in DOCUMENT_FIELDS]
+    summary = {'stored': 0, 'reused': 0, 'failed': 0}
+    if not sources:
+        return summary
+    conn = store.connect(db_path)
+    try:
+        discover_links(conn, sources)
+        urls = pending_urls(conn, sources, limit)
+        if not urls:
+            return summary
+        print(f"Downloading {len(urls)} documents")
+        with ThreadPoolExecutor(max_workers=max(1, CONCURRENCY)) as downloads, \
+                ProcessPoolExecutor(max_workers=max(1, EXTRACT_WORKERS)) as extractors:
+            transfers = {downloads.submit(download, url): url for url in urls}
+            extractions = {}
+            for future in as_completed(transfers):
+                url = transfers[future]
+                try:
+                    document = future.result()
+                except Exception as e:
+                    print(f"Document {url} failed: {type(e).__name__}: {e}")
+                    _mark_failed(conn, url, e)
+                    summary['failed'] += 1
+                    continue
+                known = conn.execute("SELECT text FROM documents WHERE sha256 = ?", (document['sha256'],)).fetchone()
+                if known:
+                    # Identical bytes were stored and extracted before (another URL or tender)
+                    _save_document(conn, url, document, known[0])
+                    summary['reused'] += 1
+                else:
+                    extractions[extractors.submit(extract_text, document['path'], document['content_type'])] = \
+                        (url, document)
+            for future in as_completed(extractions):
+                url, document = extractions[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"Could not extract text from {document['path']}: {type(e).__name__}: {e}")
+                    text = None
+                _save_document(conn, url, document, text)
+                summary['stored'] += 1
+    finally:
+        conn.close()
+    print(f"Documents: {summary['stored']} stored, {summary['reused']} already stored, {summary['failed']} failed")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download, store and index the documents linked from tenders")
+    parser.add_argument("--source", choices=list(DOCUMENT_FIELDS), action="append")
+    parser.add_argument("--limit", type=int, default=None, help="download at most this many documents")
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+    download_documents(args.source, args.limit, args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from selenium.common.exceptions import TimeoutException, WebDriverException
+import metrics
+
+# Per-host politeness and failure handling shared by every scraper: a token bucket limits the request
+# rate to each host, transient errors are retried with exponential backoff and jitter, and a circuit
+# breaker stops hitting a host that keeps failing until it has had time to recover.
+
+# Requests per second and burst allowed per host; SCRAPER_RATE_LIMITS overrides single hosts,
+# e.g. "mkp.gem.gov.in=2,eproc.isro.gov.in=0.5"
+RATE_LIMIT = float(os.environ.get("SCRAPER_RATE_LIMIT", 1))
+RATE_BURST = int(os.environ.get("SCRAPER_RATE_BURST", 3))
+HOST_RATE_LIMITS = {
+    host.strip(): float(rate)
+    for host, rate in (item.split("=", 1) for item in os.environ.get("SCRAPER_RATE_LIMITS", "").split(",") if "=" in item)
+}
+# Attempts after the first one, and the base / cap of the backoff delay in seconds
+MAX_RETRIES = int(os.environ.get("SCRAPER_MAX_RETRIES", 3))
+BACKOFF_BASE = float(os.environ.get("SCRAPER_BACKOFF_BASE", 1))
+BACKOFF_CAP = 30
+# Consecutive failures that open a host's circuit, and how long it stays open (seconds)
+BREAKER_THRESHOLD = int(os.environ.get("SCRAPER_BREAKER_THRESHOLD", 5))
+BREAKER_COOLDOWN = float(os.environ.get("SCRAPER_BREAKER_COOLDOWN", 300))
+
+# HTTP statuses worth retrying
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+# Raised instead of contacting a host whose circuit is open
+class CircuitOpenError(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Take one token, sleeping until one is available
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            with metrics.stage("rate_limit"):
+                time.sleep(delay)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    # Whether a request may go out: closed, or open long enough that one trial request is allowed
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.opened_at = time.monotonic()  # half-open: let this trial through, hold the rest back
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    metrics.count("circuit_opened")
+                self.opened_at = time.monotonic()
+
+
+class HostPolicy:
+    def __init__(self, host):
+        self.host = host
+        self.bucket = TokenBucket(HOST_RATE_LIMITS.get(host, RATE_LIMIT), RATE_BURST)
+        self.breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+# Function to get the policy of a URL's host
+def policy_for(url):
+    host = urlsplit(url).netloc or url
+    with _policies_lock:
+        if host not in _policies:
+            _policies[host] = HostPolicy(host)
+        return _policies[host]
+
+
+# Function to tell transient errors (worth retrying) from permanent ones. Of the browser's errors only
+# timeouts and failed navigations (Chrome's net::ERR_* codes) are the site's; a lost session or a crashed
+# browser is a local fault, left for the pool to replace the browser without counting against the host.
+def is_transient(error):
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUSES
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, TimeoutException)):
+        return True
+    return isinstance(error, WebDriverException) and "net::ERR_" in (error.msg or "")
+
+
+# Function to compute the delay before retry number 'attempt' (full jitter)
+def backoff_delay(attempt):
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+# Function to wait for the host's rate limit before a request that is not wrapped by call() (e.g. a click)
+def throttle(url):
+    policy = policy_for(url)
+    if not policy.breaker.allow():
+        raise CircuitOpenError(f"{policy.host} is failing, skipped for up to {BREAKER_COOLDOWN:.0f}s")
+    policy.bucket.acquire()
+
+
+# Function to make a request to a URL's host under its policy: request() is retried on transient errors
+def call(url, request, retries=MAX_RETRIES):
+    policy = policy_for(url)
+    attempt = 0
+    while True:
+        if not policy.breaker.allow():
+            raise CircuitOpenError(f"{policy.host} is failing, skipped for up to {BREAKER_COOLDOWN:.0f}s")
+        policy.bucket.acquire()
+        try:
+            result = request()
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            policy.breaker.record_failure()
+            if attempt >= retries:
+                raise
+            metrics.count("retries")
+            delay = backoff_delay(attempt)
+            print(f"{policy.host}: {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            with metrics.stage("backoff"):
+                time.sleep(delay)
+            attempt += 1
+            continue
+        policy.breaker.record_success()
+        return result
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared HTTP layer for the requests-based scrapers: one pooled session per host, default timeouts,
+# compressed transfers and an on-disk cache of validators so unchanged pages cost a 304 and no parsing.
+CACHE_DIR = os.environ.get("SCRAPER_HTTP_CACHE_DIR", ".http_cache")
+# SCRAPER_HTTP_CACHE=0 always downloads and processes pages, ignoring the cache
+CACHE_ENABLED = os.environ.get("SCRAPER_HTTP_CACHE", "1") != "0"
+# (connect, read) timeouts in seconds
+TIMEOUT = (10, 30)
+POOL_SIZE = 4
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) Defence-Tender-Scraper"
+
+
+# Advertise brotli only when urllib3 can decode it
+def _accept_encoding():
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+            return "gzip, deflate, br"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+# Function to get the pooled session for a URL's host (connections are kept alive between fetches)
+def session_for(url):
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING})
+            _sessions[host] = session
+        return session
+
+
+def _cache_path(url):
+    return os.path.join(CACHE_DIR, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+
+# Function to read the cached validators and content hash of a URL
+def load_cache_entry(url):
+    try:
+        with open(_cache_path(url)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Result of a fetch. 'unchanged' is True when the server answered 304 or sent the same bytes as last time;
+# commit() stores the new validators and must only be called once the page has been processed, so a
+# failed run never causes the next one to skip the page.
+class FetchResult:
+    def __init__(self, url, response, unchanged, entry):
+        self.url = url
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.content = response.content if response.status_code != 304 else b""
+        self.unchanged = unchanged
+        self._entry = entry
+
+    def raise_for_status(self):
+        if self.status_code != 304:
+            self.response.raise_for_status()
+
+    def commit(self):
+        if not CACHE_ENABLED or self._entry is None:
+            return
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _cache_path(self.url)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self._entry, f)
+        os.replace(path + ".tmp", path)
+
+
+# Function to GET a page through the pooled session, conditionally when the page was fetched before
+def fetch(url, conditional=True, timeout=TIMEOUT):
+    conditional = conditional and CACHE_ENABLED
+    cached = load_cache_entry(url) if conditional else {}
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = session_for(url).get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached:
+        return FetchResult(url, response, True, None)
+
+    content_hash = hashlib.sha256(response.content).hexdigest()
+    entry = None
+    if response.ok:
+        entry = {"url": url, "etag": response.headers.get("ETag"),
+                 "last_modified": response.headers.get("Last-Modified"), "content_hash": content_hash}
+    unchanged = bool(cached) and response.ok and cached.get("content_hash") == content_hash
+    return FetchResult(url, response, unchanged, entry)
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+import store
+
+# Scrape job queue shared by the viewer (which requests scrapes and polls progress) and the scheduler
+# process (which runs them). It lives in the tender store so both processes see the same state.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    trigger TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    requested_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    pages INTEGER NOT NULL DEFAULT 0,
+    rows INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+-- At most one queued or running job per source: overlapping requests collapse onto it
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_source ON jobs (source) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_source_finished ON jobs (source, status, finished_at);
+
+CREATE TABLE IF NOT EXISTS job_events (
+    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL REFERENCES jobs (job_id),
+    at TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, event_id);
+"""
+
+JOB_COLUMNS = ['job_id', 'source', 'trigger', 'status', 'requested_at', 'started_at', 'finished_at', 'pages',
+               'rows', 'error']
+
+
+# Function to open the store with the job tables in place
+def connect(db_path=None):
+    conn = store.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# Function to timestamp job changes
+def now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+# Function to queue a scrape of a source; returns the id of the new job, or of the job already queued or running
+def request_scrape(source, trigger='manual', db_path=None):
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO jobs (source, trigger, requested_at) VALUES (?, ?, ?)",
+                         (source, trigger, now()))
+            return conn.execute("SELECT job_id FROM jobs WHERE source = ? AND status IN ('queued', 'running')",
+                                (source,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+# Function to atomically take the oldest queued job, or None
+def claim_next(db_path=None):
+    conn = connect(db_path)
+    try:
+        with conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = "
+                "(SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY job_id LIMIT 1) "
+                f"RETURNING {', '.join(JOB_COLUMNS)}", (now(),)).fetchone()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+    finally:
+        conn.close()
+
+
+# Function to publish a progress event with the job's running totals
+def publish_progress(job_id, pages, rows, message=None, db_path=None):
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT INTO job_events (job_id, at, pages, rows, message) VALUES (?, ?, ?, ?, ?)",
+                         (job_id, now(), pages, rows, message))
+            conn.execute("UPDATE jobs SET pages = ?, rows = ? WHERE job_id = ?", (pages, rows, job_id))
+    finally:
+        conn.close()
+
+
+# Function to close a job as 'done' or 'failed'
+def finish(job_id, status, rows=None, error=None, db_path=None):
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("UPDATE jobs SET status = ?, finished_at = ?, rows = COALESCE(?, rows), error = ? "
+                         "WHERE job_id = ?", (status, now(), rows, error, job_id))
+    finally:
+        conn.close()
+
+
+# Function to fail jobs left running by a scheduler that died, so their sources can be queued again
+def recover_abandoned(db_path=None):
+    conn = connect(db_path)
+    try:
+        with conn:
+            return conn.execute("UPDATE jobs SET status = 'failed', finished_at = ?, error = 'Scheduler restarted' "
+                                "WHERE status = 'running'", (now(),)).rowcount
+    finally:
+        conn.close()
+
+
+# Function to queue scheduled scrapes for sources whose last finished job (done or failed) is older than the interval
+def enqueue_due(sources, interval_hours, db_path=None):
+    cutoff = (datetime.now() - timedelta(hours=interval_hours)).isoformat(timespec='seconds')
+    conn = connect(db_path)
+    try:
+        due = [source for source in sources
+               if (conn.execute("SELECT MAX(finished_at) FROM jobs WHERE source = ? AND status IN ('done', 'failed')",
+                                (source,)).fetchone()[0] or '') < cutoff]
+    finally:
+        conn.close()
+    return [request_scrape(source, 'schedule', db_path) for source in due]
+
+
+# Function to list the queued and running jobs, plus the last finished job of each source, for the viewer.
+# 'expected_pages' is the page count of the source's previous successful job, to turn pages into a fraction.
+def job_status(db_path=None):
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE status IN ('queued', 'running') "
+            f"OR job_id IN (SELECT MAX(job_id) FROM jobs WHERE status IN ('done', 'failed') GROUP BY source) "
+            f"ORDER BY job_id").fetchall()
+        status = []
+        for row in rows:
+            job = dict(zip(JOB_COLUMNS, row))
+            job['expected_pages'] = conn.execute(
+                "SELECT pages FROM jobs WHERE source = ? AND status = 'done' AND job_id < ? "
+                "ORDER BY job_id DESC LIMIT 1", (job['source'], job['job_id'])).fetchone()
+            job['expected_pages'] = job['expected_pages'][0] if job['expected_pages'] else None
+            status.append(job)
+        return status
+    finally:
+        conn.close()
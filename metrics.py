@@ -0,0 +1,183 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Per-stage timing and counters for the scrapers. Off unless SCRAPER_METRICS=1: when disabled, stage()
+# hands back one shared no-op context manager and count() returns immediately, so call sites cost
+# a function call and a flag check.
+ENABLED = os.environ.get("SCRAPER_METRICS") == "1"
+# Structured JSON log (one event per line) and Prometheus text exposition file
+LOG_PATH = os.environ.get("SCRAPER_METRICS_LOG", "metrics.jsonl")
+PROM_PATH = os.environ.get("SCRAPER_METRICS_PROM", "metrics.prom")
+
+# Source the current scrape belongs to (set by the instrumented decorator, inherited by worker contexts)
+_source = contextvars.ContextVar("metrics_source", default="unknown")
+_lock = threading.Lock()
+_stages = {}  # (source, stage) -> [count, total seconds, errors]
+_counters = {}  # (source, counter) -> value
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("source", "name", "started")
+
+    def __init__(self, source, name):
+        self.source = source
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_stage(self.source, self.name, time.perf_counter() - self.started, exc_type is not None)
+        return False
+
+
+# Function to turn metrics on at runtime (e.g. from a command-line flag)
+def enable(log_path=None, prom_path=None):
+    global ENABLED, LOG_PATH, PROM_PATH
+    ENABLED = True
+    LOG_PATH = log_path or LOG_PATH
+    PROM_PATH = prom_path or PROM_PATH
+
+
+# Function to time a stage of the current scrape: with metrics.stage("navigation"): ...
+def stage(name):
+    if not ENABLED:
+        return NULL_STAGE
+    return _Stage(_source.get(), name)
+
+
+# Function to add to a counter of the current scrape (pages, rows, retries, bytes, ...)
+def count(name, value=1):
+    if not ENABLED or not value:
+        return
+    key = (_source.get(), name)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+# Function to record a finished stage and log it as a JSON event
+def record_stage(source, name, seconds, error=False):
+    with _lock:
+        totals = _stages.setdefault((source, name), [0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] += error
+    log_event({"event": "stage", "source": source, "stage": name, "seconds": round(seconds, 6), "error": error})
+
+
+# Function to append one structured event to the JSON log
+def log_event(event):
+    event = dict(ts=datetime.now().isoformat(timespec='milliseconds'), **event)
+    line = json.dumps(event) + "\n"
+    with _lock:
+        with open(LOG_PATH, "a") as f:
+            f.write(line)
+
+
+# Function to snapshot one source's stage totals and counters
+def source_snapshot(source):
+    with _lock:
+        stages = {name: round(totals[1], 6) for (src, name), totals in _stages.items() if src == source}
+        counters = {name: value for (src, name), value in _counters.items() if src == source}
+    return stages, counters
+
+
+# Decorator tagging a scraper with its source: everything it records is labelled with the source, and a
+# 'scrape' event with the run's per-stage seconds and counters is logged when it returns
+def instrumented(source):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            token = _source.set(source)
+            stages_before, counters_before = source_snapshot(source)
+            try:
+                with stage("total"):
+                    return func(*args, **kwargs)
+            finally:
+                stages_after, counters_after = source_snapshot(source)
+                log_event({
+                    "event": "scrape",
+                    "source": source,
+                    "stages": {name: round(seconds - stages_before.get(name, 0.0), 6)
+                               for name, seconds in stages_after.items()},
+                    "counters": {name: value - counters_before.get(name, 0)
+                                 for name, value in counters_after.items()},
+                })
+                _source.reset(token)
+        return wrapper
+    return decorator
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Function to render every metric in the Prometheus text exposition format
+def prometheus_text():
+    with _lock:
+        stages = sorted(_stages.items())
+        counters = sorted(_counters.items())
+    lines = ["# HELP scraper_stage_seconds Time spent in each scraper stage.",
+             "# TYPE scraper_stage_seconds summary"]
+    for (source, name), (calls, seconds, _) in stages:
+        labels = f'source="{_label(source)}",stage="{_label(name)}"'
+        lines.append(f"scraper_stage_seconds_sum{{{labels}}} {seconds:.6f}")
+        lines.append(f"scraper_stage_seconds_count{{{labels}}} {calls}")
+    lines += ["# HELP scraper_stage_errors_total Stages that ended with an exception.",
+              "# TYPE scraper_stage_errors_total counter"]
+    for (source, name), (_, _, errors) in stages:
+        lines.append(f'scraper_stage_errors_total{{source="{_label(source)}",stage="{_label(name)}"}} {errors}')
+    for name in sorted({name for (_, name), _ in counters}):
+        metric = f"scraper_{name}_total"
+        lines += [f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{source="{_label(source)}"}} {value}' for (source, counter), value in counters
+                  if counter == name]
+    return "\n".join(lines) + "\n"
+
+
+# Function to write the Prometheus text to a file (for node_exporter's textfile collector)
+def write_prometheus(path=None):
+    path = path or PROM_PATH
+    with open(path + ".tmp", "w") as f:
+        f.write(prometheus_text())
+    os.replace(path + ".tmp", path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Function to serve the metrics over HTTP (GET any path) from a background thread
+def serve_prometheus(port):
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
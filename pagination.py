@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+import host_policy
+import metrics
+
+# Condition-driven waits for page turns in the Selenium scrapers. After a "next" click the turner waits
+# until the old first row goes stale, the first row or the page indicator changes, and the page's network
+# requests settle, instead of sleeping a fixed time.
+
+# Longest a page turn may take (seconds). Until a source has been observed, every turn may take this long.
+MAX_TIMEOUT = float(os.environ.get("SCRAPER_PAGE_TIMEOUT", 15))
+# Adaptive timeout = ADAPTIVE_FACTOR x the source's typical turn time, never below MIN_TIMEOUT
+MIN_TIMEOUT = 2.0
+ADAPTIVE_FACTOR = 4
+# Weight of the latest turn in the running average
+SMOOTHING = 0.3
+# Polling interval while waiting and how long the network must be quiet to count as idle
+POLL_INTERVAL = 0.05
+QUIET_PERIOD = 0.15
+IDLE_TIMEOUT = 2.0
+
+# JavaScript returning [first row text, indicator text, row count]
+SIGNATURE_SCRIPT = """
+var rows = document.querySelectorAll(arguments[0]);
+var indicator = arguments[1] ? document.querySelector(arguments[1]) : null;
+return [rows.length ? rows[0].textContent : '', indicator ? indicator.textContent : '', rows.length];
+"""
+
+# JavaScript counting in-flight XHR/fetch requests on the page (installed once per document)
+TRACK_REQUESTS_SCRIPT = """
+if (window.__scraperPending !== undefined) { return; }
+window.__scraperPending = 0;
+var done = function () { window.__scraperPending = Math.max(0, window.__scraperPending - 1); };
+var send = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.send = function () {
+    window.__scraperPending += 1;
+    this.addEventListener('loadend', done);
+    return send.apply(this, arguments);
+};
+if (window.fetch) {
+    var originalFetch = window.fetch;
+    window.fetch = function () {
+        window.__scraperPending += 1;
+        return originalFetch.apply(this, arguments).finally(done);
+    };
+}
+"""
+
+# JavaScript telling whether the document has loaded and no tracked request is in flight
+NETWORK_IDLE_SCRIPT = """
+return document.readyState === 'complete' && !window.__scraperPending;
+"""
+
+# JavaScript telling whether an enabled "next" control matching arguments[0] is on the page (pagers often
+# keep a disabled one on the last page)
+HAS_NEXT_SCRIPT = """
+return Array.prototype.some.call(document.querySelectorAll(arguments[0]), function (element) {
+    return !element.closest('.disabled, [disabled], [aria-disabled="true"]');
+});
+"""
+
+_lock = threading.Lock()
+_typical_turn = {}  # source -> running average of page-turn seconds (kept across scrapes in one process)
+
+
+# Function to get the timeout for a source's next page turn
+def adaptive_timeout(source):
+    with _lock:
+        typical = _typical_turn.get(source)
+    if typical is None:
+        return MAX_TIMEOUT
+    return min(MAX_TIMEOUT, max(MIN_TIMEOUT, ADAPTIVE_FACTOR * typical))
+
+
+# Function to fold an observed page-turn time into the source's running average
+def observe_turn(source, seconds):
+    with _lock:
+        typical = _typical_turn.get(source)
+        _typical_turn[source] = seconds if typical is None else (1 - SMOOTHING) * typical + SMOOTHING * seconds
+
+
+# Raised when a page turn timed out although the page still offers a "next" control: the crawl did not
+# reach the last page, so it must not count as complete
+class PageTurnStalled(Exception):
+    pass
+
+
+# Page turner for one scrape: turn(click) clicks "next" and returns True once the new page is in place,
+# False if the page never changed and has no enabled "next" control (the last page), and raises
+# PageTurnStalled if it never changed although there is one. waits holds the seconds each turn took.
+class PageTurner:
+    def __init__(self, driver, source, row_selector, indicator_selector=None, next_selector=None):
+        self.driver = driver
+        self.source = source
+        self.row_selector = row_selector
+        self.indicator_selector = indicator_selector
+        self.next_selector = next_selector
+        self.waits = []
+
+    def _signature(self):
+        try:
+            return self.driver.execute_script(SIGNATURE_SCRIPT, self.row_selector, self.indicator_selector)
+        except WebDriverException:
+            return None  # mid-navigation
+
+    def _first_row(self):
+        rows = self.driver.find_elements(By.CSS_SELECTOR, self.row_selector)
+        return rows[0] if rows else None
+
+    @staticmethod
+    def _is_stale(element):
+        if element is None:
+            return False
+        try:
+            element.is_enabled()
+            return False
+        except StaleElementReferenceException:
+            return True
+
+    def _has_next(self):
+        if not self.next_selector:
+            return True
+        try:
+            return bool(self.driver.execute_script(HAS_NEXT_SCRIPT, self.next_selector))
+        except WebDriverException:
+            return True
+
+    def _wait_for_change(self, before, first_row, timeout):
+        def changed(driver):
+            signature = self._signature()
+            if not signature or not signature[2]:
+                return False
+            return self._is_stale(first_row) or signature[:2] != before[:2]
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=POLL_INTERVAL).until(changed)
+            return True
+        except TimeoutException:
+            return False
+
+    def _wait_for_network_idle(self):
+        deadline = time.perf_counter() + IDLE_TIMEOUT
+        quiet_since = None
+        while time.perf_counter() < deadline:
+            try:
+                idle = self.driver.execute_script(NETWORK_IDLE_SCRIPT)
+            except WebDriverException:
+                idle = False
+            now = time.perf_counter()
+            if not idle:
+                quiet_since = None
+            elif quiet_since is None:
+                quiet_since = now
+            elif now - quiet_since >= QUIET_PERIOD:
+                return
+            time.sleep(POLL_INTERVAL)
+
+    def turn(self, click):
+        try:
+            self.driver.execute_script(TRACK_REQUESTS_SCRIPT)
+        except WebDriverException:
+            pass
+        before = self._signature() or ['', '', 0]
+        first_row = self._first_row()
+        timeout = adaptive_timeout(self.source)
+        host_policy.throttle(self.driver.current_url)
+
+        with metrics.stage("page_wait"):
+            started = time.perf_counter()
+            click()
+            changed = self._wait_for_change(before, first_row, timeout)
+            # A slow turn on a page that still has a "next" control gets the rest of the maximum timeout
+            has_next = not changed and self._has_next()
+            if has_next and timeout < MAX_TIMEOUT:
+                changed = self._wait_for_change(before, first_row, MAX_TIMEOUT - timeout)
+            if changed:
+                self._wait_for_network_idle()
+            waited = time.perf_counter() - started
+
+        self.waits.append(waited)
+        if changed:
+            observe_turn(self.source, waited)
+        elif has_next:
+            raise PageTurnStalled(f"{self.source} page did not change within {MAX_TIMEOUT:g}s of clicking next")
+        return changed
+
+    # Function to print how long the page turns actually took
+    def print_summary(self):
+        if self.waits:
+            print(f"{self.source}: {len(self.waits)} page turns, waited {sum(self.waits):.1f}s "
+                  f"(average {sum(self.waits) / len(self.waits):.2f}s, longest {max(self.waits):.2f}s)")
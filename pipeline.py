@@ -0,0 +1,135 @@
+import os
+import metrics
+import progress
+import store
+
+# Streaming record pipeline shared by the scrapers. A scraper yields its pages as (page number, rows);
+# the pipeline normalizes each row into a record, drops keys already seen in this run, and writes the page
+# in batches with a checkpoint in the same transaction. Memory stays bounded by one page whatever the
+# crawl or history size, and a crawl that fails is resumed from the page after its checkpoint.
+
+# Records per write transaction (a page is written in as many batches as it needs)
+BATCH_SIZE = int(os.environ.get("SCRAPER_BATCH_SIZE", 500))
+# A checkpoint older than this is ignored and the crawl starts over
+CHECKPOINT_MAX_AGE_HOURS = float(os.environ.get("SCRAPER_CHECKPOINT_MAX_AGE_HOURS", 24))
+
+
+# Raised by a scraper whose crawl failed part way, after the pages it did collect were saved
+class PartialCrawlError(Exception):
+    def __init__(self, source, rows, error):
+        super().__init__(f"{source} crawl stopped after {rows} rows: {type(error).__name__}: {error}")
+        self.rows = rows
+
+
+# Pipeline for one scrape of a source (use as a context manager). Rows may be dicts or lists in the order
+# of 'columns'. Leaving the block normally finishes the run and drops the checkpoint; leaving it with an
+# error keeps the checkpoint and raises PartialCrawlError if some pages were saved. A shard (a page range
+# scraped by a distributed worker, e.g. "10-15") keeps its own checkpoint, so shards of one source running
+# at the same time never resume each other.
+class RecordPipeline:
+    def __init__(self, source, columns=None, batch_size=BATCH_SIZE, resume=True, db_path=None, shard=None):
+        self.source = source
+        self.checkpoint_key = f"{source}#{shard}" if shard else source
+        self.columns = columns
+        self.batch_size = max(1, batch_size)
+        self.resume = resume
+        self.db_path = db_path
+        self.conn = None
+        self.run_id = None
+        self.checkpoint = None
+        self.seen = set()  # keys written in this run (a page repeated after a slow turn is not counted twice)
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.duplicates = 0
+        self.stopped_early = False
+        self.mode = None  # mode of the last generator consumed (e.g. "http" or "browser")
+
+    def __enter__(self):
+        self.conn = store.connect(self.db_path)
+        self.checkpoint = store.load_checkpoint(self.conn, self.checkpoint_key, CHECKPOINT_MAX_AGE_HOURS) \
+            if self.resume else None
+        # A resumed crawl continues its interrupted run; a new run is only opened by the first write, so a
+        # scrape that fails before writing anything leaves no empty run behind
+        self.run_id = self.checkpoint['run_id'] if self.checkpoint else None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                store.clear_checkpoint(self.conn, self.checkpoint_key)
+                total = self.conn.execute("SELECT COUNT(*) FROM tenders WHERE source = ?",
+                                          (self.source,)).fetchone()[0]
+                print(f"{self.source} data scraped and saved. New rows: {self.inserted}, updated rows: {self.updated}, "
+                      f"total rows: {total}")
+        finally:
+            self.conn.close()
+        if exc_type is not None and issubclass(exc_type, Exception) and self.rows:
+            raise PartialCrawlError(self.source, self.rows, exc) from exc
+        return False
+
+    # Function to get the page a crawl in the given mode starts from: after the checkpoint of a failed
+    # crawl in the same mode, otherwise the first page
+    def start_page(self, mode=None):
+        if not self.checkpoint or self.checkpoint['mode'] != mode:
+            return 0
+        page = self.checkpoint['page'] + 1
+        print(f"Resuming {self.source} after page {page} (interrupted run {self.run_id})")
+        return page
+
+    def normalize(self, row):
+        record = dict(zip(self.columns, row)) if isinstance(row, (list, tuple)) else row
+        return store.normalize_record(record)
+
+    def _write(self, records, page=None, mode=None):
+        if self.run_id is None:
+            self.run_id = store.start_run(self.conn, self.source)
+        with metrics.stage("store_write"):
+            with self.conn:
+                rows, inserted, updated = store.insert_records(self.conn, self.run_id, self.source, records)
+                if page is not None:
+                    store.save_checkpoint(self.conn, self.checkpoint_key, self.run_id, page, mode)
+        self.rows += rows
+        self.inserted += inserted
+        self.updated += updated
+        return inserted + updated
+
+    # Function to write one page; returns how many of its records were new or changed in the store
+    def write_page(self, page, rows, mode=None):
+        batch = []
+        changed = 0
+        for row in rows:
+            record = self.normalize(row)
+            key = store.record_key(self.source, record)
+            if key is None:
+                continue
+            if key in self.seen:
+                self.duplicates += 1
+                continue
+            self.seen.add(key)
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                changed += self._write(batch)
+                batch = []
+        changed += self._write(batch, page, mode)
+        progress.report(pages=1, rows=len(rows))
+        return changed
+
+    # Function to drain a page generator. With stale_limit set (incremental crawls), stop after that many
+    # consecutive pages with nothing new or changed; stopped_early tells the caller the crawl did not reach the end.
+    def consume(self, pages, mode=None, stale_limit=None):
+        self.mode = mode
+        stale_streak = 0
+        try:
+            for page, rows in pages:
+                if self.write_page(page, rows, mode):
+                    stale_streak = 0
+                else:
+                    stale_streak += 1
+                if stale_limit and stale_streak >= stale_limit:
+                    print(f"No new or changed {self.source} entries on the last {stale_streak} pages, stopping incremental crawl.")
+                    self.stopped_early = True
+                    break
+        finally:
+            pages.close()
+        return self
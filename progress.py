@@ -0,0 +1,26 @@
+import contextvars
+from contextlib import contextmanager
+import metrics
+
+# Callback receiving (pages, rows, message) from the scrape running in the current context. A context
+# variable rather than a thread-local, so scraper.run_scrapers can hand it to its worker threads.
+_reporter = contextvars.ContextVar("progress_reporter", default=None)
+
+
+# Context manager routing progress reported by scrapers in this context to a callback
+@contextmanager
+def reporting_to(callback):
+    token = _reporter.set(callback)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+# Function called by scrapers as they go: pages and rows are increments, message is free text
+def report(pages=0, rows=0, message=None):
+    metrics.count("pages", pages)
+    metrics.count("rows", rows)
+    callback = _reporter.get()
+    if callback is not None:
+        callback(pages, rows, message)
@@ -0,0 +1,87 @@
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import documents
+import jobs
+import metrics
+import progress
+import scraper
+
+# Hours between scheduled scrapes of each source (0 disables scheduling, leaving only on-demand jobs)
+SCHEDULE_HOURS = float(os.environ.get("SCRAPER_SCHEDULE_HOURS", 6))
+# Seconds between polls of the job queue
+POLL_INTERVAL = 2
+# SCRAPER_DOCUMENTS=1 downloads and indexes the documents of ISRO and BDL tenders after each of their scrapes
+DOCUMENTS_ENABLED = os.environ.get("SCRAPER_DOCUMENTS", "0") == "1"
+
+
+# Function to run one job, publishing pages and rows as the scraper reports them
+def run_job(job):
+    job_id, source = job['job_id'], job['source']
+    totals = {'pages': 0, 'rows': 0}
+    lock = threading.Lock()
+
+    def publish(pages, rows, message):
+        with lock:
+            totals['pages'] += pages
+            totals['rows'] += rows
+            jobs.publish_progress(job_id, totals['pages'], totals['rows'], message)
+
+    print(f"Job {job_id}: scraping {source} ({job['trigger']})")
+    try:
+        with progress.reporting_to(publish):
+            summary = scraper.run_scrapers([scraper.SCRAPERS_BY_SOURCE[source]], max_workers=1,
+                                           timeout=scraper.SOURCE_TIMEOUT)
+        result = summary['sources'][0]
+        if result['status'] == 'ok':
+            jobs.finish(job_id, 'done', rows=result['rows'])
+        else:
+            jobs.finish(job_id, 'failed', rows=result['rows'], error=result['error'])
+        print(f"Job {job_id}: {source} {result['status']} ({result['rows']} rows, {result['duration']}s)")
+        if DOCUMENTS_ENABLED and result['status'] == 'ok' and source in documents.DOCUMENT_FIELDS:
+            documents.download_documents([source])
+    except Exception as e:
+        jobs.finish(job_id, 'failed', error=f"{type(e).__name__}: {e}")
+
+
+# Function to run the scheduler loop: queue due scrapes, then run queued jobs on a bounded pool
+def run_scheduler(max_workers=scraper.MAX_WORKERS, schedule_hours=SCHEDULE_HOURS, once=False):
+    abandoned = jobs.recover_abandoned()
+    if abandoned:
+        print(f"Marked {abandoned} jobs from a previous scheduler as failed")
+    running = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            if schedule_hours > 0:
+                jobs.enqueue_due(list(scraper.SCRAPERS_BY_SOURCE), schedule_hours)
+            running = {future for future in running if not future.done()}
+            while len(running) < max_workers:
+                job = jobs.claim_next()
+                if job is None:
+                    break
+                if job['source'] not in scraper.SCRAPERS_BY_SOURCE:
+                    jobs.finish(job['job_id'], 'failed', error=f"Unknown source {job['source']}")
+                    continue
+                running.add(executor.submit(run_job, job))
+            if once and not running:
+                break
+            time.sleep(POLL_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued and scheduled scrapes outside the viewer")
+    parser.add_argument("--workers", type=int, default=scraper.MAX_WORKERS)
+    parser.add_argument("--schedule-hours", type=float, default=SCHEDULE_HOURS)
+    parser.add_argument("--once", action="store_true", help="exit once the queue is empty")
+    parser.add_argument("--metrics-port", type=int, help="enable metrics and serve them in Prometheus format")
+    args = parser.parse_args()
+    if args.metrics_port:
+        metrics.enable()
+        metrics.serve_prometheus(args.metrics_port)
+    run_scheduler(args.workers, args.schedule_hours, args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,330 +1,549 @@
 import threading
-from selenium import webdriver
+import contextvars
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
-import pandas as pd
 import time
 import os
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-import requests
 from bs4 import BeautifulSoup
-import numpy as np
-from datetime import datetime
-
-
-# Function to initialize Chrome driver with headless mode
-def get_headless_driver():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # Enable headless mode
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-
-
-# Function to load existing data and mark all previous "New" entries as "Old"
-def load_existing_data(file_path, unique_col):
-    if os.path.exists(file_path):
-        existing_data = pd.read_csv(file_path) if file_path.endswith('.csv') else pd.read_excel(file_path)
-        if 'Status' in existing_data.columns:
-            existing_data['Status'] = 'Old'
-        else:
-            existing_data['Status'] = 'Old'
-    else:
-        existing_data = pd.DataFrame(columns=[unique_col, 'Status'])
-    return existing_data
+from datetime import datetime, timedelta
+from browser import DRIVER_POOL
+from pagination import PageTurner
+import http_client
+import host_policy
+import api_sources
+import progress
+import store
+import metrics
+from pipeline import RecordPipeline, PartialCrawlError
+
+# Root URL of each source site. SCRAPER_BASE_URL points every source at one server replaying the sites
+# under /<source>/ (e.g. the offline benchmark harness); SCRAPER_BASE_URL_<SOURCE> overrides a single source
+SITE_URLS = {
+    'NAL': 'https://www.nal.res.in',
+    'Invest India': 'https://www.investindia.gov.in',
+    'GEM': 'https://mkp.gem.gov.in',
+    'ISRO': 'https://eproc.isro.gov.in',
+    'DST': 'https://dst.gov.in',
+    'Srijan': 'https://srijandefence.gov.in',
+    'BDL': 'https://bdltenders.abcprocure.com'
+}
+
+# How table rows are read from the browser: "bulk" fetches every row in one execute_script call,
+# "element" uses the original per-cell WebDriver lookups (one HTTP round trip per cell)
+EXTRACTION_MODE = os.environ.get("SCRAPER_EXTRACTION_MODE", "bulk")
+
+# How GEM and ISRO are scraped (SCRAPER_MODE_GEM / SCRAPER_MODE_ISRO): "auto" calls the site's JSON
+# endpoint and falls back to the browser if it does not answer as expected, "http" never falls back,
+# "browser" always renders the page
+DEFAULT_SOURCE_MODE = "auto"
+# Pages each source is crawled to, whichever way it is scraped
+ISRO_MAX_PAGES = 3
+GEM_MAX_PAGES = 35
+
+# Incremental crawling: stop after this many consecutive pages without a record we have not stored yet,
+# and force a full crawl when the last one is older than FULL_CRAWL_INTERVAL_DAYS (or SCRAPER_FULL_CRAWL=1)
+STALE_PAGE_LIMIT = int(os.environ.get("SCRAPER_STALE_PAGE_LIMIT", 2))
+FULL_CRAWL_INTERVAL_DAYS = int(os.environ.get("SCRAPER_FULL_CRAWL_INTERVAL_DAYS", 7))
+
+# JavaScript returning each row matching arguments[0] as a list of [tag, text, href, has_link, element]
+# cells, where cells are the row elements matching arguments[1], href is the first link inside the cell
+# (null when there is none or it has no href) and has_link tells whether there is a link at all. WebElement
+# .text follows WebDriver's visible-text rules, which the page cannot run; for a plain cell (only inline
+# elements, nothing hidden or transformed, normal white-space, no special spaces) they come down to the
+# text content with whitespace runs collapsed, so text is computed here. Any other cell comes back as its
+# element with text null, and its .text is read from WebDriver (see fetch_table_rows).
+ROW_CELLS_SCRIPT = """
+var rowSelector = arguments[0], cellSelector = arguments[1];
+var SPECIAL_SPACE = /[\\f\\v\\u00a0\\u1680\\u2000-\\u200b\\u2028\\u2029\\u202f\\u205f\\u3000\\ufeff]/;
+function plainStyle(element, inline) {
+    var style = window.getComputedStyle(element);
+    return (!inline || style.display === 'inline') && style.visibility === 'visible' && style.opacity === '1'
+        && style.textTransform === 'none' && style.whiteSpace === 'normal' && style.overflow === 'visible';
+}
+function plainText(cell) {
+    if (!cell.getClientRects().length || !plainStyle(cell, false)) { return null; }
+    for (var element = cell.parentElement; element; element = element.parentElement) {
+        if (window.getComputedStyle(element).opacity !== '1') { return null; }
+    }
+    var descendants = cell.getElementsByTagName('*');
+    for (var i = 0; i < descendants.length; i++) {
+        if (!plainStyle(descendants[i], true)) { return null; }
+    }
+    var text = cell.textContent;
+    return SPECIAL_SPACE.test(text) ? null : text.replace(/[ \\t\\n\\r]+/g, ' ').trim();
+}
+return Array.prototype.map.call(document.querySelectorAll(rowSelector), function (row) {
+    return Array.prototype.map.call(row.querySelectorAll(cellSelector), function (cell) {
+        var link = cell.querySelector('a');
+        var href = link && link.getAttribute('href') !== null ? link.href : null;
+        var text = plainText(cell);
+        return [cell.tagName, text, href, link !== null, text === null ? cell : null];
+    });
+});
+"""
+
+
+# Function to resolve the root URL of a source, honouring the SCRAPER_BASE_URL overrides
+def base_url(source):
+    slug = source.lower().replace(' ', '_')
+    override = os.environ.get(f"SCRAPER_BASE_URL_{slug.upper()}")
+    if override:
+        return override.rstrip('/')
+    if os.environ.get("SCRAPER_BASE_URL"):
+        return f"{os.environ['SCRAPER_BASE_URL'].rstrip('/')}/{slug}"
+    return SITE_URLS[source]
+
+
+# JavaScript returning the bytes transferred for the page's resources (and the document itself when
+# arguments[0] is true), then clearing the resource timings so the next call only counts new requests
+TRANSFER_BYTES_SCRIPT = """
+var entries = performance.getEntriesByType('resource');
+if (arguments[0]) { entries = entries.concat(performance.getEntriesByType('navigation')); }
+var total = entries.reduce(function (sum, entry) { return sum + (entry.transferSize || 0); }, 0);
+performance.clearResourceTimings();
+return total;
+"""
+
+
+# Function to borrow a warm headless Chrome driver from the shared pool, blocking what the source does not
+# need (use as a context manager)
+def get_headless_driver(source=None):
+    return DRIVER_POOL.driver(source)
+
+
+# Function to count the bytes a browser page fetched (only when metrics are enabled: it costs a round trip)
+def record_transfer_bytes(driver, include_document=False):
+    if metrics.ENABLED:
+        try:
+            metrics.count("bytes", driver.execute_script(TRANSFER_BYTES_SCRIPT, include_document) or 0)
+        except Exception:
+            pass
 
 
-# Function to update status for new and existing entries using vectorized operations
-def update_status(new_data, existing_data, unique_col):
-    if not existing_data.empty:
-        new_data['Status'] = np.where(new_data[unique_col].isin(existing_data[unique_col]), 'Old', 'New')
-        final_data = pd.concat([existing_data, new_data], ignore_index=True).drop_duplicates(subset=[unique_col])
-    else:
-        new_data['Status'] = 'New'
-        final_data = new_data
-    return final_data
+# Function to load a page in the browser, timed as the "navigation" stage
+def open_page(driver, url):
+    with metrics.stage("navigation"):
+        host_policy.call(url, lambda: driver.get(url))
+    record_transfer_bytes(driver, include_document=True)
+
+
+# Function to fetch a page over plain HTTP, timed as the "fetch" stage. Goes through the pooled,
+# conditional client: response.unchanged means the page is the same as the last processed copy.
+def fetch(url):
+    def request():
+        response = http_client.fetch(url)
+        response.raise_for_status()
+        return response
+
+    with metrics.stage("fetch"):
+        response = host_policy.call(url, request)
+    metrics.count("bytes", len(response.content))
+    if response.unchanged:
+        metrics.count("pages_unchanged")
+    return response
+
+
+# Function to skip a requests-based source whose page has not changed since it was last processed
+def page_unchanged(source, response):
+    if not response.unchanged:
+        return False
+    print(f"{source} page unchanged since the last scrape, skipping.")
+    progress.report(pages=1, message="unchanged")
+    return True
+
+
+# Function to record that a pipeline's run crawled its source end to end (a run that stored nothing has no
+# run to record it on)
+def record_full_crawl(pipeline):
+    if pipeline.run_id is not None:
+        store.record_full_crawl(pipeline.run_id, pipeline.db_path)
+
+
+# Function to decide between a full and an incremental crawl: an explicit request wins, then the
+# SCRAPER_FULL_CRAWL switch, then the schedule (a source never crawled in full is always crawled in full)
+def should_full_crawl(source, full_crawl=None):
+    if full_crawl is not None:
+        return full_crawl
+    if os.environ.get("SCRAPER_FULL_CRAWL") == "1":
+        return True
+    last_full = store.last_full_crawl(source)
+    if not last_full:
+        return True
+    return datetime.now() - datetime.fromisoformat(last_full) >= timedelta(days=FULL_CRAWL_INTERVAL_DAYS)
+
+
+# Function to fetch all rows of a rendered table in a single WebDriver round trip, as [tag, text, href,
+# has_link] cells. Only cells the script could not read as plain text cost a further call each (.text).
+def fetch_table_rows(driver, row_selector, cell_selector):
+    rows = driver.execute_script(ROW_CELLS_SCRIPT, row_selector, cell_selector) or []
+    return [[[tag, element.text if text is None else text, href, has_link]
+             for tag, text, href, has_link, element in cells] for cells in rows]
+
+
+# Function to extract ISRO tender rows cell by cell (one WebDriver call per cell)
+def extract_isro_rows_per_element(driver, current_date):
+    data = []
+    rows = driver.find_elements(By.CSS_SELECTOR, "tr.even, tr.odd")
+    for row in rows:
+        try:
+            tender_id = row.find_element(By.CSS_SELECTOR, "td:nth-child(1)").text.strip()
+            organization = row.find_element(By.CSS_SELECTOR, "td:nth-child(2)").text.strip()
+            title = row.find_element(By.CSS_SELECTOR, "td:nth-child(3)").text.strip()
+            submission_date = row.find_element(By.CSS_SELECTOR, "td:nth-child(4)").text.strip()
+            opening_date = row.find_element(By.CSS_SELECTOR, "td:nth-child(5)").text.strip()
+            tender_document = row.find_element(By.CSS_SELECTOR, "td:nth-child(6) a").get_attribute("href")
+            data.append([tender_id, organization, title, submission_date, opening_date, tender_document, current_date])
+        except NoSuchElementException:
+            continue
+    return data
 
 
-# ISRO Scraping (with Scraped Date)
-def scrape_isro_data():
-    driver = get_headless_driver()
-    driver.get("https://eproc.isro.gov.in/home.html")
+# Function to extract ISRO tender rows from a single bulk fetch, mirroring the td:nth-child lookups above
+def extract_isro_rows_bulk(driver, current_date):
     data = []
-    current_date = datetime.now().strftime('%Y-%m-%d')
+    for cells in fetch_table_rows(driver, "tr.even, tr.odd", ":scope > *"):
+        if len(cells) < 6 or any(tag != 'TD' for tag, _, _, _ in cells[:6]) or not cells[5][3]:
+            continue  # Same rows the per-element path skips on NoSuchElementException (a link without href is kept)
+        tender_id, organization, title, submission_date, opening_date = (text.strip() for _, text, _, _ in cells[:5])
+        data.append([tender_id, organization, title, submission_date, opening_date, cells[5][2], current_date])
+    return data
 
-    def scrape_data():
-        try:
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "tr.even, tr.odd"))
-            )
-            rows = driver.find_elements(By.CSS_SELECTOR, "tr.even, tr.odd")
-            for row in rows:
-                try:
-                    tender_id = row.find_element(By.CSS_SELECTOR, "td:nth-child(1)").text.strip()
-                    organization = row.find_element(By.CSS_SELECTOR, "td:nth-child(2)").text.strip()
-                    title = row.find_element(By.CSS_SELECTOR, "td:nth-child(3)").text.strip()
-                    submission_date = row.find_element(By.CSS_SELECTOR, "td:nth-child(4)").text.strip()
-                    opening_date = row.find_element(By.CSS_SELECTOR, "td:nth-child(5)").text.strip()
-                    tender_document = row.find_element(By.CSS_SELECTOR, "td:nth-child(6) a").get_attribute("href")
-                    data.append(
-                        [tender_id, organization, title, submission_date, opening_date, tender_document, current_date])
-                except NoSuchElementException:
-                    continue
-        except TimeoutException:
-            pass
 
-    # Scrape the data
-    for _ in range(3):
-        scrape_data()
-        try:
-            next_button = WebDriverWait(driver, 15).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "a[aria-controls='tenderListTable'][data-dt-idx='4']"))
-            )
-            if next_button.is_enabled():
-                next_button.click()
-                time.sleep(3)
-            else:
-                break
-        except TimeoutException:
-            break
+# Function to extract GEM catalogue rows cell by cell (one WebDriver call per cell)
+def extract_gem_rows_per_element(driver, current_date):
+    data = []
+    rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
+    for row in rows:
+        cells = row.find_elements(By.TAG_NAME, "td")
+        if len(cells) >= 3:
+            id_value = cells[0].text.strip()
+            descriptor = cells[1].text.strip()
+            specs = cells[2].text.strip()
 
-    driver.quit()
+            # Append the scrape date
+            data.append([descriptor, id_value, specs, current_date])
+    return data, len(rows)
 
-    # Convert scraped data to DataFrame
-    new_data = pd.DataFrame(data, columns=["Tender ID", "Organization", "Title", "Submission Date", "Opening Date",
-                                           "Tender Document", "Scraped Date"])
 
-    # Load existing data and update status
-    existing_data = load_existing_data("isro_scraped_data.csv", "Tender ID")
-    final_data = update_status(new_data, existing_data, "Tender ID")
+# Function to extract GEM catalogue rows from a single bulk fetch
+def extract_gem_rows_bulk(driver, current_date):
+    data = []
+    rows = fetch_table_rows(driver, "table tbody tr", "td")
+    for cells in rows:
+        if len(cells) >= 3:
+            data.append([cells[1][1].strip(), cells[0][1].strip(), cells[2][1].strip(), current_date])
+    return data, len(rows)
 
-    # Save the final data
-    final_data.to_csv("isro_scraped_data.csv", index=False)
-    print(f"ISRO data scraped and saved. Total rows: {len(final_data)}")
 
+# Function to pick the extraction strategy configured by EXTRACTION_MODE
+def extract_rows(source, driver, current_date, mode=None):
+    bulk = (mode or EXTRACTION_MODE) == "bulk"
+    with metrics.stage("extraction"):
+        if source == "ISRO":
+            return extract_isro_rows_bulk(driver, current_date) if bulk else extract_isro_rows_per_element(driver, current_date)
+        return extract_gem_rows_bulk(driver, current_date) if bulk else extract_gem_rows_per_element(driver, current_date)
 
-# GEM Scraping (with Scraped Date)
-def scrape_gem_data():
-    driver = get_headless_driver()
-    driver.get("https://mkp.gem.gov.in/browse_nodes/browse_list#!/categories")
 
-    wait = WebDriverWait(driver, 10)
-    try:
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody")))
-    except TimeoutException:
-        print("Failed to load GEM page or table.")
-        driver.quit()
-        return
+# "Next" control of ISRO's DataTables pager
+ISRO_NEXT_SELECTOR = "a[aria-controls='tenderListTable'][data-dt-idx='4']"
 
-    data = []
-    page_count = 0
-    max_pages = 35
-    current_date = datetime.now().strftime('%Y-%m-%d')
 
-    while page_count < max_pages:
-        print(f"Scraping page {page_count + 1} of GEM data...")
+# Columns of the sources whose scrapers yield rows as lists
+ISRO_COLUMNS = ["Tender ID", "Organization", "Title", "Submission Date", "Opening Date", "Tender Document",
+                "Scraped Date"]
+GEM_COLUMNS = ['Descriptor', 'ID', 'Specs', 'Scraped Date']
+DST_COLUMNS = ["Title", "Link", "Description", "Scraped Date"]
 
-        try:
-            rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
-            if not rows:
-                print("No rows found on this page.")
-                break
 
-            for row in rows:
-                cells = row.find_elements(By.TAG_NAME, "td")
-                if len(cells) >= 3:
-                    id_value = cells[0].text.strip()
-                    descriptor = cells[1].text.strip()
-                    specs = cells[2].text.strip()
+# Function to get a source's scraping mode (auto, http or browser)
+def source_mode(source):
+    mode = os.environ.get(f"SCRAPER_MODE_{source.upper().replace(' ', '_')}", DEFAULT_SOURCE_MODE)
+    if mode not in ("auto", "http", "browser"):
+        raise ValueError(f"Unknown mode {mode!r} for {source}")
+    return mode
 
-                    # Append the scrape date
-                    data.append([descriptor, id_value, specs, current_date])
 
-        except Exception as e:
-            print(f"Error scraping data on page {page_count + 1}: {e}")
-            break
+# Function to feed a pipeline from a source's JSON endpoint, or from the browser when the endpoint breaks
+# its contract (or the source is set to "browser"). Both arguments build a page generator from a start page.
+def scrape_http_first(pipeline, http_pages, browser_pages, stale_limit=None):
+    mode = source_mode(pipeline.source)
+    if mode != "browser":
+        try:
+            return pipeline.consume(http_pages(pipeline.start_page("http")), mode="http")
+        except api_sources.ContractError as e:
+            if mode == "http":
+                raise
+            metrics.count("http_fallbacks")
+            print(f"{pipeline.source} data endpoint unusable ({e}), falling back to the browser.")
+    return pipeline.consume(browser_pages(pipeline.start_page("browser")), mode="browser", stale_limit=stale_limit)
 
+
+# ISRO Scraping (with Scraped Date)
+@metrics.instrumented('ISRO')
+def scrape_isro_data():
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    with RecordPipeline("ISRO", ISRO_COLUMNS) as pipeline:
+        scrape_http_first(pipeline,
+                          lambda start: api_sources.isro_pages(base_url('ISRO'), current_date, ISRO_MAX_PAGES, start),
+                          lambda start: crawl_isro_browser(current_date, start))
+    return pipeline.rows
+
+
+# Function to yield ISRO's tender list page by page from the browser, from start_page on
+def crawl_isro_browser(current_date, start_page=0):
+    with get_headless_driver("ISRO") as driver:
+        open_page(driver, f"{base_url('ISRO')}/home.html")
+        turner = PageTurner(driver, "ISRO", "tr.even, tr.odd", indicator_selector="#tenderListTable_info",
+                            next_selector=ISRO_NEXT_SELECTOR)
         try:
-            next_button = driver.find_element(By.CSS_SELECTOR, "li.pagination-next.ng-scope > a")
-            if next_button.is_enabled():
-                driver.execute_script("arguments[0].click();", next_button)
-                time.sleep(3)
-                wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "table tbody tr")))
-                page_count += 1
-            else:
-                break
-        except TimeoutException:
-            break
-        except Exception as e:
-            break
+            for page in range(ISRO_MAX_PAGES):
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "tr.even, tr.odd"))
+                )
+                if page >= start_page:
+                    yield page, extract_rows("ISRO", driver, current_date)
+                if page + 1 >= ISRO_MAX_PAGES:
+                    break
+                try:
+                    with metrics.stage("pagination"):
+                        next_button = WebDriverWait(driver, 15).until(
+                            EC.element_to_be_clickable((By.CSS_SELECTOR, ISRO_NEXT_SELECTOR))
+                        )
+                except TimeoutException:
+                    break  # no "next" control: last page
+                if not next_button.is_enabled() or not turner.turn(next_button.click):
+                    break
+                record_transfer_bytes(driver)
+        finally:
+            turner.print_summary()
 
-    driver.quit()
 
-    if data:
-        new_data = pd.DataFrame(data, columns=['Descriptor', 'ID', 'Specs', 'Scraped Date'])
+# GEM Scraping (with Scraped Date)
+@metrics.instrumented('GEM')
+def scrape_gem_data(full_crawl=None):
+    full_crawl = should_full_crawl("GEM", full_crawl)
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    with RecordPipeline("GEM", GEM_COLUMNS) as pipeline:
+        scrape_http_first(pipeline,
+                          lambda start: api_sources.gem_pages(base_url('GEM'), current_date, GEM_MAX_PAGES, start),
+                          lambda start: crawl_gem_browser(current_date, start),
+                          stale_limit=None if full_crawl else STALE_PAGE_LIMIT)
+    # The endpoint hands over the whole catalogue, so every HTTP run is a full crawl
+    if (full_crawl or pipeline.mode == "http") and not pipeline.stopped_early:
+        record_full_crawl(pipeline)
+    return pipeline.rows
+
+
+# Function to yield GEM's catalogue page by page from the browser, from start_page on (earlier pages are
+# only clicked through: the Angular pager cannot jump)
+def crawl_gem_browser(current_date, start_page=0):
+    with get_headless_driver("GEM") as driver:
+        open_page(driver, f"{base_url('GEM')}/browse_nodes/browse_list#!/categories")
 
-        if os.path.exists("scraped_gem_data.csv") and os.path.getsize("scraped_gem_data.csv") > 0:
-            existing_data = pd.read_csv("scraped_gem_data.csv")
-        else:
-            existing_data = pd.DataFrame(columns=['Descriptor', 'ID', 'Specs', 'Scraped Date'])
+        try:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody")))
+        except TimeoutException:
+            print("Failed to load GEM page or table.")
+            return
 
-        new_data['Status'] = np.where(new_data['ID'].isin(existing_data['ID']), 'Old', 'New')
-        final_data = pd.concat([existing_data, new_data], ignore_index=True).drop_duplicates(subset=['ID'])
+        turner = PageTurner(driver, "GEM", "table tbody tr", indicator_selector="li.pagination-page.active",
+                            next_selector="li.pagination-next.ng-scope > a")
+        try:
+            for page in range(GEM_MAX_PAGES):
+                if page >= start_page:
+                    print(f"Scraping page {page + 1} of GEM data...")
+                    page_data, row_count = extract_rows("GEM", driver, current_date)
+                    if not row_count:
+                        print("No rows found on this page.")
+                        return
+                    yield page, page_data
 
-        final_data.to_csv("scraped_gem_data.csv", index=False, encoding='utf-8')
-        final_data.to_excel("scraped_gem_data.xlsx", index=False)
-        print(f"GEM data scraped and saved. Total rows: {len(final_data)}")
-    else:
-        print("No data scraped from GEM.")
+                try:
+                    with metrics.stage("pagination"):
+                        next_button = driver.find_element(By.CSS_SELECTOR, "li.pagination-next.ng-scope > a")
+                except NoSuchElementException:
+                    return  # no "next" control: last page
+                if not next_button.is_enabled() or not turner.turn(
+                        lambda: driver.execute_script("arguments[0].click();", next_button)):
+                    return
+                record_transfer_bytes(driver)
+        finally:
+            turner.print_summary()
 
 
 # Invest India Scraping (with Scraped Date)
+@metrics.instrumented('Invest India')
 def scrape_invest_india_data():
-    driver = get_headless_driver()
-    driver.get('https://www.investindia.gov.in/request-for-proposal')
+    with RecordPipeline("Invest India") as pipeline:
+        pipeline.consume(crawl_invest_india())
+    return pipeline.rows
+
 
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, 'h3')))
-    h3_elements = driver.find_elements(By.TAG_NAME, 'h3')
+# Function to yield Invest India's single page of tenders
+def crawl_invest_india():
     data = []
     current_date = datetime.now().strftime('%Y-%m-%d')
 
-    for h3 in h3_elements:
-        tender_head_text = h3.text.strip()
-        if tender_head_text:
-            data.append({
-                'Tender Head': tender_head_text,
-                'Tender List Inner': '',
-                'Scraped Date': current_date
-            })
-
-    WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.tender-list-inner')))
-    div_elements = driver.find_elements(By.CSS_SELECTOR, 'div.tender-list-inner')
+    with get_headless_driver("Invest India") as driver:
+        open_page(driver, f"{base_url('Invest India')}/request-for-proposal")
 
-    for i, div in enumerate(div_elements):
-        tender_list_text = div.text.strip()
-        if tender_list_text and i < len(data):
-            data[i]['Tender List Inner'] = tender_list_text
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, 'h3')))
+        h3_elements = driver.find_elements(By.TAG_NAME, 'h3')
+        for h3 in h3_elements:
+            tender_head_text = h3.text.strip()
+            if tender_head_text:
+                data.append({
+                    'Tender Head': tender_head_text,
+                    'Tender List Inner': '',
+                    'Scraped Date': current_date
+                })
 
-    # Convert scraped data to DataFrame
-    new_data = pd.DataFrame(data)
+        WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.tender-list-inner')))
+        div_elements = driver.find_elements(By.CSS_SELECTOR, 'div.tender-list-inner')
 
-    # Load existing data and update status
-    existing_data = load_existing_data("invest_india_data.xlsx", "Tender Head")
-    final_data = update_status(new_data, existing_data, "Tender Head")
+        for i, div in enumerate(div_elements):
+            tender_list_text = div.text.strip()
+            if tender_list_text and i < len(data):
+                data[i]['Tender List Inner'] = tender_list_text
 
-    # Save the final data
-    final_data.to_excel('invest_india_data.xlsx', index=False)
-    print("Invest India data extracted and saved to invest_india_data.xlsx")
-    driver.quit()
+    yield 0, data
 
 
 # NAL Scraping (with Scraped Date)
+@metrics.instrumented('NAL')
 def scrape_nal_data():
-    url = 'https://www.nal.res.in/en/tender-purchase'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
+    url = f"{base_url('NAL')}/en/tender-purchase"
+    response = fetch(url)
+    if page_unchanged("NAL", response):
+        return 0
+    with RecordPipeline("NAL") as pipeline:
+        pipeline.consume(parse_nal_page(response.content))
+    response.commit()
+    return pipeline.rows
+
+
+# Function to yield the rows of NAL's tender table, keyed by its own header (records are keyed on the
+# first column, whatever NAL calls it)
+def parse_nal_page(content):
+    with metrics.stage("parse"):
+        soup = BeautifulSoup(content, 'html.parser')
     table = soup.find('table')
+    if table is None:
+        raise ValueError("NAL tender page has no table (layout changed or error page)")
     rows = table.find_all('tr')
-    scraped_data = []
     current_date = datetime.now().strftime('%Y-%m-%d')
+    if len(rows) < 2:
+        yield 0, []
+        return
 
+    # The header may be written with <th> or <td> cells; without one every record would lose its columns
+    header_row = [cell.text.strip() for cell in rows[0].find_all(['th', 'td'])]
+    if not any(header_row):
+        raise ValueError("NAL tender table has no header row (layout changed)")
+    header_row.append("Scraped Date")  # Append the "Scraped Date" column
+    scraped_data = []
     for row in rows[1:]:
-        cells = row.find_all('td')
-        cell_data = [cell.text.strip() for cell in cells]
+        cell_data = [cell.text.strip() for cell in row.find_all(['th', 'td'])]
         cell_data.append(current_date)  # Add scraped date
-        scraped_data.append(cell_data)
-
-    df = pd.DataFrame(scraped_data)
-
-    if len(rows) > 1:
-        header_row = [cell.text.strip() for cell in rows[0].find_all('td')]
-        header_row.append("Scraped Date")  # Append the "Scraped Date" column
-        df.columns = header_row
-
-    # Load existing data and update status
-    existing_data = load_existing_data("nal_tender_data.xlsx", df.columns[0])
-    new_entries = df[~df.iloc[:, 0].isin(existing_data.iloc[:, 0])].copy()
-    new_entries['Status'] = 'New'
-    existing_data['Status'] = 'Old'
-
-    final_df = pd.concat([existing_data, new_entries], ignore_index=True) if not new_entries.empty else existing_data
-    final_df.to_excel('nal_tender_data.xlsx', index=False)
-    print("NAL data scraped and saved to nal_tender_data.xlsx")
+        scraped_data.append(dict(zip(header_row, cell_data)))
+    yield 0, scraped_data
 
 
 # DST Scraping (with Scraped Date)
-def scrape_dst_data():
-    driver = get_headless_driver()
-    driver.get("https://dst.gov.in/search/node/grants")
-
-    data = []
+@metrics.instrumented('DST')
+def scrape_dst_data(full_crawl=None):
+    full_crawl = should_full_crawl("DST", full_crawl)
+    with RecordPipeline("DST", DST_COLUMNS) as pipeline:
+        pipeline.consume(crawl_dst(pipeline.start_page()), stale_limit=None if full_crawl else STALE_PAGE_LIMIT)
+    if full_crawl and not pipeline.stopped_early:
+        record_full_crawl(pipeline)
+    return pipeline.rows
+
+
+# Function to yield DST's search results page by page, from start_page on (Drupal's pager takes ?page=N,
+# so a resumed crawl opens its page directly)
+def crawl_dst(start_page=0):
     current_date = datetime.now().strftime('%Y-%m-%d')
-    while True:
-        results = driver.find_elements(By.CSS_SELECTOR, ".search-result")
-        for result in results:
-            title = result.find_element(By.CSS_SELECTOR, "h3 a").text
-            link = result.find_element(By.CSS_SELECTOR, "h3 a").get_attribute("href")
-            description = result.find_element(By.CSS_SELECTOR, ".search-snippet").text
-            data.append([title, link, description, current_date])
-
+    with get_headless_driver("DST") as driver:
+        url = f"{base_url('DST')}/search/node/grants"
+        open_page(driver, f"{url}?page={start_page}" if start_page else url)
+        turner = PageTurner(driver, "DST", ".search-result", indicator_selector=".pager-current",
+                            next_selector=".pager-next a")
+        page = start_page
         try:
-            next_button = driver.find_element(By.CSS_SELECTOR, ".pager-next a")
-            next_button.click()
-            time.sleep(3)
-        except:
-            break
-
-    driver.quit()
-
-    df = pd.DataFrame(data, columns=["Title", "Link", "Description", "Scraped Date"])
+            while True:
+                with metrics.stage("extraction"):
+                    page_data = []
+                    for result in driver.find_elements(By.CSS_SELECTOR, ".search-result"):
+                        title = result.find_element(By.CSS_SELECTOR, "h3 a").text
+                        link = result.find_element(By.CSS_SELECTOR, "h3 a").get_attribute("href")
+                        description = result.find_element(By.CSS_SELECTOR, ".search-snippet").text
+                        page_data.append([title, link, description, current_date])
+                yield page, page_data
 
-    # Load existing data and update status
-    existing_data = load_existing_data("scraped_DST.csv", "Title")
-    final_data = update_status(df, existing_data, "Title")
-
-    # Save the final data
-    final_data.to_csv("scraped_DST.csv", index=False)
-    print(f"DST data scraped and saved to scraped_DST.csv")
+                try:
+                    with metrics.stage("pagination"):
+                        next_button = driver.find_element(By.CSS_SELECTOR, ".pager-next a")
+                except NoSuchElementException:
+                    return  # no "next" link: last page
+                if not turner.turn(next_button.click):
+                    return
+                record_transfer_bytes(driver, include_document=True)
+                page += 1
+        finally:
+            turner.print_summary()
 
 
 # Srijan Scraping (with Scraped Date)
+@metrics.instrumented('Srijan')
 def scrape_srijan_data():
-    url = 'https://srijandefence.gov.in/'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
+    url = f"{base_url('Srijan')}/"
+    response = fetch(url)
+    if page_unchanged("Srijan", response):
+        return 0
+    with RecordPipeline("Srijan") as pipeline:
+        pipeline.consume(parse_srijan_page(response.content))
+    response.commit()
+    return pipeline.rows
+
+
+# Function to yield the product cards of Srijan's home page
+def parse_srijan_page(content):
+    with metrics.stage("parse"):
+        soup = BeautifulSoup(content, 'html.parser')
 
     cards = soup.find_all('div', class_='card-body homecard')
-    titles, dates = [], []
+    products = []
     current_date = datetime.now().strftime('%Y-%m-%d')
     for card in cards:
         title_tag = card.find('p', class_='product-title')
         date_tag = card.find('div', id=lambda x: x and x.startswith('dlproduct_Tr233_'))
         title = title_tag.get_text(strip=True) if title_tag else "No title"
-        date = date_tag.get_text(strip=True).replace('Last Updated :-', '').strip() if date_tag else "No date"
-        titles.append(title)
-        dates.append(current_date)
-
-    new_data = pd.DataFrame({'Product Title': titles, 'Scraped Date': dates})
-
-    # Load existing data and update status
-    existing_data = load_existing_data("srijan_defence_products_with_dates.xlsx", "Product Title")
-    final_data = update_status(new_data, existing_data, "Product Title")
-
-    # Save the final data
-    final_data.to_excel('srijan_defence_products_with_dates.xlsx', index=False)
-    print("Srijan data scraped and saved to srijan_defence_products_with_dates.xlsx")
+        date = date_tag.get_text(strip=True).replace('Last Updated :-', '').strip() if date_tag else None
+        products.append({'Product Title': title, 'Last Updated': date, 'Scraped Date': current_date})
+    yield 0, products
 
 
 # BDL Scraping (with Scraped Date)
+@metrics.instrumented('BDL')
 def scrape_bdl_data():
-    url = 'https://bdltenders.abcprocure.com/ssoeprocurement/EProc.jsp'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
+    url = f"{base_url('BDL')}/ssoeprocurement/EProc.jsp"
+    response = fetch(url)
+    if page_unchanged("BDL", response):
+        return 0
+    # Only new "Tender ID"s are added; exports list BDL newest first
+    with RecordPipeline("BDL") as pipeline:
+        pipeline.consume(parse_bdl_page(response.content))
+    response.commit()
+    return pipeline.rows
+
+
+# Function to yield the tenders listed on BDL's e-procurement page
+def parse_bdl_page(content):
+    with metrics.stage("parse"):
+        soup = BeautifulSoup(content, 'html.parser')
 
     tenders = []
     current_date = datetime.now().strftime('%Y-%m-%d')
@@ -350,7 +569,7 @@ def scrape_bdl_data():
                 'Tender No': tender_no,
                 'Due Date': due_date,
                 'Tender Description': tender_description,
-                'Tender Link': f"https://bdltenders.abcprocure.com/ssoeprocurement/{tender_link}",
+                'Tender Link': f"{base_url('BDL')}/ssoeprocurement/{tender_link}",
                 'Tender ID': tender_id,
                 'Corrigendum': corrigendum,
                 'Scraped Date': current_date  # Adding the scrape date
@@ -360,44 +579,212 @@ def scrape_bdl_data():
             print(f"Error extracting tender info: {e}")
             continue
 
-    # Convert the data to a DataFrame
-    new_data = pd.DataFrame(tenders)
+    yield 0, tenders
+
+
+# Default worker pool size and per-source timeout (in seconds) for a full run
+MAX_WORKERS = 4
+SOURCE_TIMEOUT = 900
+
+# Scraper for each source, by the names used in the store and the viewer
+SCRAPERS_BY_SOURCE = {
+    'NAL': scrape_nal_data,
+    'Invest India': scrape_invest_india_data,
+    'GEM': scrape_gem_data,
+    'ISRO': scrape_isro_data,
+    'DST': scrape_dst_data,
+    'Srijan': scrape_srijan_data,
+    'BDL': scrape_bdl_data
+}
+
+# Sources whose pages can be split between distributed workers (worker.py), through their JSON endpoints,
+# with the pages they are crawled to
+SHARDABLE = {
+    'GEM': GEM_MAX_PAGES,
+    'ISRO': ISRO_MAX_PAGES,
+}
+
+
+# Functions reading how many pages a shardable source's JSON endpoint has right now
+PAGE_COUNTS = {
+    'GEM': api_sources.gem_page_count,
+    'ISRO': api_sources.isro_page_count,
+}
+
+
+# Function to get how many pages of a shardable source to split into shards (at most its SHARDABLE pages),
+# or None when its JSON endpoint is unusable and the source has to be crawled as a whole
+def page_count(source):
+    try:
+        pages = PAGE_COUNTS[source](base_url(source))
+    except api_sources.ContractError as e:
+        print(f"{source} data endpoint unusable ({e}), not splitting it")
+        return None
+    return min(pages, SHARDABLE[source])
 
-    # Load existing data and update status
-    existing_data = load_existing_data("bdl_tenders.csv", "Tender ID")
 
-    # Only keep new rows that do not already exist in the file (based on "Tender ID")
-    final_data = update_status(new_data, existing_data, "Tender ID")
-    # Sort the data by 'Scraped Date' in descending order
-    final_data = final_data.sort_values(by="Scraped Date", ascending=False)
+# Raised by scrape_shard when a source can only be scraped in the browser (set to "browser", or its JSON
+# endpoint is unusable). A browser shard would click through every page before its own, so the source
+# should be crawled as a whole instead.
+class ShardUnavailable(Exception):
+    pass
 
-    # Save the final data, dropping any duplicates (based on the "Tender ID")
-    final_data.drop_duplicates(subset="Tender ID", keep="first", inplace=True)
-    final_data.to_csv("bdl_tenders.csv", index=False)
-    print(f"BDL data scraped and saved. Total rows: {len(final_data)}")
 
-# Function to run each scraper
-def run_scraper(scraper_func):
-    scraper_func()
+# Function to scrape pages first_page to last_page (excluded) of a shardable source from its JSON endpoint.
+# Shards are planned within the page count (see page_count), so pages up to last_page exist and the shard
+# does not fetch the first page to count them. The shard keeps its own checkpoint, so a retried shard
+# resumes after its last saved page; records are merged into the store by the usual upserts. Shards never
+# record a full crawl: a full crawl is a whole-source run.
+def scrape_shard(source, first_page, last_page):
+    return metrics.instrumented(source)(crawl_shard)(source, first_page, last_page)
+
+
+def crawl_shard(source, first_page, last_page):
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    if source == 'GEM':
+        columns, http_pages = GEM_COLUMNS, api_sources.gem_pages
+    elif source == 'ISRO':
+        columns, http_pages = ISRO_COLUMNS, api_sources.isro_pages
+    else:
+        raise ValueError(f"{source} cannot be scraped in shards")
+    if source_mode(source) == "browser":
+        raise ShardUnavailable(f"{source} is scraped in the browser")
+    try:
+        with RecordPipeline(source, columns, shard=f"{first_page}-{last_page}") as pipeline:
+            start = max(pipeline.start_page("http"), first_page)
+            pipeline.consume(http_pages(base_url(source), current_date, last_page, start, pages=last_page), mode="http")
+    except api_sources.ContractError as e:
+        metrics.count("http_fallbacks")
+        raise ShardUnavailable(f"{source} data endpoint unusable ({e})") from e
+    return pipeline.rows
+
+
+# Scrapers executed by a full run
+SCRAPERS = [
+    scrape_isro_data,
+    scrape_invest_india_data,
+    scrape_nal_data,
+    scrape_gem_data,
+    scrape_dst_data,
+    scrape_bdl_data
+]
+
+
+# Function to run each scraper and record its outcome, so one failing source never affects the others
+def run_scraper(scraper_func, result):
+    result['status'] = 'running'
+    result['started'] = time.time()
+    try:
+        rows = scraper_func()
+        with result['lock']:
+            if result['status'] == 'running':
+                result['rows'] = rows if isinstance(rows, int) else 0
+                result['status'] = 'ok'
+    except PartialCrawlError as e:
+        with result['lock']:
+            if result['status'] == 'running':
+                result['rows'] = e.rows
+                result['status'] = 'partial'
+                result['error'] = str(e)
+    except Exception as e:
+        with result['lock']:
+            if result['status'] == 'running':
+                result['status'] = 'error'
+                result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        result['finished'] = time.time()
+
+
+# Function to give a worker slot back exactly once (either by the worker or by the timeout watchdog)
+def release_slot(result, slots):
+    with result['lock']:
+        if not result['slot_released']:
+            result['slot_released'] = True
+            slots.release()
+
+
+# Function to run scrapers concurrently on a bounded pool with a per-source timeout.
+# Workers are daemon threads: a source that hangs past its timeout is abandoned and its slot
+# is handed to the next queued source, so it can neither block the others nor the process exit.
+def run_scrapers(scrapers=None, max_workers=MAX_WORKERS, timeout=SOURCE_TIMEOUT, poll_interval=0.5):
+    scrapers = SCRAPERS if scrapers is None else scrapers
+    slots = threading.Semaphore(max(1, max_workers))
+    results = []
+    threads = []
+
+    def worker(scraper_func, result, context):
+        slots.acquire()
+        try:
+            context.run(run_scraper, scraper_func, result)
+        finally:
+            release_slot(result, slots)
+
+    run_started = time.time()
+    for scraper_func in scrapers:
+        result = {'source': scraper_func.__name__, 'status': 'pending', 'rows': 0, 'error': None,
+                  'started': None, 'finished': None, 'slot_released': False, 'lock': threading.Lock()}
+        # Each worker runs in a copy of the caller's context, so progress reporting reaches the caller
+        thread = threading.Thread(target=worker, args=(scraper_func, result, contextvars.copy_context()),
+                                  name=scraper_func.__name__, daemon=True)
+        results.append(result)
+        threads.append(thread)
+        print(f"Running {scraper_func.__name__}...")
+        thread.start()
+
+    # Watch the workers until every source has either finished or timed out
+    while True:
+        active = False
+        for thread, result in zip(threads, results):
+            if not thread.is_alive():
+                continue
+            started = result['started']
+            if result['status'] == 'running' and started and time.time() - started > timeout:
+                with result['lock']:
+                    result['status'] = 'timeout'
+                    result['error'] = f"Timed out after {timeout}s"
+                    result['finished'] = time.time()
+                release_slot(result, slots)
+                print(f"{result['source']} timed out after {timeout}s, continuing without it.")
+            elif result['status'] in ('pending', 'running'):
+                active = True
+        if not active:
+            break
+        time.sleep(poll_interval)
+
+    summary = {'wall_time': time.time() - run_started, 'sources': []}
+    for result in results:
+        duration = (result['finished'] or time.time()) - result['started'] if result['started'] else 0.0
+        summary['sources'].append({
+            'source': result['source'],
+            'status': result['status'],
+            'rows': result['rows'],
+            'duration': round(duration, 2),
+            'error': result['error']
+        })
+    summary['wall_time'] = round(summary['wall_time'], 2)
+    summary['rows'] = sum(source['rows'] for source in summary['sources'])
+    summary['errors'] = sum(1 for source in summary['sources'] if source['status'] != 'ok')
+    return summary
+
+
+# Function to print the run summary as a small table
+def print_run_summary(summary):
+    print(f"\n{'Source':<28}{'Status':<10}{'Rows':>8}{'Time (s)':>10}  Error")
+    for source in summary['sources']:
+        print(f"{source['source']:<28}{source['status']:<10}{source['rows']:>8}{source['duration']:>10.2f}  "
+              f"{source['error'] or ''}")
+    print(f"Total: {summary['rows']} rows, {summary['errors']} failed sources, "
+          f"wall time {summary['wall_time']:.2f}s")
 
 
 # Main function to execute all scraping functions in parallel
-def main():
-    scrapers = [
-        scrape_isro_data,
-        scrape_invest_india_data,
-        scrape_nal_data,
-        scrape_gem_data,
-        scrape_dst_data,
-        scrape_bdl_data
-    ]
-
-    for scraper in scrapers:
-        print(f"Running {scraper.__name__}...")
-        scraper()
-        time.sleep(2)  # Optional delay between scrapers
+def main(max_workers=MAX_WORKERS, timeout=SOURCE_TIMEOUT):
+    summary = run_scrapers(SCRAPERS, max_workers=max_workers, timeout=timeout)
+    print_run_summary(summary)
+    if metrics.ENABLED:
+        metrics.write_prometheus()
+    return summary
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,114 @@
+import json
+import re
+
+# Full-text index over every stored tender (SQLite FTS5). Rows share their rowid with tenders.id, and are
+# added in the same transaction that inserts the tender, so the index is always in step with the store.
+# The text extracted from a tender's downloaded documents (documents.py) is indexed with it.
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tender_fts USING fts5 (
+    title, organization, specs, description, documents,
+    source UNINDEXED, scraped_date UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+# Which record columns feed each indexed field, per source (NAL's columns have no fixed names,
+# so its first column is the title and every column is searchable as description)
+SEARCH_FIELDS = {
+    'ISRO': {'title': ['Title'], 'organization': ['Organization'], 'description': ['Tender ID']},
+    'GEM': {'title': ['Descriptor'], 'specs': ['Specs'], 'description': ['ID']},
+    'Invest India': {'title': ['Tender Head'], 'description': ['Tender List Inner']},
+    'DST': {'title': ['Title'], 'description': ['Description']},
+    'Srijan': {'title': ['Product Title']},
+    'BDL': {'title': ['Tender Description'], 'organization': ['Department/Unit'],
+            'description': ['Tender No', 'Tender ID', 'Corrigendum']},
+}
+
+# Relative weight of each indexed column in the bm25 ranking (title, organization, specs, description,
+# documents)
+RANK_WEIGHTS = (10.0, 4.0, 2.0, 1.0, 0.5)
+COLUMNS = ('title', 'organization', 'specs', 'description', 'documents')
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# Function to build the indexed fields of a record
+def search_fields(source, record):
+    mapping = SEARCH_FIELDS.get(source)
+    if mapping is None:
+        values = list(record.values())
+        field_values = {'title': values[:1], 'description': values}
+    else:
+        field_values = {field: [record.get(column) for column in columns] for field, columns in mapping.items()}
+    fields = {}
+    for field in ('title', 'organization', 'specs', 'description'):
+        fields[field] = ' '.join(str(value) for value in field_values.get(field, []) if value not in (None, ''))
+    return fields
+
+
+# Function to tell whether the store has the index with its current columns (older stores lack 'documents')
+def is_current(conn):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(tender_fts)")]
+    return set(COLUMNS) <= set(columns)
+
+
+# Function to get the extracted text of a tender's downloaded documents
+def document_text(conn, rowid):
+    row = conn.execute("SELECT group_concat(d.text, ' ') FROM document_links l JOIN documents d ON d.sha256 = l.sha256 "
+                       "WHERE l.tender_id = ?", (rowid,)).fetchone()
+    return row[0] or ''
+
+
+# Function to add one stored tender to the index (called inside the store's write transaction)
+def index_record(conn, rowid, source, record):
+    fields = search_fields(source, record)
+    conn.execute(
+        "INSERT INTO tender_fts (rowid, title, organization, specs, description, documents, source, scraped_date) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (rowid, fields['title'], fields['organization'], fields['specs'], fields['description'],
+         document_text(conn, rowid), source, str(record.get('Scraped Date') or '')[:10]))
+
+
+# Function to index a stored tender again (its record or its documents changed)
+def reindex_record(conn, rowid, source, record):
+    conn.execute("DELETE FROM tender_fts WHERE rowid = ?", (rowid,))
+    index_record(conn, rowid, source, record)
+
+
+# Function to turn free text into an FTS5 query: every word must match, each as a prefix
+def build_query(text):
+    words = WORD_RE.findall(text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+# Function to run a ranked search. Dates are 'YYYY-MM-DD' bounds on the scraped date (inclusive).
+def search(conn, text, sources=None, since=None, until=None, limit=50):
+    query = build_query(text)
+    if not query:
+        return []
+    sql = ("SELECT t.source, t.record_key, t.data, f.scraped_date, "
+           "snippet(tender_fts, -1, '[', ']', '...', 12), bm25(tender_fts, ?, ?, ?, ?, ?) AS rank "
+           "FROM tender_fts f JOIN tenders t ON t.id = f.rowid WHERE tender_fts MATCH ?")
+    params = list(RANK_WEIGHTS) + [query]
+    if sources:
+        sql += f" AND f.source IN ({', '.join('?' * len(sources))})"
+        params.extend(sources)
+    if since:
+        sql += " AND f.scraped_date >= ?"
+        params.append(since)
+    if until:
+        sql += " AND f.scraped_date <= ?"
+        params.append(until)
+    sql += " ORDER BY rank"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+# Function to rebuild the whole index from the tenders table (first run on an existing store, or repairs)
+def rebuild(conn):
+    conn.execute("DELETE FROM tender_fts")
+    for rowid, source, data in conn.execute("SELECT id, source, data FROM tenders").fetchall():
+        index_record(conn, rowid, source, json.loads(data))
@@ -0,0 +1,673 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+from datetime import datetime, timedelta
+import pandas as pd
+import date_index
+import dedup
+import search_index
+import tender_schema
+import watchlist
+
+# SQLite database holding every scraped tender; CSV/XLSX files are exported from it on demand
+DB_PATH = os.environ.get("TENDER_DB", "tenders.db")
+
+# Per-source unique key column (None = first column, as NAL's table has no stable header) and export files
+SOURCES = {
+    'NAL': {'key': None, 'exports': ['nal_tender_data.xlsx']},
+    'Invest India': {'key': 'Tender Head', 'exports': ['invest_india_data.xlsx']},
+    'GEM': {'key': 'ID', 'exports': ['scraped_gem_data.csv', 'scraped_gem_data.xlsx']},
+    'ISRO': {'key': 'Tender ID', 'exports': ['isro_scraped_data.csv']},
+    'DST': {'key': 'Title', 'exports': ['scraped_DST.csv']},
+    'Srijan': {'key': 'Product Title', 'exports': ['srijan_defence_products_with_dates.xlsx']},
+    'BDL': {'key': 'Tender ID', 'exports': ['bdl_tenders.csv'], 'newest_first': True},
+}
+
+# Columns whose differences between scrapes are not changes: a record keeps the date it was first scraped
+UNTRACKED_FIELDS = {'Scraped Date'}
+
+# Consumer the export command reads the change feed as
+EXPORT_CONSUMER = 'export'
+# Name the watchlist hit feed is tracked under in the watermarks table
+WATCH_FEED = 'watchlist'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'scrape',
+    started_at TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0,
+    inserted INTEGER NOT NULL DEFAULT 0,
+    full_crawl_at TEXT  -- set when the run crawled its source end to end (not incrementally)
+);
+CREATE INDEX IF NOT EXISTS runs_source ON runs (source, kind, run_id);
+
+CREATE TABLE IF NOT EXISTS tenders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    first_run INTEGER NOT NULL REFERENCES runs (run_id),
+    last_run INTEGER NOT NULL REFERENCES runs (run_id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS tenders_source_key ON tenders (source, record_key);
+CREATE INDEX IF NOT EXISTS tenders_first_run ON tenders (first_run);
+
+-- Last page written by an unfinished scrape of each source, so a failed crawl can resume after it
+CREATE TABLE IF NOT EXISTS checkpoints (
+    source TEXT PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    mode TEXT,
+    page INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+-- Append-only change feed: one row per record inserted or updated by a scrape. 'fields' holds
+-- {column: [old, new]} for updates. change_id only grows, so a consumer's position is a single number.
+CREATE TABLE IF NOT EXISTS changes (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    source TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fields TEXT,
+    changed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_source ON changes (source, change_id);
+CREATE INDEX IF NOT EXISTS changes_run ON changes (run_id);
+
+-- Last change each consumer (viewer, export, alerting script) has seen, per source; the watchlist hit
+-- feed is tracked under the source name 'watchlist', and the last tender id documents.py checked for links
+-- under the consumer 'documents:tenders'
+CREATE TABLE IF NOT EXISTS watermarks (
+    consumer TEXT NOT NULL,
+    source TEXT NOT NULL,
+    change_id INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (consumer, source)
+);
+
+-- Documents linked from tenders (documents.py). Files are stored once per content hash; each link records
+-- which document it resolved to.
+CREATE TABLE IF NOT EXISTS documents (
+    sha256 TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    text TEXT,
+    stored_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS document_links (
+    tender_id INTEGER NOT NULL REFERENCES tenders (id),
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    sha256 TEXT REFERENCES documents (sha256),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (tender_id, url)
+);
+CREATE INDEX IF NOT EXISTS document_links_status ON document_links (status, url);
+CREATE INDEX IF NOT EXISTS document_links_sha256 ON document_links (sha256);
+
+-- Watchlist terms found in each record when it was stored, updated or re-matched (watchlist.py)
+CREATE TABLE IF NOT EXISTS watch_hits (
+    hit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tender_id INTEGER NOT NULL REFERENCES tenders (id),
+    source TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    term TEXT NOT NULL,
+    field TEXT,
+    run_id INTEGER REFERENCES runs (run_id),
+    hit_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS watch_hits_tender_term ON watch_hits (tender_id, term);
+CREATE INDEX IF NOT EXISTS watch_hits_source ON watch_hits (source, hit_id);
+CREATE INDEX IF NOT EXISTS watch_hits_term ON watch_hits (term, hit_id);
+"""
+
+
+# Layout version of the store, kept in its PRAGMA user_version: bump it whenever SCHEMA or the tables of the
+# search, date or duplicate index change, so that older stores are migrated once, on their next open
+SCHEMA_VERSION = 2
+
+
+# Function to open the store; WAL mode lets the viewer read while scrapers write. Only a store older than
+# SCHEMA_VERSION (or a new one) is migrated; opening a current store runs no schema statements.
+def connect(db_path=None):
+    conn = sqlite3.connect(db_path or DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        migrate(conn)
+    return conn
+
+
+# Function to bring a store up to SCHEMA_VERSION: create the missing tables, and build the indexes a store
+# created before them lacks (or holds in an earlier layout) from what is stored
+def migrate(conn):
+    conn.executescript(SCHEMA)
+    if 'full_crawl_at' not in [row[1] for row in conn.execute("PRAGMA table_info(runs)")]:
+        with conn:
+            conn.execute("ALTER TABLE runs ADD COLUMN full_crawl_at TEXT")
+    if not search_index.is_current(conn):
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS tender_fts")
+            conn.executescript(search_index.SCHEMA)
+            search_index.rebuild(conn)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tender_dates'").fetchone():
+        with conn:
+            conn.executescript(date_index.SCHEMA)
+            date_index.rebuild(conn)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'minhash_signatures'").fetchone():
+        # dedup_signatures held signatures of an earlier hashing scheme
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS dedup_signatures")
+            conn.executescript(dedup.SCHEMA)
+            dedup.rebuild(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+# Function to turn pandas/numpy values into plain JSON values (NaN becomes null)
+def clean_value(value):
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+# Function to compute the unique key of a record for its source
+def record_key(source, record):
+    key_col = SOURCES[source]['key']
+    value = record[key_col] if key_col else next(iter(record.values()))
+    return None if value is None else str(value)
+
+
+# Function to turn a record's values into plain JSON values
+def normalize_record(record):
+    return {column: clean_value(value) for column, value in record.items()}
+
+
+# Function to open a run of a source on an open connection; returns its run_id
+def start_run(conn, source, kind='scrape'):
+    with conn:
+        return conn.execute("INSERT INTO runs (source, kind, started_at) VALUES (?, ?, ?)",
+                            (source, kind, datetime.now().isoformat(timespec='seconds'))).lastrowid
+
+
+# Function to record that a run crawled its source end to end
+def record_full_crawl(run_id, db_path=None):
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("UPDATE runs SET full_crawl_at = ? WHERE run_id = ?",
+                         (datetime.now().isoformat(timespec='seconds'), run_id))
+    finally:
+        conn.close()
+
+
+# Function to get when a source was last crawled end to end (None if it never was)
+def last_full_crawl(source, db_path=None):
+    conn = connect(db_path)
+    try:
+        return conn.execute("SELECT max(full_crawl_at) FROM runs WHERE source = ?", (source,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+# Function to list the tracked columns whose value differs between a stored record and a new scrape of it,
+# as {column: [old, new]}. Columns the new scrape left empty, or the stored version did not have yet (a
+# scraper that started keeping a column), are not changes. Values are compared as text: scrapes store
+# strings, while records imported by older versions may hold the numbers pandas inferred (1001 vs '1001').
+def changed_fields(old, new):
+    return {column: [old[column], value] for column, value in new.items()
+            if column not in UNTRACKED_FIELDS and value is not None and column in old
+            and str(old[column]) != str(value)}
+
+
+def _log_change(conn, run_id, source, key, kind, fields=None, now=None):
+    conn.execute("INSERT INTO changes (run_id, source, record_key, kind, fields, changed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                 (run_id, source, key, kind, None if fields is None else json.dumps(fields, ensure_ascii=False),
+                  now or datetime.now().isoformat(timespec='seconds')))
+
+
+# Function to store the watchlist terms a record matches (a term already recorded for it is kept as is);
+# returns how many hits are new
+def _record_hits(conn, matcher, rowid, source, key, record, run_id, now):
+    hits = 0
+    for term, field in matcher.match_record(record).items():
+        hits += conn.execute("INSERT OR IGNORE INTO watch_hits (tender_id, source, record_key, term, field, run_id, hit_at) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)", (rowid, source, key, term, field, run_id, now)).rowcount
+    return hits
+
+
+# Function to insert normalized records into a run, inside the caller's transaction. New keys are inserted,
+# and an existing key whose tracked columns changed (e.g. a BDL corrigendum or new due date) gets the new
+# values, keeping its first scraped date; both are appended to the change feed. Columns the stored version
+# lacks are filled in silently. History (imported files) only fills in missing keys and is not news, so it
+# is kept out of the feed. New and updated records have their dates and near-duplicate signature indexed
+# and are matched against the watchlist in the same pass. Returns (rows, inserted, updated).
+def insert_records(conn, run_id, source, records, history=False):
+    rows = inserted = updated = 0
+    now = datetime.now().isoformat(timespec='seconds')
+    matcher = watchlist.current()
+    deduplicate = []  # near-duplicate indexing is done for the whole batch at the end
+    for record in records:
+        key = record_key(source, record)
+        if key is None:
+            continue
+        rows += 1
+        # RETURNING gives the stored row after the statement; data is not in the SET, so for an existing key
+        # it is the previous version. Keys already written by this run return nothing.
+        stored = conn.execute(
+            "INSERT INTO tenders (source, record_key, data, first_run, last_run) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (source, record_key) DO UPDATE SET last_run = excluded.last_run "
+            "WHERE last_run < excluded.last_run RETURNING id, first_run, data",
+            (source, key, json.dumps(record, ensure_ascii=False), run_id, run_id)).fetchone()
+        if stored is None:
+            continue
+        rowid, first_run, data = stored
+        if first_run == run_id:
+            search_index.index_record(conn, rowid, source, record)
+            date_index.index_record(conn, rowid, source, key, record)
+            deduplicate.append((rowid, source, key, record))
+            if matcher:
+                _record_hits(conn, matcher, rowid, source, key, record, run_id, now)
+            if not history:
+                _log_change(conn, run_id, source, key, 'insert', now=now)
+            inserted += 1
+        elif not history:
+            old = json.loads(data)
+            fields = changed_fields(old, record)
+            added = {column: value for column, value in record.items() if column not in old and value is not None}
+            if fields or added:
+                merged = {**old, **added, **{column: values[1] for column, values in fields.items()}}
+                conn.execute("UPDATE tenders SET data = ? WHERE id = ?", (json.dumps(merged, ensure_ascii=False), rowid))
+                search_index.reindex_record(conn, rowid, source, merged)
+                date_index.index_record(conn, rowid, source, key, merged)
+                deduplicate.append((rowid, source, key, merged))
+                if matcher:
+                    _record_hits(conn, matcher, rowid, source, key, merged, run_id, now)
+            if fields:
+                _log_change(conn, run_id, source, key, 'update', fields, now)
+                updated += 1
+    dedup.index_records(conn, deduplicate)
+    conn.execute("UPDATE runs SET rows = rows + ?, inserted = inserted + ? WHERE run_id = ?",
+                 (rows, inserted, run_id))
+    return rows, inserted, updated
+
+
+# Function to insert records in one transaction under a new run. Returns (run_id, inserted).
+def upsert_records(source, records, kind='scrape', db_path=None):
+    conn = connect(db_path)
+    try:
+        run_id = start_run(conn, source, kind)
+        with conn:
+            _, inserted, _ = insert_records(conn, run_id, source, (normalize_record(record) for record in records),
+                                            history=kind == 'import')
+        return run_id, inserted
+    finally:
+        conn.close()
+
+
+# Function to record the last page written by a scrape (call inside the transaction writing the page)
+def save_checkpoint(conn, source, run_id, page, mode=None):
+    conn.execute("INSERT INTO checkpoints (source, run_id, mode, page, updated_at) VALUES (?, ?, ?, ?, ?) "
+                 "ON CONFLICT (source) DO UPDATE SET run_id = excluded.run_id, mode = excluded.mode, "
+                 "page = excluded.page, updated_at = excluded.updated_at",
+                 (source, run_id, mode, page, datetime.now().isoformat(timespec='seconds')))
+
+
+# Function to get the checkpoint a failed scrape left behind, unless it is older than max_age_hours
+def load_checkpoint(conn, source, max_age_hours=24):
+    row = conn.execute("SELECT run_id, mode, page, updated_at FROM checkpoints WHERE source = ?",
+                       (source,)).fetchone()
+    if row is None or datetime.now() - datetime.fromisoformat(row[3]) > timedelta(hours=max_age_hours):
+        return None
+    return {'run_id': row[0], 'mode': row[1], 'page': row[2]}
+
+
+# Function to drop a source's checkpoint once its scrape has finished
+def clear_checkpoint(conn, source):
+    with conn:
+        conn.execute("DELETE FROM checkpoints WHERE source = ?", (source,))
+
+
+# Function to get the last change a consumer has seen for a source. A consumer that never read the source
+# starts just before the latest run that changed it, so its first read shows that run's changes.
+def get_watermark(conn, consumer, source):
+    row = conn.execute("SELECT change_id FROM watermarks WHERE consumer = ? AND source = ?",
+                       (consumer, source)).fetchone()
+    if row:
+        return row[0]
+    latest = conn.execute("SELECT run_id FROM changes WHERE source = ? ORDER BY change_id DESC LIMIT 1",
+                          (source,)).fetchone()
+    if latest is None:
+        return 0
+    return conn.execute("SELECT MIN(change_id) - 1 FROM changes WHERE run_id = ?", (latest[0],)).fetchone()[0]
+
+
+# Function to read a source's changes after a change_id, oldest first (a range read on the feed's index)
+def changes_since(conn, source, change_id, limit=None):
+    rows = conn.execute("SELECT change_id, run_id, record_key, kind, fields, changed_at FROM changes "
+                        "WHERE source = ? AND change_id > ? ORDER BY change_id LIMIT ?",
+                        (source, change_id, -1 if limit is None else limit))
+    return [{'change_id': change_id, 'run_id': run_id, 'key': key, 'kind': kind,
+             'fields': json.loads(fields) if fields else {}, 'changed_at': changed_at}
+            for change_id, run_id, key, kind, fields, changed_at in rows]
+
+
+# Function to get the changes of a source a consumer has not seen yet. Nothing is marked as seen: the consumer
+# calls advance_watermark with the last change_id it has handled.
+def unseen_changes(consumer, source, limit=None, db_path=None):
+    conn = connect(db_path)
+    try:
+        return changes_since(conn, source, get_watermark(conn, consumer, source), limit)
+    finally:
+        conn.close()
+
+
+# Function to move a consumer's watermark forward (it never moves back, so late or repeated calls are harmless)
+def advance_watermark(consumer, source, change_id, db_path=None):
+    conn = connect(db_path)
+    try:
+        with conn:
+            set_watermark(conn, consumer, source, change_id)
+    finally:
+        conn.close()
+
+
+# Function to move a consumer's watermark forward on an open connection (inside the caller's transaction)
+def set_watermark(conn, consumer, source, change_id):
+    conn.execute("INSERT INTO watermarks (consumer, source, change_id, updated_at) VALUES (?, ?, ?, ?) "
+                 "ON CONFLICT (consumer, source) DO UPDATE SET change_id = MAX(change_id, excluded.change_id), "
+                 "updated_at = excluded.updated_at",
+                 (consumer, source, change_id, datetime.now().isoformat(timespec='seconds')))
+
+
+# Function to list stored watchlist hits, newest first, optionally for some sources or terms
+def watch_hits(sources=None, terms=None, limit=None, db_path=None):
+    query = "SELECT hit_id, source, record_key, term, field, run_id, hit_at FROM watch_hits"
+    clauses, params = [], []
+    for column, values in (('source', sources), ('term', terms)):
+        if values:
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY hit_id DESC LIMIT ?"
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(query, params + [-1 if limit is None else limit]).fetchall()
+    finally:
+        conn.close()
+    return [{'hit_id': hit_id, 'source': source, 'key': key, 'term': term, 'field': field, 'run_id': run_id,
+             'hit_at': hit_at} for hit_id, source, key, term, field, run_id, hit_at in rows]
+
+
+# Function to get the watchlist hits a consumer (e.g. an alerting script) has not seen yet, oldest first, with
+# the matched record. A consumer's first read only marks where it starts: alerts are for hits after that.
+# The consumer calls advance_watermark(consumer, WATCH_FEED, hit_id) once it has handled them.
+def unseen_hits(consumer, limit=None, db_path=None):
+    conn = connect(db_path)
+    try:
+        row = conn.execute("SELECT change_id FROM watermarks WHERE consumer = ? AND source = ?",
+                           (consumer, WATCH_FEED)).fetchone()
+        if row is None:
+            latest = conn.execute("SELECT MAX(hit_id) FROM watch_hits").fetchone()[0] or 0
+            with conn:
+                conn.execute("INSERT INTO watermarks (consumer, source, change_id, updated_at) VALUES (?, ?, ?, ?)",
+                             (consumer, WATCH_FEED, latest, datetime.now().isoformat(timespec='seconds')))
+            return []
+        rows = conn.execute(
+            "SELECT h.hit_id, h.source, h.record_key, h.term, h.field, h.run_id, h.hit_at, t.data FROM watch_hits h "
+            "JOIN tenders t ON t.id = h.tender_id WHERE h.hit_id > ? ORDER BY h.hit_id LIMIT ?",
+            (row[0], -1 if limit is None else limit)).fetchall()
+    finally:
+        conn.close()
+    return [{'hit_id': hit_id, 'source': source, 'key': key, 'term': term, 'field': field, 'run_id': run_id,
+             'hit_at': hit_at, 'record': json.loads(data)}
+            for hit_id, source, key, term, field, run_id, hit_at, data in rows]
+
+
+# Function to match every stored record against the current watchlist, after terms were added or removed.
+# Hits of terms no longer on the list are dropped; returns how many new hits were found.
+def rematch_watchlist(db_path=None):
+    matcher = watchlist.current()
+    now = datetime.now().isoformat(timespec='seconds')
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_terms (term TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM current_terms")
+            conn.executemany("INSERT OR IGNORE INTO current_terms VALUES (?)", ((term,) for term in matcher.terms))
+            conn.execute("DELETE FROM watch_hits WHERE term NOT IN (SELECT term FROM current_terms)")
+            hits = 0
+            if matcher:
+                for rowid, source, key, data in conn.execute("SELECT id, source, record_key, data FROM tenders").fetchall():
+                    hits += _record_hits(conn, matcher, rowid, source, key, json.loads(data), None, now)
+        return hits
+    finally:
+        conn.close()
+
+
+# Function to list the keys of a source's tenders whose typed date ('scraped_on', 'opening_on', 'closing_on' or
+# 'updated_on') falls between two dates, inclusive; an index range read
+def dated_keys(source, column, since=None, until=None, db_path=None):
+    conn = connect(db_path)
+    try:
+        return date_index.keys_between(conn, source, column, since and str(since)[:10], until and str(until)[:10])
+    finally:
+        conn.close()
+
+
+# Function to list pairs of tenders from different sources that look like the same procurement, most
+# similar first, optionally involving some sources
+def duplicate_pairs(sources=None, min_similarity=None, limit=None, db_path=None):
+    query = ("SELECT a.source, a.record_key, a.data, b.source, b.record_key, b.data, d.similarity FROM duplicates d "
+             "JOIN tenders a ON a.id = d.tender_id JOIN tenders b ON b.id = d.duplicate_of WHERE d.similarity >= ?")
+    params = [min_similarity if min_similarity is not None else dedup.THRESHOLD]
+    if sources:
+        marks = ', '.join('?' * len(sources))
+        query += f" AND (a.source IN ({marks}) OR b.source IN ({marks}))"
+        params += list(sources) * 2
+    query += " ORDER BY d.similarity DESC LIMIT ?"
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(query, params + [-1 if limit is None else limit]).fetchall()
+    finally:
+        conn.close()
+    return [{'tender': tender_schema.unify(source, key, json.loads(data)),
+             'duplicate_of': tender_schema.unify(other_source, other_key, json.loads(other_data)),
+             'similarity': score}
+            for source, key, data, other_source, other_key, other_data, score in rows]
+
+
+# Function to load tenders of some sources (all by default) in the unified schema, as a DataFrame
+def load_unified(sources=None, db_path=None):
+    query = "SELECT source, record_key, data FROM tenders"
+    if sources:
+        query += f" WHERE source IN ({', '.join('?' * len(sources))})"
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(query + " ORDER BY id", list(sources or [])).fetchall()
+    finally:
+        conn.close()
+    return pd.DataFrame([tender_schema.unify(source, key, json.loads(data)) for source, key, data in rows],
+                        columns=list(tender_schema.FIELDS))
+
+
+# Function to count stored records for a source
+def count_records(source, db_path=None):
+    conn = connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM tenders WHERE source = ?", (source,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+# Function to get a cheap version stamp for a source: it changes whenever a run writes to it. A resumed
+# scrape keeps its run_id, so the latest change of the source's feed is part of the stamp (imports log no
+# changes, but start runs), and so is its latest watchlist hit (re-matching the watchlist adds hits
+# without a run).
+def data_version(source, db_path=None):
+    conn = connect(db_path)
+    try:
+        run_id = conn.execute("SELECT MAX(run_id) FROM runs WHERE source = ?", (source,)).fetchone()[0] or 0
+        change_id = conn.execute("SELECT MAX(change_id) FROM changes WHERE source = ?", (source,)).fetchone()[0] or 0
+        hit_id = conn.execute("SELECT MAX(hit_id) FROM watch_hits WHERE source = ?", (source,)).fetchone()[0] or 0
+        return f"{run_id}.{change_id}.{hit_id}" if run_id else 0
+    finally:
+        conn.close()
+
+
+# Function to search every source's titles, descriptions, organizations and specs. Words match as prefixes,
+# results are ranked best first and can be limited to some sources and a scraped-date range (YYYY-MM-DD).
+def search(text, sources=None, since=None, until=None, limit=50, db_path=None):
+    conn = connect(db_path)
+    try:
+        rows = search_index.search(conn, text, sources, since, until, limit)
+    finally:
+        conn.close()
+    return [{'source': source, 'key': key, 'record': json.loads(data), 'scraped_date': scraped_date,
+             'snippet': snippet, 'rank': rank} for source, key, data, scraped_date, snippet, rank in rows]
+
+
+# Function to summarize changes per record key: 'New' if the record was inserted, else 'Updated'
+def change_status(changes):
+    status = {}
+    for change in changes:
+        if status.get(change['key']) != 'New':
+            status[change['key']] = 'New' if change['kind'] == 'insert' else 'Updated'
+    return status
+
+
+# Function to load a source as a DataFrame indexed by record key. With a consumer, a Status column tells
+# which records are New or Updated since that consumer's watermark (the rest are Old).
+def load_frame(source, db_path=None, consumer=None):
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT record_key, data FROM tenders WHERE source = ? ORDER BY id",
+                            (source,)).fetchall()
+        status = change_status(changes_since(conn, source, get_watermark(conn, consumer, source))) \
+            if consumer else None
+    finally:
+        conn.close()
+    records = []
+    for key, data in rows:
+        record = json.loads(data)
+        if status is not None:
+            record['Status'] = status.get(key, 'Old')
+        records.append(record)
+    # Indexed by the record key so search hits and changes can be matched back to rows
+    frame = pd.DataFrame(records, index=pd.Index([key for key, _ in rows], name='Key'))
+    if SOURCES[source].get('newest_first') and 'Scraped Date' in frame.columns:
+        frame = frame.sort_values(by='Scraped Date', ascending=False, kind='stable')
+    return frame
+
+
+# Function to write a source's export files (CSV/XLSX) from the store. Status is relative to the previous
+# export, whose watermark is moved up to the changes the files now contain.
+def export_source(source, directory='.', db_path=None, consumer=EXPORT_CONSUMER):
+    conn = connect(db_path)
+    try:
+        latest = conn.execute("SELECT MAX(change_id) FROM changes WHERE source = ?", (source,)).fetchone()[0]
+    finally:
+        conn.close()
+    frame = load_frame(source, db_path, consumer)
+    paths = []
+    for file_name in SOURCES[source]['exports']:
+        path = os.path.join(directory, file_name)
+        if path.endswith('.csv'):
+            frame.to_csv(path, index=False, encoding='utf-8')
+        else:
+            frame.to_excel(path, index=False)
+        paths.append(path)
+    if latest:
+        advance_watermark(consumer, source, latest, db_path)
+    return paths
+
+
+# Function to import one existing CSV/XLSX history file into the store (Status is derived, so it is dropped).
+# Cells are read as text, as the scrapers store them: inferred numbers would make the next scrape of the
+# same tender look like a change, and a column with blanks would turn keys into floats ('1001.0').
+def import_file(source, path, db_path=None):
+    read = pd.read_csv if path.endswith('.csv') else pd.read_excel
+    frame = read(path, dtype=str, keep_default_na=False)
+    frame = frame.drop(columns=['Status'], errors='ignore')
+    _, inserted = upsert_records(source, frame.to_dict('records'), kind='import', db_path=db_path)
+    return inserted
+
+
+# Function to import every existing history file found in a directory (one-shot migration)
+def import_existing_files(directory='.', db_path=None):
+    imported = {}
+    for source, config in SOURCES.items():
+        for file_name in config['exports']:
+            path = os.path.join(directory, file_name)
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                imported[source] = import_file(source, path, db_path)
+                break  # GEM's CSV and XLSX hold the same rows
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the tender store")
+    parser.add_argument("command",
+                        choices=["import", "export", "reindex", "changes", "watch", "rematch", "duplicates"])
+    parser.add_argument("directory", nargs="?", default=".")
+    parser.add_argument("--source", choices=list(SOURCES), action="append")
+    parser.add_argument("--consumer", default="cli", help="feed reader whose watermark 'changes'/'watch' advances")
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+
+    if args.command == "reindex":
+        conn = connect(args.db)
+        try:
+            with conn:
+                search_index.rebuild(conn)
+                date_index.rebuild(conn)
+                dedup.rebuild(conn)
+        finally:
+            conn.close()
+        print("Search, date and duplicate indexes rebuilt")
+    elif args.command == "changes":
+        # One JSON line per unseen change, e.g. for an alerting script; the watermark moves past them
+        for source in args.source or list(SOURCES):
+            changes = unseen_changes(args.consumer, source, db_path=args.db)
+            for change in changes:
+                print(json.dumps({'source': source, **change}, ensure_ascii=False))
+            if changes:
+                advance_watermark(args.consumer, source, changes[-1]['change_id'], args.db)
+    elif args.command == "watch":
+        # One JSON line per watchlist hit since the consumer's last read
+        hits = unseen_hits(args.consumer, db_path=args.db)
+        for hit in hits:
+            print(json.dumps(hit, ensure_ascii=False))
+        if hits:
+            advance_watermark(args.consumer, WATCH_FEED, hits[-1]['hit_id'], args.db)
+    elif args.command == "rematch":
+        print(f"Watchlist re-matched: {rematch_watchlist(args.db)} new hits")
+    elif args.command == "duplicates":
+        for pair in duplicate_pairs(args.source, db_path=args.db):
+            first, second = pair['tender'], pair['duplicate_of']
+            print(f"{pair['similarity']:.2f}  {first['source']} {first['source_id']}: {first['title']}\n"
+                  f"      {second['source']} {second['source_id']}: {second['title']}")
+    elif args.command == "import":
+        for source, inserted in import_existing_files(args.directory, args.db).items():
+            print(f"Imported {inserted} {source} records")
+    else:
+        for source in args.source or list(SOURCES):
+            if count_records(source, args.db):
+                for path in export_source(source, args.directory, args.db):
+                    print(f"Exported {source} to {path}")
+
+
+if __name__ == "__main__":
+    main()
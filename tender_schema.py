@@ -0,0 +1,51 @@
+import date_index
+
+# One tender schema for every source. Each source stores records with its own columns; a mapper turns a
+# stored record into these fields, so tenders from different portals can be listed, compared and
+# de-duplicated together. source_id is the record's key in its source; the dates come from the date index.
+FIELDS = ('source', 'source_id', 'title', 'organization', 'description', 'reference', 'link',
+          'opening_on', 'closing_on', 'scraped_on')
+
+# Which record columns feed each unified field, per source (several columns are joined with " | ")
+COLUMN_MAPPINGS = {
+    'ISRO': {'title': ['Title'], 'organization': ['Organization'], 'reference': ['Tender ID'],
+             'link': ['Tender Document']},
+    'GEM': {'title': ['Descriptor'], 'description': ['Specs'], 'reference': ['ID']},
+    'Invest India': {'title': ['Tender Head'], 'description': ['Tender List Inner']},
+    'DST': {'title': ['Title'], 'description': ['Description'], 'link': ['Link']},
+    'Srijan': {'title': ['Product Title']},
+    'BDL': {'title': ['Tender Description'], 'organization': ['Department/Unit'], 'reference': ['Tender No'],
+            'link': ['Tender Link']},
+}
+
+
+def _text(values):
+    return ' | '.join(str(value).strip() for value in values if value not in (None, '')) or None
+
+
+# Function to build a mapper from a column mapping
+def columns_mapper(mapping):
+    def mapper(record):
+        return {field: _text(record.get(column) for column in columns) for field, columns in mapping.items()}
+    return mapper
+
+
+# NAL's table has no fixed header: its first column is the tender number and the next one the description
+def map_nal(record):
+    values = [value for column, value in record.items() if column != 'Scraped Date']
+    return {'reference': _text(values[:1]), 'title': _text(values[1:2]) or _text(values[:1]),
+            'description': _text(values[2:])}
+
+
+MAPPERS = {source: columns_mapper(mapping) for source, mapping in COLUMN_MAPPINGS.items()}
+MAPPERS['NAL'] = map_nal
+
+
+# Function to map a stored record of a source onto the unified schema
+def unify(source, key, record):
+    unified = dict.fromkeys(FIELDS)
+    unified.update(MAPPERS[source](record))
+    unified.update(date_index.record_dates(source, record))
+    unified['source'] = source
+    unified['source_id'] = key
+    return unified
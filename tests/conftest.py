@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# The modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# A fresh tender store per test, with no watchlist
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    import store
+    import watchlist
+    path = str(tmp_path / "tenders.db")
+    monkeypatch.setattr(store, "DB_PATH", path)
+    monkeypatch.setattr(watchlist, "WATCHLIST_PATH", str(tmp_path / "watchlist.txt"))
+    return path
@@ -0,0 +1,28 @@
+import store
+
+
+def _scrape(db_path, *records):
+    store.upsert_records('BDL', [dict({'Scraped Date': '2024-11-05'}, **record) for record in records], db_path=db_path)
+
+
+def test_watermark_advances_past_handled_changes_only(db_path):
+    _scrape(db_path, {'Tender ID': '1001', 'Due Date': '10-12-2024'}, {'Tender ID': '1002', 'Due Date': '11-12-2024'})
+    changes = store.unseen_changes('alerts', 'BDL', db_path=db_path)
+    assert [(change['kind'], change['key']) for change in changes] == [('insert', '1001'), ('insert', '1002')]
+
+    # Handling only the first change leaves the second unseen
+    store.advance_watermark('alerts', 'BDL', changes[0]['change_id'], db_path)
+    assert [change['key'] for change in store.unseen_changes('alerts', 'BDL', db_path=db_path)] == ['1002']
+
+    store.advance_watermark('alerts', 'BDL', changes[1]['change_id'], db_path)
+    _scrape(db_path, {'Tender ID': '1001', 'Due Date': '17-12-2024'})
+    [update] = store.unseen_changes('alerts', 'BDL', db_path=db_path)
+    assert (update['kind'], update['key']) == ('update', '1001')
+    assert update['fields'] == {'Due Date': ['10-12-2024', '17-12-2024']}
+
+    # A late call with an older change_id never moves the watermark back
+    store.advance_watermark('alerts', 'BDL', update['change_id'], db_path)
+    store.advance_watermark('alerts', 'BDL', changes[0]['change_id'], db_path)
+    assert store.unseen_changes('alerts', 'BDL', db_path=db_path) == []
+    # Consumers keep their own watermarks
+    assert store.unseen_changes('viewer', 'BDL', db_path=db_path) == [update]
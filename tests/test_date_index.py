@@ -0,0 +1,40 @@
+import pytest
+from date_index import parse_date
+
+
+@pytest.mark.parametrize("value, expected", [
+    # ISO dates pass through
+    ("2024-11-05", "2024-11-05"),
+    ("2024-1-5", "2024-01-05"),
+    # Day first, whatever the separator
+    ("05-11-2024", "2024-11-05"),
+    ("5/11/2024", "2024-11-05"),
+    ("05.11.2024", "2024-11-05"),
+    ("12-01-2024", "2024-01-12"),
+    # Two-digit years
+    ("05-11-24", "2024-11-05"),
+    ("05/11/24", "2024-11-05"),
+    ("5.11.24", "2024-11-05"),
+    ("05-Nov-24", "2024-11-05"),
+    # Month names
+    ("05-Nov-2024", "2024-11-05"),
+    ("05/Nov/2024", "2024-11-05"),
+    ("05.Nov.2024", "2024-11-05"),
+    ("5 November 2024", "2024-11-05"),
+    ("05-November-2024", "2024-11-05"),
+    # Times and surrounding text are dropped
+    ("05-11-2024 17:30", "2024-11-05"),
+    ("Due: 31.12.2024 10:00 AM", "2024-12-31"),
+    ("29-02-2024", "2024-02-29"),
+])
+def test_dates_are_read_day_first(value, expected):
+    assert parse_date(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    None, "", "N/A", "0", "2024", "12345", "Tender 12-2024",
+    "13-31-2024",  # Month first is not a format the sources use
+    "31-02-2024", "29-02-2023", "32-01-2024", "05-Foo-2024",
+])
+def test_values_without_a_valid_date_give_none(value):
+    assert parse_date(value) is None
@@ -0,0 +1,33 @@
+import dedup
+import store
+
+TITLE = "Supply and installation of ground station antenna tracking system with spares"
+
+
+def test_same_tender_on_two_portals_is_a_duplicate(db_path):
+    store.upsert_records('ISRO', [{'Tender ID': 'ISRO/17', 'Title': TITLE}], db_path=db_path)
+    store.upsert_records('BDL', [{'Tender ID': '1001', 'Tender Description': TITLE.upper() + '.'},
+                                 {'Tender ID': '1002', 'Tender Description': "Repair of hydraulic test benches"}],
+                         db_path=db_path)
+
+    pairs = store.duplicate_pairs(db_path=db_path)
+    assert [(pair['tender']['source_id'], pair['duplicate_of']['source_id']) for pair in pairs] == \
+        [('1001', 'ISRO/17')]
+    assert pairs[0]['similarity'] == 1.0
+
+
+def test_changed_text_drops_pairs_in_both_directions(db_path):
+    store.upsert_records('ISRO', [{'Tender ID': 'ISRO/17', 'Title': TITLE}], db_path=db_path)
+    store.upsert_records('BDL', [{'Tender ID': '1001', 'Tender Description': TITLE}], db_path=db_path)
+    assert len(store.duplicate_pairs(db_path=db_path)) == 1
+
+    # The ISRO tender (the duplicate_of side) is rewritten into something else
+    store.upsert_records('ISRO', [{'Tender ID': 'ISRO/17', 'Title': "Annual maintenance of clean room chillers"}],
+                         db_path=db_path)
+    assert store.duplicate_pairs(db_path=db_path) == []
+
+
+def test_signature_estimates_jaccard_similarity():
+    first = dedup.signature("procurement of radar antenna modules and spares")
+    assert dedup.similarity(first, dedup.signature("procurement of radar antenna modules and spares")) == 1.0
+    assert dedup.similarity(first, dedup.signature("hydraulic valves for test bench repair")) < 0.2
@@ -0,0 +1,74 @@
+import documents
+import store
+
+
+def _links(conn):
+    return conn.execute("SELECT url, status FROM document_links ORDER BY url").fetchall()
+
+
+def _scrape(db_path, **record):
+    store.upsert_records('BDL', [dict({'Tender ID': '1001', 'Tender Description': "Supply of cables"}, **record)],
+                         db_path=db_path)
+
+
+def test_links_follow_the_tenders_they_belong_to(db_path):
+    _scrape(db_path, **{'Tender Link': "https://bdl.example/docs/1001-v1.pdf", 'Corrigendum': '0'})
+    conn = store.connect(db_path)
+    try:
+        assert documents.discover_links(conn, ['BDL']) == 1
+        documents._save_document(conn, "https://bdl.example/docs/1001-v1.pdf",
+                                 {'sha256': 'a' * 64, 'path': 'unused', 'size': 1, 'content_type': 'text/plain'},
+                                 "first version")
+        assert documents.discover_links(conn, ['BDL']) == 0
+        assert _links(conn) == [("https://bdl.example/docs/1001-v1.pdf", 'done')]
+
+        # A corrigendum behind the same URL: the document is downloaded again
+        _scrape(db_path, **{'Tender Link': "https://bdl.example/docs/1001-v1.pdf", 'Corrigendum': '1'})
+        documents.discover_links(conn, ['BDL'])
+        assert _links(conn) == [("https://bdl.example/docs/1001-v1.pdf", 'pending')]
+
+        # A new URL replaces the old one
+        _scrape(db_path, **{'Tender Link': "https://bdl.example/docs/1001-v2.pdf", 'Corrigendum': '1'})
+        assert documents.discover_links(conn, ['BDL']) == 1
+        assert _links(conn) == [("https://bdl.example/docs/1001-v2.pdf", 'pending')]
+        assert documents.pending_urls(conn, ['BDL']) == ["https://bdl.example/docs/1001-v2.pdf"]
+    finally:
+        conn.close()
+
+
+def test_tenders_are_scanned_for_links_once(db_path, tmp_path, monkeypatch):
+    _scrape(db_path, **{'Tender Link': "not a link"})
+    scans = []
+    sync_links = documents._sync_links
+    monkeypatch.setattr(documents, "_sync_links", lambda conn, rowid, *args: scans.append(rowid) or sync_links(
+        conn, rowid, *args))
+    conn = store.connect(db_path)
+    try:
+        assert documents.discover_links(conn, ['BDL']) == 0
+        assert len(scans) == 1
+        # A tender without links is not scanned again
+        assert documents.discover_links(conn, ['BDL']) == 0
+        assert len(scans) == 1
+
+        # An imported tender logs no change, but is found by its id
+        path = str(tmp_path / "bdl_tenders.csv")
+        with open(path, "w") as f:
+            f.write("Tender ID,Tender Description,Tender Link\n1002,Cables,https://bdl.example/docs/1002.pdf\n")
+        store.import_file('BDL', path, db_path)
+        assert documents.discover_links(conn, ['BDL']) == 1
+        assert len(scans) == 2
+    finally:
+        conn.close()
+
+
+def test_only_failed_downloads_count_as_attempts(db_path):
+    _scrape(db_path, **{'Tender Link': "https://bdl.example/docs/1001.pdf"})
+    conn = store.connect(db_path)
+    try:
+        documents.discover_links(conn, ['BDL'])
+        documents._mark_failed(conn, "https://bdl.example/docs/1001.pdf", ConnectionError("reset"))
+        documents._save_document(conn, "https://bdl.example/docs/1001.pdf",
+                                 {'sha256': 'b' * 64, 'path': 'unused', 'size': 1, 'content_type': 'text/plain'}, "text")
+        assert conn.execute("SELECT status, attempts, error FROM document_links").fetchall() == [('done', 1, None)]
+    finally:
+        conn.close()
@@ -0,0 +1,137 @@
+import pytest
+import requests
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException, WebDriverException
+import host_policy
+
+
+# Stands in for the time module: sleeping only moves the clock
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(host_policy, "time", clock)
+    monkeypatch.setattr(host_policy, "_policies", {})
+    monkeypatch.setattr(host_policy, "BREAKER_THRESHOLD", 2)
+    monkeypatch.setattr(host_policy, "BREAKER_COOLDOWN", 60)
+    monkeypatch.setattr(host_policy, "RATE_LIMIT", 0)
+    return clock
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+# A request failing with the given errors in turn, then returning "ok"
+def failing(*errors):
+    calls = []
+
+    def request():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+    return request, calls
+
+
+def test_bucket_allows_a_burst_then_refills_at_its_rate(clock):
+    bucket = host_policy.TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+    clock.now += 10  # Idle time refills the bucket up to the burst, not beyond
+    for _ in range(3):
+        bucket.acquire()
+    assert len(clock.sleeps) == 1
+    bucket.acquire()
+    assert len(clock.sleeps) == 2
+
+
+def test_breaker_opens_then_lets_one_trial_through_after_the_cooldown(clock):
+    breaker = host_policy.CircuitBreaker(threshold=2, cooldown=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now += 60
+    assert breaker.allow()  # Half-open: one trial request
+    assert not breaker.allow()
+    breaker.record_failure()  # The trial failed: open for another cooldown
+    clock.now += 59
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow()
+    breaker.record_success()  # The trial succeeded: closed
+    assert breaker.allow() and breaker.allow()
+
+
+def test_transient_errors_are_retried_up_to_the_cap(clock, monkeypatch):
+    monkeypatch.setattr(host_policy, "BREAKER_THRESHOLD", 10)
+    request, calls = failing(http_error(503), requests.ConnectionError(), TimeoutException())
+    assert host_policy.call("https://example.org/a", request, retries=3) == "ok"
+    assert len(calls) == 4
+    assert len(clock.sleeps) == 3
+
+    request, calls = failing(*[http_error(502)] * 3)
+    with pytest.raises(requests.HTTPError):
+        host_policy.call("https://example.org/b", request, retries=2)
+    assert len(calls) == 3
+
+
+def test_backoff_grows_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(host_policy.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(host_policy, "BACKOFF_BASE", 1)
+    assert [host_policy.backoff_delay(attempt) for attempt in range(7)] == [1, 2, 4, 8, 16, 30, 30]
+
+
+@pytest.mark.parametrize("error", [
+    http_error(404),
+    ValueError("unexpected markup"),
+    InvalidSessionIdException("invalid session id"),
+    WebDriverException("chrome not reachable"),
+])
+def test_permanent_and_browser_errors_are_not_retried(clock, error):
+    request, calls = failing(error)
+    with pytest.raises(type(error)):
+        host_policy.call("https://example.org/", request)
+    assert len(calls) == 1
+    assert clock.sleeps == []
+    # Nor do they count against the host
+    assert host_policy.policy_for("https://example.org/").breaker.failures == 0
+
+
+def test_failed_navigation_is_transient():
+    assert host_policy.is_transient(WebDriverException("unknown error: net::ERR_CONNECTION_RESET"))
+
+
+def test_open_circuit_skips_the_host_until_the_cooldown(clock):
+    request, calls = failing(http_error(503), http_error(503))
+    # The second failure opens the circuit, which stops the retries too
+    with pytest.raises(host_policy.CircuitOpenError):
+        host_policy.call("https://example.org/", request, retries=5)
+    assert len(calls) == 2
+    with pytest.raises(host_policy.CircuitOpenError):
+        host_policy.call("https://example.org/other", request)
+    assert len(calls) == 2
+
+    clock.now += 60
+    assert host_policy.call("https://example.org/", request) == "ok"
+    assert host_policy.call("https://example.org/", request) == "ok"
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import http_client
+
+
+# Test site serving one page; 'etag' False serves it without validators
+class Site(BaseHTTPRequestHandler):
+    body = b""
+    etag = True
+    requests = []
+
+    def do_GET(self):
+        etag = '"%s"' % hashlib.sha256(self.body).hexdigest()[:12]
+        type(self).requests.append(dict(self.headers))
+        if self.etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.body)))
+        if self.etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_client, "CACHE_DIR", str(tmp_path / "http_cache"))
+    monkeypatch.setattr(http_client, "CACHE_ENABLED", True)
+    monkeypatch.setattr(Site, "body", b"<table><tr><td>T-1</td></tr></table>")
+    monkeypatch.setattr(Site, "etag", True)
+    monkeypatch.setattr(Site, "requests", [])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Site)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/tenders"
+    server.shutdown()
+    server.server_close()
+
+
+def test_page_is_skipped_only_after_it_was_processed(site):
+    first = http_client.fetch(site)
+    assert (first.status_code, first.unchanged, first.content) == (200, False, Site.body)
+    assert "If-None-Match" not in Site.requests[-1]
+
+    # Not committed (the run failed before processing it): fetched and processed again
+    again = http_client.fetch(site)
+    assert (again.status_code, again.unchanged) == (200, False)
+    again.commit()
+
+    cached = http_client.fetch(site)
+    assert Site.requests[-1]["If-None-Match"] == http_client.load_cache_entry(site)["etag"]
+    assert (cached.status_code, cached.unchanged, cached.content) == (304, True, b"")
+    cached.raise_for_status()
+    cached.commit()  # Keeps the entry of the processed page
+    assert http_client.fetch(site).unchanged
+
+
+def test_changed_page_is_processed_again(site):
+    http_client.fetch(site).commit()
+    Site.body = b"<table><tr><td>T-2</td></tr></table>"
+
+    changed = http_client.fetch(site)
+    assert (changed.status_code, changed.unchanged, changed.content) == (200, False, Site.body)
+    changed.commit()
+    assert http_client.fetch(site).unchanged
+
+
+def test_same_bytes_without_validators_count_as_unchanged(site):
+    Site.etag = False
+    http_client.fetch(site).commit()
+    assert "If-None-Match" not in Site.requests[-1]
+
+    same = http_client.fetch(site)
+    assert (same.status_code, same.unchanged) == (200, True)
+    Site.body += b"<!-- new -->"
+    assert not http_client.fetch(site).unchanged
+
+
+def test_unconditional_and_uncached_fetches_never_skip(site, monkeypatch):
+    http_client.fetch(site).commit()
+    assert not http_client.fetch(site, conditional=False).unchanged
+    assert "If-None-Match" not in Site.requests[-1]
+
+    monkeypatch.setattr(http_client, "CACHE_ENABLED", False)
+    assert not http_client.fetch(site).unchanged
@@ -0,0 +1,46 @@
+import pytest
+import api_sources
+import scraper
+
+
+def test_nal_header_may_use_th_cells():
+    page = (b"<table><tr><th>Tender No</th><th>Description</th></tr>"
+            b"<tr><td>NAL/PUR/17</td><td>Wind tunnel balance</td></tr></table>")
+    [(page_number, records)] = list(scraper.parse_nal_page(page))
+    assert records[0]['Tender No'] == 'NAL/PUR/17'
+    assert records[0]['Description'] == 'Wind tunnel balance'
+
+
+def test_nal_table_without_header_is_an_error():
+    with pytest.raises(ValueError):
+        list(scraper.parse_nal_page(b"<table><tr><td> </td></tr><tr><td>NAL/PUR/17</td></tr></table>"))
+
+
+def test_isro_endpoint_cells_read_like_the_browser_table():
+    payload = {'data': [
+        ['ISRO/2024/1', '<span>VSSC</span>\n   Thiruvananthapuram', 'Radar&nbsp;&nbsp;spares<br> lot 2',
+         ' 05-11-2024 ', '06-11-2024', '<a href="doc?id=1">View</a>'],
+        ['ISRO/2024/2', 'LPSC', 'No document', '05-11-2024', '06-11-2024', '<a>View</a>'],
+    ]}
+    rows = api_sources.isro_rows(payload, 'https://eproc.example', '2024-11-05')
+    assert rows == [['ISRO/2024/1', 'VSSC Thiruvananthapuram', 'Radar  spares\nlot 2', '05-11-2024', '06-11-2024',
+                     'https://eproc.example/doc?id=1', '2024-11-05']]
+
+
+def test_gem_endpoint_text_is_collapsed_like_rendered_text():
+    payload = {'records': [{'id': 42, 'descriptor': ' Night  vision\nbinocular ', 'specs': 'Gen 3'}]}
+    assert api_sources.gem_rows(payload, '2024-11-05') == [['Night vision binocular', '42', 'Gen 3', '2024-11-05']]
+
+
+def test_known_page_count_skips_the_first_page(monkeypatch):
+    fetched = []
+
+    def get_json(url):
+        fetched.append(url)
+        return {'total_pages': 9, 'records': [{'id': url, 'descriptor': 'd', 'specs': 's'}]}
+    monkeypatch.setattr(api_sources, "get_json", get_json)
+    monkeypatch.setattr(api_sources, "get_json_many", lambda urls: map(get_json, urls))
+
+    pages = list(api_sources.gem_pages('https://gem.example', '2024-11-05', 6, start_page=3, pages=6))
+    assert [page for page, _ in pages] == [3, 4, 5]
+    assert fetched == [api_sources.gem_page_url('https://gem.example', page) for page in (4, 5, 6)]
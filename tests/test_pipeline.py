@@ -0,0 +1,36 @@
+import pytest
+import store
+from pipeline import PartialCrawlError, RecordPipeline
+
+
+def _page(page, size=3):
+    return [{'Tender ID': str(page * size + n), 'Tender Description': f"Tender {page * size + n}",
+             'Scraped Date': '2024-11-05'} for n in range(size)]
+
+
+def _pages(start, stop, fail_at=None):
+    for page in range(start, stop):
+        if page == fail_at:
+            raise ConnectionError("site went away")
+        yield page, _page(page)
+
+
+def test_interrupted_crawl_resumes_after_its_last_saved_page(db_path):
+    with pytest.raises(PartialCrawlError) as failure:
+        with RecordPipeline('BDL', db_path=db_path) as pipeline:
+            pipeline.consume(_pages(pipeline.start_page(), 5, fail_at=3))
+    assert failure.value.rows == 9
+    interrupted_run = pipeline.run_id
+    version = store.data_version('BDL', db_path)
+
+    with RecordPipeline('BDL', db_path=db_path) as pipeline:
+        assert pipeline.start_page() == 3
+        pipeline.consume(_pages(pipeline.start_page(), 5))
+
+    # The resumed crawl continues the interrupted run and finishes it
+    assert pipeline.run_id == interrupted_run
+    assert pipeline.inserted == 6
+    assert store.count_records('BDL', db_path) == 15
+    assert store.data_version('BDL', db_path) != version
+    with RecordPipeline('BDL', db_path=db_path) as pipeline:
+        assert pipeline.start_page() == 0
@@ -0,0 +1,52 @@
+import threading
+import scraper
+from pipeline import PartialCrawlError
+
+
+def _named(name, func):
+    func.__name__ = name
+    return func
+
+
+def test_hung_source_times_out_without_holding_back_the_others():
+    release = threading.Event()
+    ran = []
+
+    def hangs():
+        ran.append('hangs')
+        release.wait(10)
+        return 99
+
+    def fails():
+        ran.append('fails')
+        raise ValueError("table layout changed")
+
+    def partial():
+        ran.append('partial')
+        raise PartialCrawlError('GEM', 40, ConnectionError("reset"))
+
+    def works():
+        ran.append('works')
+        return 12
+
+    scrapers = [_named('hangs', hangs), _named('fails', fails), _named('partial', partial), _named('works', works)]
+    try:
+        # One worker: the others only run once the hung source's slot is taken back
+        summary = scraper.run_scrapers(scrapers, max_workers=1, timeout=0.3, poll_interval=0.02)
+    finally:
+        release.set()
+
+    sources = {source['source']: source for source in summary['sources']}
+    assert [source['source'] for source in summary['sources']] == ['hangs', 'fails', 'partial', 'works']
+    assert sorted(ran) == ['fails', 'hangs', 'partial', 'works']
+    assert sources['hangs']['status'] == 'timeout'
+    assert sources['hangs']['error'] == "Timed out after 0.3s"
+    assert sources['hangs']['rows'] == 0
+    assert sources['fails']['status'] == 'error'
+    assert sources['fails']['error'] == "ValueError: table layout changed"
+    assert (sources['partial']['status'], sources['partial']['rows']) == ('partial', 40)
+    assert (sources['works']['status'], sources['works']['rows'], sources['works']['error']) == ('ok', 12, None)
+    assert summary['rows'] == 52
+    assert summary['errors'] == 3
+    assert summary['wall_time'] < 5
+
@@ -0,0 +1,87 @@
+import pandas as pd
+import store
+
+
+def _changes(db_path, source):
+    conn = store.connect(db_path)
+    try:
+        return conn.execute("SELECT kind, record_key, fields FROM changes WHERE source = ?", (source,)).fetchall()
+    finally:
+        conn.close()
+
+
+BDL_RECORD = {'Tender ID': '1001', 'Tender No': 'BDL/2024/17', 'Tender Description': 'Supply of connectors',
+              'Corrigendum': '0', 'Scraped Date': '2024-11-05'}
+
+
+def test_imported_record_scraped_again_is_not_a_change(db_path, tmp_path):
+    # A second row with blanks makes pandas infer floats for the numeric columns
+    path = str(tmp_path / "bdl_tenders.csv")
+    pd.DataFrame([BDL_RECORD, {'Tender ID': '1002', 'Tender No': '', 'Tender Description': 'Cables',
+                               'Corrigendum': '', 'Scraped Date': '2024-11-05'}]).to_csv(path, index=False)
+    assert store.import_file('BDL', path, db_path) == 2
+
+    store.upsert_records('BDL', [dict(BDL_RECORD, **{'Scraped Date': '2024-11-06'})], db_path=db_path)
+
+    assert _changes(db_path, 'BDL') == []
+    assert store.count_records('BDL', db_path) == 2
+
+
+def test_upserting_the_same_records_again_stores_them_once(db_path):
+    records = [dict(BDL_RECORD, **{'Tender ID': str(n)}) for n in range(1000, 1005)]
+    _, inserted = store.upsert_records('BDL', records, db_path=db_path)
+    assert inserted == 5
+    _, inserted = store.upsert_records('BDL', records + records[:2], db_path=db_path)
+    assert inserted == 0
+    assert store.count_records('BDL', db_path) == 5
+    assert [kind for kind, _, _ in _changes(db_path, 'BDL')] == ['insert'] * 5
+
+    # The same key in another source is another tender
+    store.upsert_records('ISRO', [{'Tender ID': '1000', 'Title': 'Thermal blankets'}], db_path=db_path)
+    assert store.count_records('ISRO', db_path) == 1
+    assert store.count_records('BDL', db_path) == 5
+
+
+def test_older_store_is_migrated_once_on_open(db_path):
+    store.upsert_records('BDL', [BDL_RECORD], db_path=db_path)
+    conn = store.connect(db_path)
+    try:
+        # A store from before the search and date indexes
+        conn.executescript("DROP TABLE tender_fts; DROP TABLE tender_dates; PRAGMA user_version = 0")
+    finally:
+        conn.close()
+
+    assert [hit['key'] for hit in store.search("connectors", db_path=db_path)] == ['1001']
+    conn = store.connect(db_path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == store.SCHEMA_VERSION
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tender_dates'").fetchone()
+        # A current store is opened as it is
+        conn.execute("DROP TABLE tender_dates")
+    finally:
+        conn.close()
+    conn = store.connect(db_path)
+    try:
+        assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tender_dates'").fetchone()
+    finally:
+        conn.close()
+
+
+def test_full_crawls_are_recorded_on_their_runs(db_path):
+    assert store.last_full_crawl('GEM', db_path) is None
+    conn = store.connect(db_path)
+    try:
+        # A store from before full crawls were recorded in it
+        conn.executescript("ALTER TABLE runs DROP COLUMN full_crawl_at; PRAGMA user_version = 1")
+    finally:
+        conn.close()
+
+    store.upsert_records('BDL', [BDL_RECORD], db_path=db_path)
+    conn = store.connect(db_path)
+    try:
+        run_id = conn.execute("SELECT max(run_id) FROM runs").fetchone()[0]
+    finally:
+        conn.close()
+    store.record_full_crawl(run_id, db_path)
+    assert store.last_full_crawl('BDL', db_path) is not None
+    assert store.last_full_crawl('GEM', db_path) is None
@@ -0,0 +1,52 @@
+import os
+import watchlist
+
+
+def test_overlapping_terms_are_all_found():
+    matcher = watchlist.Matcher([("radar", False), ("radar spares", False), ("spares", False), ("ar sp", False)])
+    # "ar sp" is not made of whole words, so only the word-aligned terms match
+    assert matcher.find("Supply of RADAR spares") == {"radar", "radar spares", "spares"}
+    assert matcher.find("Radar") == {"radar"}
+
+
+def test_terms_match_whole_words_only():
+    matcher = watchlist.Matcher([("UAV", False), ("5840-01-123-4567", False)])
+    assert matcher.find("Mini UAV, qty 2") == {"UAV"}
+    assert matcher.find("uavs and squad") == set()
+    assert matcher.find("NSN 5840 01 123 4567") == {"5840-01-123-4567"}
+    assert matcher.find("NSN 15840-01-123-4567") == set()
+
+
+def test_fuzzy_terms_match_one_edit_away_only():
+    matcher = watchlist.Matcher([("gyroscope", True)])
+    for text in ("gyroscope", "gyroskope", "gyrscope", "gyrosccope", "gryoscope", "Gyróscope"):
+        assert matcher.find(f"Supply of {text} units") == {"gyroscope"}, text
+    for text in ("gyroskopes", "gryoskope", "gyro", "scope"):
+        assert matcher.find(f"Supply of {text} units") == set(), text
+    # Without the ~ mark the term is matched exactly
+    assert watchlist.Matcher([("gyroscope", False)]).find("gyroskope") == set()
+
+
+def test_short_and_multi_word_terms_never_match_fuzzily():
+    matcher = watchlist.Matcher([("fuze", True), ("night vision", True)])
+    assert matcher.find("fuse fuzes fuze") == {"fuze"}
+    assert matcher.find("fuse") == set()
+    assert matcher.find("night visión") == {"night vision"}
+    assert matcher.find("night vission") == set()
+
+
+def test_record_hits_name_the_first_column_and_skip_scraped_date():
+    matcher = watchlist.Matcher([("radar", False), ("2024", False)])
+    record = {'Title': 'Radar spares', 'Description': 'radar', 'Scraped Date': '2024-11-05'}
+    assert matcher.match_record(record) == {'radar': 'Title'}
+
+
+def test_watchlist_file_is_read_and_recompiled_when_it_changes(tmp_path):
+    path = tmp_path / "watchlist.txt"
+    assert not watchlist.current(str(path))
+    path.write_text("# terms\nradar\n\n~ gyroscope\n", encoding="utf-8")
+    assert watchlist.read_terms(str(path)) == [("radar", False), ("gyroscope", True)]
+    assert watchlist.current(str(path)).find("radar gyroskope") == {"radar", "gyroscope"}
+    path.write_text("sonar\n", encoding="utf-8")
+    os.utime(path, (1, 1))
+    assert watchlist.current(str(path)).find("radar sonar") == {"sonar"}
@@ -0,0 +1,62 @@
+import time
+import pytest
+import work_queue
+
+
+@pytest.fixture(params=['sqlite', 'file'])
+def queue(request, tmp_path):
+    if request.param == 'sqlite':
+        return work_queue.open_queue(f"sqlite:{tmp_path / 'queue.db'}")
+    return work_queue.open_queue(f"file:{tmp_path / 'queue'}")
+
+
+def test_tasks_are_queued_once(queue):
+    tasks = [work_queue.make_task('b1', 'GEM', 0, 5), work_queue.make_task('b1', 'NAL')]
+    assert queue.put(tasks) == 2
+    assert queue.put(tasks) == 0
+    assert queue.active_sources() == {'GEM', 'NAL'}
+
+
+def test_only_the_lease_holder_renews_or_finishes(queue):
+    queue.put([work_queue.make_task('b1', 'NAL')])
+    task = queue.lease('worker-1', 60)
+    assert queue.lease('worker-2', 60) is None
+    assert queue.renew(task, 'worker-1', 60)
+    assert not queue.renew(task, 'worker-2', 60)
+    assert not queue.finish(task, 'worker-2', rows=3)
+    assert queue.finish(task, 'worker-1', rows=3)
+    assert queue.counts() == {'done': 1}
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue):
+    queue.put([work_queue.make_task('b1', 'GEM', 0, 5)])
+    task = queue.lease('worker-1', 0.05)
+    time.sleep(0.1)
+    reclaimed = queue.lease('worker-2', 60)
+    assert reclaimed['task_key'] == task['task_key']
+    assert reclaimed['attempts'] == 2
+    # The first worker lost its lease: it can no longer close the task
+    assert not queue.finish(task, 'worker-1', rows=1)
+    assert queue.finish(reclaimed, 'worker-2', rows=1)
+
+
+def test_failed_task_is_retried_after_its_delay_until_out_of_attempts(queue):
+    queue.put([work_queue.make_task('b1', 'GEM', 0, 5, max_attempts=2)])
+    task = queue.lease('worker-1', 60)
+    assert queue.finish(task, 'worker-1', error="ContractError", retry_delay=0.1)
+    assert queue.lease('worker-1', 60) is None  # not due yet
+    time.sleep(0.15)
+
+    retry = queue.lease('worker-2', 60)
+    assert retry['attempts'] == 2
+    assert queue.finish(retry, 'worker-2', error="ContractError", retry_delay=0)
+    assert queue.lease('worker-2', 60) is None
+    assert queue.counts() == {'dead': 1}
+
+
+def test_expired_last_attempt_is_dead(queue):
+    queue.put([work_queue.make_task('b1', 'GEM', 0, 5, max_attempts=1)])
+    queue.lease('worker-1', 0.05)
+    time.sleep(0.1)
+    assert queue.lease('worker-2', 60) is None
+    assert queue.counts() == {'dead': 1}
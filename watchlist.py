@@ -0,0 +1,158 @@
+import os
+import re
+import threading
+import unicodedata
+from collections import deque
+
+# Keyword watchlist matched against every record as the store ingests it. All terms are compiled into one
+# Aho-Corasick automaton, so a record is scanned once whatever the number of terms, and hits are written to
+# the store's watch_hits index in the same transaction as the record.
+#
+# The watchlist is a text file with one term per line ("radar", "UAV", "5840-01-123-4567"); blank lines and
+# lines starting with # are ignored. Matching ignores case, accents and punctuation, and terms only match
+# whole words. A term written as "~gyroscope" also matches words one typo away (single-word terms of at
+# least FUZZY_MIN_LENGTH letters).
+WATCHLIST_PATH = os.environ.get("SCRAPER_WATCHLIST", "watchlist.txt")
+FUZZY_MARK = "~"
+FUZZY_MIN_LENGTH = 5
+# Columns never matched (dates would only produce noise for numeric terms)
+SKIPPED_COLUMNS = {'Scraped Date'}
+
+NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+# Function to normalize text for matching: no accents, case-folded, words separated by single spaces and
+# padded with a space on each side so terms only match whole words
+def normalize(text):
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " " + NON_WORD_RE.sub(" ", text.casefold()).strip() + " "
+
+
+# Function to read the terms of a watchlist file as (term, fuzzy) pairs
+def read_terms(path):
+    terms = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fuzzy = line.startswith(FUZZY_MARK)
+            term = line[len(FUZZY_MARK):].strip() if fuzzy else line
+            if normalize(term).strip():
+                terms.append((term, fuzzy))
+    return terms
+
+
+def _deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+# Function to tell whether two words are at most one edit apart (substitution, insertion, deletion or
+# swap of neighbouring letters)
+def within_one_edit(a, b):
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diffs) == 1 or (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                                   and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    return any(longer[:i] + longer[i + 1:] == shorter for i in range(len(longer)))
+
+
+# Compiled watchlist: find(text) returns the terms found in a text, match_record(record) the terms found in
+# a record with the first column each was found in
+class Matcher:
+    def __init__(self, terms):
+        self.terms = [term for term, _ in terms]
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.fuzzy = {}  # deletion variant -> [(normalized word, term)]
+        for term, fuzzy in terms:
+            pattern = normalize(term)
+            self._add(pattern, term)
+            word = pattern.strip()
+            if fuzzy and " " not in word and len(word) >= FUZZY_MIN_LENGTH:
+                for variant in _deletions(word) | {word}:
+                    self.fuzzy.setdefault(variant, []).append((word, term))
+        self._link()
+
+    def _add(self, pattern, term):
+        node = 0
+        for ch in pattern:
+            if ch not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[node][ch] = len(self.goto) - 1
+            node = self.goto[node][ch]
+        self.output[node].append(term)
+
+    # Breadth-first pass setting each node's failure link to the longest proper suffix in the trie
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    def find(self, text):
+        text = normalize(text)
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            if self.output[node]:
+                found.update(self.output[node])
+        if self.fuzzy:
+            for word in text.split():
+                if len(word) < FUZZY_MIN_LENGTH - 1:
+                    continue
+                for variant in _deletions(word) | {word}:
+                    for term_word, term in self.fuzzy.get(variant, ()):
+                        if term not in found and within_one_edit(word, term_word):
+                            found.add(term)
+        return found
+
+    def match_record(self, record):
+        hits = {}
+        for column, value in record.items():
+            if column in SKIPPED_COLUMNS or value is None or value == '':
+                continue
+            for term in self.find(value):
+                hits.setdefault(term, column)
+        return hits
+
+
+_lock = threading.Lock()
+_loaded = {}  # path -> (modification time, Matcher)
+
+
+# Function to get the compiled watchlist, recompiled whenever the file changes (an empty Matcher if there is
+# no watchlist file)
+def current(path=None):
+    path = path or WATCHLIST_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return Matcher([])
+    with _lock:
+        loaded = _loaded.get(path)
+        if loaded is None or loaded[0] != mtime:
+            loaded = (mtime, Matcher(read_terms(path)))
+            _loaded[path] = loaded
+        return loaded[1]
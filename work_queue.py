@@ -0,0 +1,292 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from datetime import datetime
+from urllib.parse import quote
+import store
+
+# Task queue for the distributed crawl mode (worker.py). A task is a whole source or a range of its pages;
+# workers lease tasks, renew the lease while they work, and complete or fail them. A lease that runs out
+# (the worker died or hung) makes the task available again, and a failed task is retried after a delay
+# until it has been tried max_attempts times. Results need no merging step: workers write straight into the
+# shared tender store, whose upserts are keyed by (source, record key), so a task run twice stores each
+# tender once.
+#
+# Backends are picked by URL, and others (e.g. a network queue) can be added to BACKENDS:
+#   sqlite:[path]  - tables in a SQLite database, the tender store by default (one host, or a shared disk
+#                    with working file locks)
+#   file:<dir>     - one JSON file per task, moved between state directories with atomic renames
+QUEUE_URL = os.environ.get("SCRAPER_QUEUE", "sqlite:")
+# Seconds a lease lasts without renewal, and tries per task
+LEASE_SECONDS = float(os.environ.get("SCRAPER_LEASE_SECONDS", 120))
+MAX_ATTEMPTS = int(os.environ.get("SCRAPER_TASK_ATTEMPTS", 3))
+
+TASK_FIELDS = ['task_id', 'task_key', 'batch', 'source', 'first_page', 'last_page', 'status', 'attempts',
+               'max_attempts', 'lease_owner', 'lease_expires', 'not_before', 'rows', 'error', 'created_at',
+               'finished_at']
+ACTIVE_STATUSES = ('queued', 'leased')
+
+
+# Function to name this worker in leases (host and process, so workers on several machines never clash)
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# Function to build a task. first_page/last_page (last excluded) are None for a whole source.
+def make_task(batch, source, first_page=None, last_page=None, max_attempts=MAX_ATTEMPTS):
+    pages = "all" if first_page is None else f"{first_page}-{last_page}"
+    return {'task_key': f"{batch}:{source}:{pages}", 'batch': batch, 'source': source, 'first_page': first_page,
+            'last_page': last_page, 'status': 'queued', 'attempts': 0, 'max_attempts': max_attempts,
+            'lease_owner': None, 'lease_expires': None, 'not_before': 0, 'rows': None, 'error': None,
+            'created_at': datetime.now().isoformat(timespec='seconds'), 'finished_at': None}
+
+
+class SQLiteQueue:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_key TEXT NOT NULL UNIQUE,
+        batch TEXT NOT NULL,
+        source TEXT NOT NULL,
+        first_page INTEGER,
+        last_page INTEGER,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        lease_owner TEXT,
+        lease_expires REAL,
+        not_before REAL NOT NULL DEFAULT 0,
+        rows INTEGER,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        finished_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, task_id);
+    """
+
+    def __init__(self, path=None):
+        self.path = path or None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path or store.DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    # Queue tasks; a task whose key is already queued (same batch, source and pages) is not added twice
+    def put(self, tasks):
+        conn = self._connect()
+        try:
+            with conn:
+                columns = [field for field in TASK_FIELDS if field != 'task_id']
+                return sum(conn.execute(
+                    f"INSERT OR IGNORE INTO tasks ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    [task[column] for column in columns]).rowcount for task in tasks)
+        finally:
+            conn.close()
+
+    # Take the oldest available task (queued and due, or leased with an expired lease) for lease_seconds
+    def lease(self, owner, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                # Tasks whose last attempt's lease ran out are not tried again
+                conn.execute("UPDATE tasks SET status = 'dead', error = COALESCE(error, 'Lease expired'), "
+                             "finished_at = ? WHERE status = 'leased' AND lease_expires < ? "
+                             "AND attempts >= max_attempts", (datetime.now().isoformat(timespec='seconds'), now))
+                row = conn.execute(
+                    "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE task_id = (SELECT task_id FROM tasks WHERE (status = 'queued' AND not_before <= ?) "
+                    "OR (status = 'leased' AND lease_expires < ?) ORDER BY task_id LIMIT 1) "
+                    f"RETURNING {', '.join(TASK_FIELDS)}", (owner, now + lease_seconds, now, now)).fetchone()
+            return dict(zip(TASK_FIELDS, row)) if row else None
+        finally:
+            conn.close()
+
+    # Extend a lease; False when the task is no longer leased to this owner
+    def renew(self, task, owner, lease_seconds=LEASE_SECONDS):
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(
+                    "UPDATE tasks SET lease_expires = ? WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                    (time.time() + lease_seconds, task['task_id'], owner)).rowcount > 0
+        finally:
+            conn.close()
+
+    # Close a task as done, or record a failure: queued again after retry_delay seconds, or 'dead' once it
+    # has used its attempts. Only the lease holder can close a task.
+    def finish(self, task, owner, rows=None, error=None, retry_delay=0):
+        if error is None:
+            status, not_before = 'done', 0
+        else:
+            status = 'dead' if task['attempts'] >= task['max_attempts'] else 'queued'
+            not_before = time.time() + retry_delay
+        finished_at = None if status == 'queued' else datetime.now().isoformat(timespec='seconds')
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(
+                    "UPDATE tasks SET status = ?, rows = ?, error = ?, not_before = ?, lease_owner = NULL, "
+                    "lease_expires = NULL, finished_at = ? WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                    (status, rows, error, not_before, finished_at, task['task_id'], owner)).rowcount > 0
+        finally:
+            conn.close()
+
+    # Sources with queued or leased tasks
+    def active_sources(self):
+        conn = self._connect()
+        try:
+            return {source for source, in conn.execute(
+                "SELECT DISTINCT source FROM tasks WHERE status IN ('queued', 'leased')")}
+        finally:
+            conn.close()
+
+    # Count tasks per status, for a batch or overall
+    def counts(self, batch=None):
+        conn = self._connect()
+        try:
+            query = "SELECT status, COUNT(*) FROM tasks" + (" WHERE batch = ?" if batch else "") + " GROUP BY status"
+            return dict(conn.execute(query, (batch,) if batch else ()).fetchall())
+        finally:
+            conn.close()
+
+
+# Queue kept as files: <dir>/<status>/<task key>.json. Moving a file between state directories with
+# os.rename is atomic, so when several workers (or machines sharing the directory) race for a task, exactly
+# one rename succeeds.
+class FileQueue:
+    STATUSES = ('queued', 'leased', 'done', 'dead')
+
+    def __init__(self, directory):
+        self.directory = directory
+        for status in self.STATUSES:
+            os.makedirs(os.path.join(directory, status), exist_ok=True)
+
+    def _path(self, status, task_key):
+        return os.path.join(self.directory, status, quote(task_key, safe='') + ".json")
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write(path, task):
+        with open(path + ".tmp", "w") as f:
+            json.dump(task, f)
+        os.replace(path + ".tmp", path)
+
+    def _files(self, status):
+        folder = os.path.join(self.directory, status)
+        return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".json"))
+
+    def put(self, tasks):
+        added = 0
+        for task in tasks:
+            if any(os.path.exists(self._path(status, task['task_key'])) for status in self.STATUSES):
+                continue
+            self._write(self._path('queued', task['task_key']), dict(task, task_id=task['task_key']))
+            added += 1
+        return added
+
+    # Move tasks whose lease ran out back to the queue (or to dead once out of attempts). A task renamed into
+    # leased/ an instant ago has no expiry written yet: the rename time (ctime) stands in for its lease start.
+    def _reclaim_expired(self, now, lease_seconds):
+        for path in self._files('leased'):
+            task = self._read(path)
+            if task is None:
+                continue
+            try:
+                expires = task['lease_expires'] or os.stat(path).st_ctime + lease_seconds
+            except OSError:
+                continue
+            if expires >= now:
+                continue
+            target = 'dead' if task['attempts'] >= task['max_attempts'] else 'queued'
+            try:
+                os.rename(path, self._path(target, task['task_key']))
+            except OSError:
+                continue  # another worker reclaimed it first
+
+    def lease(self, owner, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        self._reclaim_expired(now, lease_seconds)
+        for path in self._files('queued'):
+            task = self._read(path)
+            if task is None or task['not_before'] > now:
+                continue
+            leased_path = self._path('leased', task['task_key'])
+            try:
+                os.rename(path, leased_path)
+            except OSError:
+                continue  # taken by another worker
+            task = self._read(leased_path) or task
+            task.update(status='leased', lease_owner=owner, lease_expires=now + lease_seconds,
+                        attempts=task['attempts'] + 1)
+            self._write(leased_path, task)
+            return task
+        return None
+
+    def renew(self, task, owner, lease_seconds=LEASE_SECONDS):
+        path = self._path('leased', task['task_key'])
+        current = self._read(path)
+        if current is None or current['lease_owner'] != owner:
+            return False
+        current['lease_expires'] = time.time() + lease_seconds
+        self._write(path, current)
+        return True
+
+    def finish(self, task, owner, rows=None, error=None, retry_delay=0):
+        path = self._path('leased', task['task_key'])
+        current = self._read(path)
+        if current is None or current['lease_owner'] != owner:
+            return False
+        if error is None:
+            status = 'done'
+        else:
+            status = 'dead' if current['attempts'] >= current['max_attempts'] else 'queued'
+        current.update(status=status, rows=rows, error=error, lease_owner=None, lease_expires=None,
+                       not_before=time.time() + retry_delay if error else 0,
+                       finished_at=None if status == 'queued' else datetime.now().isoformat(timespec='seconds'))
+        self._write(path, current)
+        try:
+            os.rename(path, self._path(status, task['task_key']))
+        except OSError:
+            return False
+        return True
+
+    def active_sources(self):
+        return {task['source'] for status in ACTIVE_STATUSES for task in map(self._read, self._files(status)) if task}
+
+    def counts(self, batch=None):
+        counts = {}
+        for status in self.STATUSES:
+            tasks = [task for task in map(self._read, self._files(status)) if task]
+            total = sum(1 for task in tasks if not batch or task['batch'] == batch)
+            if total:
+                counts[status] = total
+        return counts
+
+
+# Queue backends by URL scheme
+BACKENDS = {
+    'sqlite': SQLiteQueue,
+    'file': FileQueue,
+}
+
+
+# Function to open the queue a URL names ("sqlite:", "sqlite:/path/queue.db", "file:/shared/queue")
+def open_queue(url=None):
+    scheme, _, location = (url or QUEUE_URL).partition(":")
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown queue backend {scheme!r} (known: {', '.join(BACKENDS)})")
+    if scheme == 'file' and not location:
+        raise ValueError("The file queue needs a directory, e.g. file:/shared/queue")
+    return BACKENDS[scheme](location or None) if scheme == 'sqlite' else BACKENDS[scheme](location)
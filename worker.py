@@ -0,0 +1,156 @@
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from datetime import datetime
+import scraper
+import work_queue
+
+# Distributed crawling: "enqueue" splits a crawl into tasks (a whole source, or a range of pages of a
+# shardable source), and any number of "work" processes, on this machine or others sharing the queue and
+# the store, lease and run them. See work_queue.py for leases and retries.
+# Pages per task when a shardable source is split
+SHARD_PAGES = int(os.environ.get("SCRAPER_SHARD_PAGES", 5))
+# Seconds an idle worker waits before asking the queue again
+POLL_INTERVAL = 2
+# Delay before the first retry of a failed task (doubled for each further attempt)
+RETRY_DELAY = 30
+
+
+# Function to split a crawl into tasks. Shardable sources are split into page ranges, as many as their
+# endpoint has pages right now, unless they are set to the browser mode (a browser shard would click through
+# every page before its own) or the endpoint is unusable; a shard whose endpoint breaks later is re-planned
+# as a whole-source task by task_scraper. Sources that still have queued or running tasks are skipped.
+def plan_tasks(queue, sources=None, shard_pages=SHARD_PAGES):
+    batch = datetime.now().strftime('%Y%m%dT%H%M%S')
+    active = queue.active_sources()
+    tasks = []
+    for source in sources or scraper.SCRAPERS_BY_SOURCE:
+        if source in active:
+            print(f"{source} still has tasks in the queue, not adding more")
+            continue
+        pages = None
+        if source in scraper.SHARDABLE and shard_pages > 0 and scraper.source_mode(source) != "browser":
+            pages = scraper.page_count(source)
+        if pages:
+            tasks.extend(work_queue.make_task(batch, source, first, min(first + shard_pages, pages))
+                         for first in range(0, pages, shard_pages))
+        else:
+            tasks.append(work_queue.make_task(batch, source))
+    return batch, tasks
+
+
+# Function to get the scraper a task runs, named after the task for the run summary. A shard that cannot be
+# scraped over HTTP queues one whole-source task for its batch instead (every such shard of the batch
+# queues the same task, which the queue adds once) and completes without rows.
+def task_scraper(queue, task):
+    if task['first_page'] is None:
+        return scraper.SCRAPERS_BY_SOURCE[task['source']]
+
+    def scrape():
+        try:
+            return scraper.scrape_shard(task['source'], task['first_page'], task['last_page'])
+        except scraper.ShardUnavailable as e:
+            queue.put([work_queue.make_task(task['batch'], task['source'])])
+            print(f"{e}: crawling {task['source']} as a whole")
+            return 0
+    scrape.__name__ = f"{task['source']} pages {task['first_page'] + 1}-{task['last_page']}"
+    return scrape
+
+
+# Function to run one leased task, renewing its lease until the scraper returns, then complete or fail it
+def run_task(queue, task, owner):
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(work_queue.LEASE_SECONDS / 3):
+            if not queue.renew(task, owner):
+                print(f"Lost the lease on {task['task_key']}")
+                return
+
+    renewer = threading.Thread(target=heartbeat, name="lease-heartbeat", daemon=True)
+    renewer.start()
+    try:
+        if task['source'] not in scraper.SCRAPERS_BY_SOURCE:
+            result = {'status': 'error', 'rows': 0, 'duration': 0, 'error': f"Unknown source {task['source']}"}
+        else:
+            summary = scraper.run_scrapers([task_scraper(queue, task)], max_workers=1,
+                                           timeout=scraper.SOURCE_TIMEOUT)
+            result = summary['sources'][0]
+    except Exception as e:
+        result = {'status': 'error', 'rows': 0, 'duration': 0, 'error': f"{type(e).__name__}: {e}"}
+    finally:
+        stop.set()
+        renewer.join()
+
+    # A partial or failed task is retried later; its pipeline checkpoint lets the retry resume
+    if result['status'] == 'ok':
+        queue.finish(task, owner, rows=result['rows'])
+    else:
+        queue.finish(task, owner, rows=result['rows'], error=result['error'] or result['status'],
+                     retry_delay=RETRY_DELAY * 2 ** (task['attempts'] - 1))
+    print(f"{owner}: {task['task_key']} {result['status']} ({result['rows']} rows, {result['duration']}s)")
+    return result
+
+
+# Function to lease and run tasks until the queue is empty (or forever, waiting for new tasks)
+def work_loop(queue_url=None, forever=False):
+    queue = work_queue.open_queue(queue_url)
+    owner = work_queue.worker_name()
+    done = 0
+    while True:
+        task = queue.lease(owner)
+        if task is None:
+            if not forever:
+                return done
+            time.sleep(POLL_INTERVAL)
+            continue
+        run_task(queue, task, owner)
+        done += 1
+
+
+# Function to run work_loop in several processes (each with its own browsers and store connections)
+def run_workers(processes=1, queue_url=None, forever=False):
+    if processes <= 1:
+        return work_loop(queue_url, forever)
+    workers = [multiprocessing.Process(target=work_loop, args=(queue_url, forever), name=f"worker-{n}")
+               for n in range(processes)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+
+def print_counts(queue, batch=None):
+    counts = queue.counts(batch)
+    print(", ".join(f"{status}: {counts[status]}" for status in sorted(counts)) or "No tasks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl the sources with workers sharing a task queue")
+    parser.add_argument("--queue", default=None, help=f"queue URL (default {work_queue.QUEUE_URL})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="queue a crawl of some sources (all by default)")
+    enqueue.add_argument("--source", choices=list(scraper.SCRAPERS_BY_SOURCE), action="append")
+    enqueue.add_argument("--shard-pages", type=int, default=SHARD_PAGES, help="pages per task (0: no sharding)")
+    work = commands.add_parser("work", help="run queued tasks")
+    work.add_argument("--processes", type=int, default=1)
+    work.add_argument("--forever", action="store_true", help="keep waiting for tasks when the queue is empty")
+    status = commands.add_parser("status", help="count tasks by status")
+    status.add_argument("--batch", default=None)
+    args = parser.parse_args()
+
+    queue = work_queue.open_queue(args.queue)
+    if args.command == "enqueue":
+        batch, tasks = plan_tasks(queue, args.source, args.shard_pages)
+        print(f"Batch {batch}: queued {queue.put(tasks)} tasks")
+    elif args.command == "work":
+        run_workers(args.processes, args.queue, args.forever)
+        print_counts(queue)
+    else:
+        print_counts(queue, args.batch)
+
+
+if __name__ == "__main__":
+    main()